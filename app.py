@@ -4,90 +4,21 @@ HK Podravka – Admin aplikacija (čista verzija v7.1)
 Sekcije: Klub, Članovi, Treneri, Natjecanja i rezultati, Statistika
 Boje: crvena, bijela, zlatna
 """
-import os, io, json, sqlite3
-from datetime import date, datetime
-import pandas as pd
+import json, os
+from datetime import date, datetime, timedelta
 import streamlit as st
 
+from hkpodravka import cache, db, export, jobs, perf, reference
+from hkpodravka.cache import bump
+from hkpodravka.config import KLUB_NAZIV
+from hkpodravka.db import get_conn
+from hkpodravka.migrations import ensure_schema
+
 # ---- Boje i osnovni podaci ----
 PRIMARY_RED = "#c1121f"
 GOLD = "#d4af37"
 WHITE = "#ffffff"
 
-KLUB_NAZIV = "Hrvački klub Podravka"
-KLUB_EMAIL = "hsk-podravka@gmail.com"
-KLUB_ADRESA = "Miklinovec 6a, 48000 Koprivnica"
-KLUB_OIB = "60911784858"
-KLUB_WEB = "https://hk-podravka.com"
-KLUB_IBAN = "HR6923860021100518154"
-
-DB_PATH = "hk_podravka.db"
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
-# ---- DB util ----
-def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
-
-def init_db():
-    conn = get_conn()
-    cur = conn.cursor()
-    # club
-    cur.execute("""CREATE TABLE IF NOT EXISTS club_info (
-        id INTEGER PRIMARY KEY CHECK (id=1),
-        name TEXT, email TEXT, address TEXT, oib TEXT, web TEXT, iban TEXT,
-        president TEXT, secretary TEXT, board_json TEXT, supervisory_json TEXT,
-        instagram TEXT, facebook TEXT, tiktok TEXT
-    )""")
-    cur.execute("SELECT 1 FROM club_info WHERE id=1")
-    if cur.fetchone() is None:
-        cur.execute("""INSERT INTO club_info (id,name,email,address,oib,web,iban,president,secretary,board_json,supervisory_json,instagram,facebook,tiktok)
-                       VALUES (1,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                    (KLUB_NAZIV, KLUB_EMAIL, KLUB_ADRESA, KLUB_OIB, KLUB_WEB, KLUB_IBAN, "", "", "[]", "[]", "", "", ""))
-    # members
-    cur.execute("""CREATE TABLE IF NOT EXISTS members (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        first_name TEXT, last_name TEXT, dob TEXT, gender TEXT, oib TEXT UNIQUE,
-        street TEXT, city TEXT, postal_code TEXT,
-        athlete_email TEXT, parent_email TEXT,
-        id_card_number TEXT, id_card_issuer TEXT, id_card_valid_until TEXT,
-        passport_number TEXT, passport_issuer TEXT, passport_valid_until TEXT,
-        active_competitor INTEGER DEFAULT 0, veteran INTEGER DEFAULT 0, other_flag INTEGER DEFAULT 0,
-        pays_fee INTEGER DEFAULT 0, fee_amount REAL DEFAULT 30.0,
-        group_name TEXT, photo_path TEXT,
-        application_path TEXT, consent_path TEXT,
-        medical_path TEXT, medical_valid_until TEXT, consent_checked_date TEXT
-    )""")
-    # coaches
-    cur.execute("""CREATE TABLE IF NOT EXISTS coaches (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        first_name TEXT, last_name TEXT, dob TEXT, oib TEXT, email TEXT, iban TEXT,
-        group_name TEXT, contract_path TEXT, other_docs_json TEXT, photo_path TEXT
-    )""")
-    # competitions
-    cur.execute("""CREATE TABLE IF NOT EXISTS competitions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        kind TEXT, kind_other TEXT, name TEXT,
-        date_from TEXT, date_to TEXT, place TEXT,
-        style TEXT, age_cat TEXT,
-        country TEXT, country_iso3 TEXT,
-        team_rank INTEGER, club_competitors INTEGER, total_competitors INTEGER,
-        clubs_count INTEGER, countries_count INTEGER,
-        coaches_json TEXT, notes TEXT, bulletin_url TEXT, website_link TEXT, gallery_paths_json TEXT
-    )""")
-    # results
-    cur.execute("""CREATE TABLE IF NOT EXISTS results (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        competition_id INTEGER REFERENCES competitions(id) ON DELETE CASCADE,
-        member_id INTEGER REFERENCES members(id) ON DELETE SET NULL,
-        category TEXT, style TEXT,
-        fights_total INTEGER, wins INTEGER, losses INTEGER, placement INTEGER,
-        wins_detail_json TEXT, losses_detail_json TEXT, note TEXT
-    )""")
-    conn.commit(); conn.close()
-
 # ---- UI util ----
 def css_style():
     st.markdown(f"""
@@ -100,27 +31,80 @@ def css_style():
 def page_header(title, subtitle=None):
     st.markdown(f"<div class='app-header'><h3 style='margin:0'>{title}</h3>{('<div>'+subtitle+'</div>') if subtitle else ''}</div>", unsafe_allow_html=True)
 
-def save_upload(file, subdir):
-    if not file: return ""
-    path = os.path.join(UPLOAD_DIR, subdir); os.makedirs(path, exist_ok=True)
-    fname = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.name}"
-    full = os.path.join(path, fname)
-    with open(full, "wb") as f: f.write(file.getbuffer())
-    return full
-
-def excel_bytes(df: pd.DataFrame, sheet="Sheet1"):
-    out = io.BytesIO()
-    # Prefer xlsxwriter if available (for best formatting performance),
-    # otherwise safely fall back to openpyxl so the app works even when
-    # xlsxwriter isn't installed.
+def export_button(label, file_name, key, sheets_fn, tables=(), disabled=False):
+    """Excel se gradi tek na klik (hkpodravka.export) i pamti dok se tablice ne promijene."""
+    wkey = "export_" + "_".join(str(k) for k in key)
+    data = export.cached(key, tables)
+    if data is None and st.button(f"Pripremi: {label}", key=wkey, disabled=disabled):
+        data = export.build(key, tables, sheets_fn)
+    if data is not None:
+        st.download_button(f"Skini: {label}", data=data, file_name=file_name, key=wkey + "_dl")
+
+def job_export(label, file_name, key, kind, params, disabled=False):
+    """Veći izvoz kao pozadinski posao (hkpodravka.jobs): stranica ne čeka, a gotova datoteka
+    ostaje dostupna i nakon ponovnog učitavanja."""
+    key = "_".join(str(k) for k in key)
+    conn = get_conn()
+    job = jobs.latest(conn, key, max_age=86400)
+    busy = job is not None and job["status"] in jobs.ACTIVE
+    if st.button(f"Pripremi: {label}", key="job_" + key, disabled=disabled or busy):
+        job = jobs.get(conn, jobs.submit(conn, kind, {**params, "file_name": file_name}, key=key))
+    conn.close()
+    if job is not None:
+        job_status(job, label, file_name)
+
+def job_status(job, label, file_name=None, download=None):
+    """Stanje posla; dok traje, osvježava se samo taj dio stranice."""
+    if job["status"] in jobs.ACTIVE:
+        _job_progress(job["id"], label)
+    elif job["status"] == jobs.DONE:
+        seen = st.session_state.setdefault("jobs_seen", set())
+        if job["id"] not in seen:
+            # radnik može biti zaseban proces pa predmemorija ovog procesa ne zna za promjenu
+            seen.add(job["id"]); bump(*jobs.HANDLERS[job["kind"]].tables)
+        if file_name and job["result_path"] and os.path.exists(job["result_path"]):
+            with open(job["result_path"], "rb") as f:
+                st.download_button(f"Skini: {download or label}", data=f.read(), file_name=file_name, key=f"job_dl_{job['id']}")
+            st.caption(f"Pripremljeno {job['finished_at'].replace('T', ' ')}")
+    elif job["status"] == jobs.FAILED:
+        st.error(f"{label}: posao nije uspio ({job['error']}).")
+    else:
+        st.info(f"{label}: posao je otkazan.")
+
+@st.fragment(run_every=1.0)
+def _job_progress(job_id, label):
+    conn = get_conn()
+    job = jobs.get(conn, job_id)
+    if job["status"] not in jobs.ACTIVE:
+        conn.close(); st.rerun()
+    waiting = "u redu čekanja…" if job["status"] == jobs.QUEUED else "u tijeku…"
+    st.progress(job["progress"], text=f"{label}: {job['message'] or waiting}")
+    if st.button("Otkaži", key=f"job_cancel_{job_id}"):
+        jobs.cancel(conn, job_id)
+    conn.close()
+
+def grid_key(base):
+    # nova verzija ključa nakon spremanja briše stare izmjene iz stanja editora
+    return f"{base}_{st.session_state.get(base + '_rev', 0)}"
+
+def save_grid(conn, original, edited, base, table, columns, *bump_tables):
+    """Sprema samo izmijenjene/dodane/obrisane retke iz st.data_editor-a (ključ grid_key(base))."""
+    from hkpodravka import grid
+    state = st.session_state.get(grid_key(base))
+    if isinstance(state, dict) and "edited_rows" in state:
+        changes = grid.from_editor(original, state, columns)
+    else:
+        changes = grid.from_frames(original, edited, columns)
+    if not len(changes):
+        st.info("Nema izmjena."); return
     try:
-        import xlsxwriter  # noqa: F401
-        engine = "xlsxwriter"
-    except Exception:
-        engine = "openpyxl"
-    with pd.ExcelWriter(out, engine=engine) as w:
-        df.to_excel(w, index=False, sheet_name=sheet)
-    return out.getvalue()
+        upd, ins, dele = grid.apply(conn, table, columns, changes)
+    except Exception as e:
+        st.error(f"Izmjene nisu spremljene: {e}"); return
+    bump(*bump_tables)
+    st.session_state[base + "_rev"] = st.session_state.get(base + "_rev", 0) + 1
+    st.session_state[base + "_msg"] = f"Spremljeno: {upd} izmijenjeno, {ins} dodano, {dele} obrisano."
+    st.rerun()
 
 def mailto(to, subject="", body=""):
     import urllib.parse as up
@@ -132,6 +116,8 @@ def mailto(to, subject="", body=""):
 
 # ---- Sekcija 1: Klub ----
 def section_club():
+    import pandas as pd
+    from hkpodravka import uploads
     page_header("Klub – osnovni podaci", KLUB_NAZIV)
     conn = get_conn()
     df = pd.read_sql_query("SELECT * FROM club_info WHERE id=1", conn)
@@ -175,12 +161,11 @@ def section_club():
                       (board if isinstance(board,pd.DataFrame) else pd.DataFrame(board)).to_json(),
                       (superv if isinstance(superv,pd.DataFrame) else pd.DataFrame(superv)).to_json(),
                       instagram,facebook,tiktok))
-        conn.execute("""CREATE TABLE IF NOT EXISTS club_docs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, filename TEXT, path TEXT, uploaded_at TEXT)""")
         if up_statut:
-            p = save_upload(up_statut,"club_docs")
+            p = uploads.store(up_statut)
             conn.execute("INSERT INTO club_docs(kind,filename,path,uploaded_at) VALUES (?,?,?,?)", ("statut", up_statut.name, p, datetime.now().isoformat()))
         if up_other:
-            p = save_upload(up_other,"club_docs")
+            p = uploads.store(up_other)
             conn.execute("INSERT INTO club_docs(kind,filename,path,uploaded_at) VALUES (?,?,?,?)", ("ostalo", up_other.name, p, datetime.now().isoformat()))
         conn.commit(); st.success("Spremljeno.")
     try:
@@ -191,80 +176,33 @@ def section_club():
     conn.close()
 
 # ---- Sekcija 2: Članovi ----
-def members_template_df():
-    return pd.DataFrame(columns=[
-        "ime","prezime","datum_rodenja(YYYY-MM-DD)","spol(M/Ž)","oib",
-        "ulica_i_broj","grad","postanski_broj",
-        "email_sportasa","email_roditelja",
-        "br_osobne","osobna_vrijedi_do(YYYY-MM-DD)","osobna_izdavatelj",
-        "br_putovnice","putovnica_vrijedi_do(YYYY-MM-DD)","putovnica_izdavatelj",
-        "aktivni_natjecatelj(0/1)","veteran(0/1)","ostalo(0/1)",
-        "placa_clanarinu(0/1)","iznos_clanarine(EUR)","grupa"
-    ])
-
 def section_members():
+    import pandas as pd
+    from hkpodravka import grid, members, uploads
     page_header("Članovi", "Uvoz/izvoz Excel, unos i uređivanje")
     conn = get_conn()
-    st.download_button("Predložak (Excel)", data=excel_bytes(members_template_df(),"ClanoviPredlozak"), file_name="predlozak_clanovi.xlsx")
-    export_df = pd.read_sql_query("""SELECT first_name AS ime, last_name AS prezime, dob AS datum_rodenja, gender AS spol, oib,
-        street AS ulica_i_broj, city AS grad, postal_code AS postanski_broj,
-        athlete_email AS email_sportasa, parent_email AS email_roditelja,
-        id_card_number AS br_osobne, id_card_valid_until AS osobna_vrijedi_do, id_card_issuer AS osobna_izdavatelj,
-        passport_number AS br_putovnice, passport_valid_until AS putovnica_vrijedi_do, passport_issuer AS putovnica_izdavatelj,
-        active_competitor AS aktivni_natjecatelj, veteran, other_flag AS ostalo,
-        pays_fee AS placa_clanarinu, fee_amount AS iznos_clanarine, group_name AS grupa
-        FROM members ORDER BY last_name, first_name""", conn)
-    st.download_button("Skini članove (Excel)", data=excel_bytes(export_df,"Clanovi"), file_name="clanovi_export.xlsx", disabled=export_df.empty)
+    export_button("predložak (Excel)", "predlozak_clanovi.xlsx", ("members_template",),
+                  lambda: [export.frame_sheet("ClanoviPredlozak", members.template_df())])
 
     up_excel = st.file_uploader("Upload članova (Excel po predlošku)", type=["xlsx"], key="members_excel_v7_1")
-    if up_excel is not None:
+    # isti uvoz se ne ponavlja na svakom ponovnom izvođenju stranice; uvozi ga pozadinski posao
+    if up_excel is not None and st.session_state.get("members_import_id") != getattr(up_excel, "file_id", up_excel.name):
         try:
-            df_up = pd.read_excel(up_excel)
-            for _, r in df_up.iterrows():
-                vals = {
-                    "first_name": str(r.get("ime","") or ""),
-                    "last_name" : str(r.get("prezime","") or ""),
-                    "dob"       : str(r.get("datum_rodenja(YYYY-MM-DD)","") or "")[:10],
-                    "gender"    : str(r.get("spol(M/Ž)","") or ""),
-                    "oib"       : str(r.get("oib","") or ""),
-                    "street"    : str(r.get("ulica_i_broj","") or ""),
-                    "city"      : str(r.get("grad","") or ""),
-                    "postal"    : str(r.get("postanski_broj","") or ""),
-                    "email_s"   : str(r.get("email_sportasa","") or ""),
-                    "email_p"   : str(r.get("email_roditelja","") or ""),
-                    "id_no"     : str(r.get("br_osobne","") or ""),
-                    "id_until"  : str(r.get("osobna_vrijedi_do(YYYY-MM-DD)","") or "")[:10],
-                    "id_issuer" : str(r.get("osobna_izdavatelj","") or ""),
-                    "pass_no"   : str(r.get("br_putovnice","") or ""),
-                    "pass_until": str(r.get("putovnica_vrijedi_do(YYYY-MM-DD)","") or "")[:10],
-                    "pass_issuer":str(r.get("putovnica_izdavatelj","") or ""),
-                    "active"    : int(r.get("aktivni_natjecatelj(0/1)",0) or 0),
-                    "veteran"   : int(r.get("veteran(0/1)",0) or 0),
-                    "other"     : int(r.get("ostalo(0/1)",0) or 0),
-                    "pays"      : int(r.get("placa_clanarinu(0/1)",0) or 0),
-                    "fee"       : float(r.get("iznos_clanarine(EUR)",30) or 30.0),
-                    "group"     : str(r.get("grupa","") or ""),
-                }
-                conn.execute("""
-                    INSERT INTO members(first_name,last_name,dob,gender,oib,street,city,postal_code,
-                        athlete_email,parent_email,id_card_number,id_card_issuer,id_card_valid_until,
-                        passport_number,passport_issuer,passport_valid_until,
-                        active_competitor,veteran,other_flag,pays_fee,fee_amount,group_name)
-                    VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-                    ON CONFLICT(oib) DO UPDATE SET
-                        first_name=excluded.first_name,last_name=excluded.last_name,dob=excluded.dob,gender=excluded.gender,
-                        street=excluded.street,city=excluded.city,postal_code=excluded.postal_code,
-                        athlete_email=excluded.athlete_email,parent_email=excluded.parent_email,
-                        id_card_number=excluded.id_card_number,id_card_issuer=excluded.id_card_issuer,id_card_valid_until=excluded.id_card_valid_until,
-                        passport_number=excluded.passport_number,passport_issuer=excluded.passport_issuer,passport_valid_until=excluded.passport_valid_until,
-                        active_competitor=excluded.active_competitor,veteran=excluded.veteran,other_flag=excluded.other_flag,
-                        pays_fee=excluded.pays_fee,fee_amount=excluded.fee_amount,group_name=excluded.group_name
-                """, (vals["first_name"],vals["last_name"],vals["dob"],vals["gender"],vals["oib"],vals["street"],vals["city"],vals["postal"],
-                      vals["email_s"],vals["email_p"],vals["id_no"],vals["id_issuer"],vals["id_until"],
-                      vals["pass_no"],vals["pass_issuer"],vals["pass_until"],vals["active"],vals["veteran"],vals["other"],vals["pays"],vals["fee"],vals["group"]))
-            conn.commit(); st.success("Excel uvoz dovršen.")
+            jobs.submit(conn, "members_import", key="members_import", files={"input.xlsx": up_excel})
+            st.session_state["members_import_id"] = getattr(up_excel, "file_id", up_excel.name)
         except Exception as e:
             st.error(f"Greška pri uvozu: {e}")
+    imp = jobs.latest(conn, "members_import", max_age=3600)
+    if imp is not None and imp["status"] == jobs.DONE:
+        counts, problems = imp["result"]["counts"], imp["result"]["problems"]
+        msg = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+        (st.warning if counts.get("odbijen") or counts.get("upozorenje") else st.success)(f"Excel uvoz dovršen ({msg}).")
+        if problems:
+            st.dataframe(pd.DataFrame(problems, columns=members.REPORT_COLUMNS), use_container_width=True, hide_index=True)
+            if imp["result"]["problems_total"] > len(problems):
+                st.caption(f"Prikazano prvih {len(problems)} od {imp['result']['problems_total']} – svi su u izvještaju.")
+    if imp is not None:
+        job_status(imp, "uvoz članova", "uvoz_clanova_izvjestaj.xlsx", download="izvještaj o uvozu (Excel)")
 
     st.markdown("---"); st.markdown("### Unos novog člana")
     with st.form("member_form_v7_1"):
@@ -283,56 +221,58 @@ def section_members():
         up_med = st.file_uploader("Liječnička potvrda (PDF/JPG)", type=["pdf","png","jpg","jpeg"]); med_valid = st.date_input("Potvrda vrijedi do", value=date.today())
         submit_member = st.form_submit_button("Spremi člana")
     if submit_member:
-        photo_path = save_upload(photo, "members/photos")
-        app_path = save_upload(app_pdf, "members/forms")
-        con_path = save_upload(con_pdf, "members/forms")
-        med_path = save_upload(up_med, "members/medical")
-        conn.execute("""
-            INSERT INTO members(first_name,last_name,dob,gender,oib,street,city,postal_code,athlete_email,parent_email,
-                id_card_number,id_card_issuer,id_card_valid_until,passport_number,passport_issuer,passport_valid_until,
-                active_competitor,veteran,other_flag,pays_fee,fee_amount,group_name,photo_path,application_path,consent_path,medical_path,medical_valid_until,consent_checked_date)
-            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            ON CONFLICT(oib) DO UPDATE SET
-                first_name=excluded.first_name,last_name=excluded.last_name,dob=excluded.dob,gender=excluded.gender,
-                street=excluded.street,city=excluded.city,postal_code=excluded.postal_code,
-                athlete_email=excluded.athlete_email,parent_email=excluded.parent_email,
-                id_card_number=excluded.id_card_number,id_card_issuer=excluded.id_card_issuer,id_card_valid_until=excluded.id_card_valid_until,
-                passport_number=excluded.passport_number,passport_issuer=excluded.passport_issuer,passport_valid_until=excluded.passport_valid_until,
-                active_competitor=excluded.active_competitor,veteran=excluded.veteran,other_flag=excluded.other_flag,
-                pays_fee=excluded.pays_fee,fee_amount=excluded.fee_amount,group_name=excluded.group_name,
-                photo_path=COALESCE(excluded.photo_path,photo_path),
-                application_path=COALESCE(excluded.application_path,application_path),
-                consent_path=COALESCE(excluded.consent_path,consent_path),
-                medical_path=COALESCE(excluded.medical_path,medical_path),
-                medical_valid_until=excluded.medical_valid_until,
-                consent_checked_date=excluded.consent_checked_date
-        """, (first_name,last_name,dob.isoformat(),gender,oib,street,city,postal,email_s,email_p,id_no,id_issuer,id_until.isoformat(),
-              pass_no,pass_issuer,pass_until.isoformat(),int(active),int(veteran),int(other),int(pays_fee),float(fee_amt),group_name,
-              photo_path,app_path,con_path,med_path,med_valid.isoformat(), datetime.now().date().isoformat()))
-        conn.commit(); st.success("Član spremljen.")
+        photo_path = uploads.store(photo)
+        app_path = uploads.store(app_pdf)
+        con_path = uploads.store(con_pdf)
+        med_path = uploads.store(up_med)
+        if photo_path: jobs.submit(conn, "images", {"paths": [photo_path]})
+        members.save(conn, {"first_name": first_name, "last_name": last_name, "dob": dob.isoformat(), "gender": gender, "oib": oib,
+                            "street": street, "city": city, "postal_code": postal, "athlete_email": email_s, "parent_email": email_p,
+                            "id_card_number": id_no, "id_card_issuer": id_issuer, "id_card_valid_until": id_until.isoformat(),
+                            "passport_number": pass_no, "passport_issuer": pass_issuer, "passport_valid_until": pass_until.isoformat(),
+                            "active_competitor": int(active), "veteran": int(veteran), "other_flag": int(other), "pays_fee": int(pays_fee),
+                            "fee_amount": float(fee_amt), "group_name": group_name, "photo_path": photo_path, "application_path": app_path,
+                            "consent_path": con_path, "medical_path": med_path, "medical_valid_until": med_valid.isoformat(),
+                            "consent_checked_date": datetime.now().date().isoformat()})
+        bump("members"); st.success("Član spremljen.")
 
     st.markdown("---"); st.markdown("### Popis članova")
-    members_df = pd.read_sql_query("""SELECT id, first_name, last_name, gender, dob, oib, street, city, postal_code, athlete_email, parent_email,
-        group_name, pays_fee, fee_amount, medical_valid_until FROM members ORDER BY last_name, first_name""", conn)
+    f1,f2,f3,f4 = st.columns([3,2,2,2])
+    search = f1.text_input("Traži (ime, prezime ili OIB)", key="members_search")
+    group = f2.selectbox("Grupa", [members.ALL] + [g for g in reference.member_group_names(conn) if g], key="members_group")
+    city = f3.text_input("Grad", key="members_city")
+    fee = f4.selectbox("Članarina", list(members.FEE_FILTERS), key="members_fee")
+    filters = (search, group, city, members.FEE_FILTERS[fee])
+    # stog ključeva prethodnih stranica; nova pretraga kreće od početka
+    if st.session_state.get("members_filters") != filters:
+        st.session_state["members_filters"] = filters; st.session_state["members_cursors"] = [None]
+        st.session_state["members_grid_v7_1_rev"] = st.session_state.get("members_grid_v7_1_rev", 0) + 1
+    cursors = st.session_state["members_cursors"]
+    members_df, more = members.list_page(conn, filters, after=cursors[-1])
+    total = members.list_count(conn, filters)
+    n1,n2,n3 = st.columns([1,1,4])
+    if n1.button("← Prethodna", disabled=len(cursors) == 1):
+        cursors.pop(); st.session_state["members_grid_v7_1_rev"] += 1; st.rerun()
+    if n2.button("Sljedeća →", disabled=not more):
+        cursors.append(members.next_cursor(members_df)); st.session_state["members_grid_v7_1_rev"] += 1; st.rerun()
+    n3.caption(f"Stranica {len(cursors)} / {max(1, -(-total // members.PAGE_SIZE))} · pronađeno članova: {total}")
+    members_df = members_df.drop(columns=["_k1", "_k2"])
+    job_export("članovi (Excel)", "clanovi_export.xlsx", ("members",) + filters, "export",
+               {"export": "members", "filters": dict(zip(("search", "group", "city", "fee"), filters))}, disabled=not total)
+    if "members_grid_v7_1_msg" in st.session_state: st.success(st.session_state.pop("members_grid_v7_1_msg"))
     if not members_df.empty:
-        edited = st.data_editor(members_df, num_rows="dynamic", use_container_width=True, key="members_grid_v7_1")
+        edited = st.data_editor(members_df, num_rows="dynamic", use_container_width=True, key=grid_key("members_grid_v7_1"), disabled=["id"])
         c1,c2,c3 = st.columns(3)
         if c1.button("Spremi izmjene"):
-            for _, r in edited.iterrows():
-                conn.execute("""UPDATE members SET first_name=?,last_name=?,gender=?,dob=?,street=?,city=?,postal_code=?,athlete_email=?,parent_email=?,group_name=?,pays_fee=?,fee_amount=?,medical_valid_until=? WHERE id=?""",
-                             (str(r.get("first_name","")),str(r.get("last_name","")),str(r.get("gender","")),str(r.get("dob",""))[:10],
-                              str(r.get("street","")),str(r.get("city","")),str(r.get("postal_code","")),
-                              str(r.get("athlete_email","")),str(r.get("parent_email","")),
-                              str(r.get("group_name","")),int(r.get("pays_fee",0) or 0),float(r.get("fee_amount",0) or 0.0),
-                              str(r.get("medical_valid_until","")),int(r["id"])))
-            conn.commit(); st.success("Izmjene spremljene.")
+            save_grid(conn, members_df, edited, "members_grid_v7_1", "members", grid.MEMBERS_COLUMNS, "members", "results")
         del_id = c2.number_input("ID člana za brisanje", min_value=0, step=1, value=0)
         if c3.button("Obriši člana") and del_id>0:
-            conn.execute("DELETE FROM members WHERE id=?", (int(del_id),)); conn.commit(); st.success("Član obrisan."); st.rerun()
+            members.delete(conn, del_id); bump("members", "results"); st.success("Član obrisan."); st.rerun()
     conn.close()
 
 # ---- Sekcija 3: Treneri ----
 def section_coaches():
+    from hkpodravka import coaches, grid, uploads
     page_header("Treneri", "Unos trenera, dokumenti i slike")
     conn = get_conn()
     with st.form("coach_form_v7_1"):
@@ -345,31 +285,30 @@ def section_coaches():
         photo = st.file_uploader("Slika trenera", type=["png","jpg","jpeg"])
         submit = st.form_submit_button("Spremi trenera")
     if submit:
-        def up(f, sub): return save_upload(f, sub) if f else ""
-        contract_path = up(contract, "coaches/contracts")
-        other_paths = [up(f,"coaches/docs") for f in (other_docs or [])]
-        photo_path = up(photo, "coaches/photos")
-        conn.execute("""INSERT INTO coaches(first_name,last_name,dob,oib,email,iban,group_name,contract_path,other_docs_json,photo_path)
-                        VALUES(?,?,?,?,?,?,?,?,?,?)""",
-                     (first_name,last_name,dob.isoformat(),oib,email,iban,group_name,contract_path,json.dumps(other_paths),photo_path))
-        conn.commit(); st.success("Trener spremljen.")
+        contract_path = uploads.store(contract)
+        other_paths = [uploads.store(f) for f in (other_docs or [])]
+        photo_path = uploads.store(photo)
+        if photo_path: jobs.submit(conn, "images", {"paths": [photo_path]})
+        coaches.save(conn, {"first_name": first_name, "last_name": last_name, "dob": dob.isoformat(), "oib": oib, "email": email, "iban": iban,
+                            "group_name": group_name, "contract_path": contract_path, "other_docs_json": json.dumps(other_paths), "photo_path": photo_path})
+        bump("coaches"); st.success("Trener spremljen.")
     st.markdown("---"); st.markdown("### Popis trenera")
-    coaches_df = pd.read_sql_query("""SELECT id, first_name, last_name, dob, oib, email, iban, group_name FROM coaches ORDER BY last_name, first_name""", conn)
+    coaches_df = coaches.list_df(conn)
+    if "coaches_grid_v7_1_msg" in st.session_state: st.success(st.session_state.pop("coaches_grid_v7_1_msg"))
     if not coaches_df.empty:
-        edited = st.data_editor(coaches_df, num_rows="dynamic", use_container_width=True, key="coaches_grid_v7_1")
+        edited = st.data_editor(coaches_df, num_rows="dynamic", use_container_width=True, key=grid_key("coaches_grid_v7_1"), disabled=["id"])
         c1,c2,c3 = st.columns(3)
         if c1.button("Spremi izmjene (treneri)"):
-            for _, r in edited.iterrows():
-                conn.execute("""UPDATE coaches SET first_name=?, last_name=?, dob=?, oib=?, email=?, iban=?, group_name=? WHERE id=?""",
-                             (str(r.get("first_name","")),str(r.get("last_name","")),str(r.get("dob",""))[:10],str(r.get("oib","")),str(r.get("email","")),str(r.get("iban","")),str(r.get("group_name","")),int(r["id"])))
-            conn.commit(); st.success("Izmjene spremljene.")
+            save_grid(conn, coaches_df, edited, "coaches_grid_v7_1", "coaches", grid.COACHES_COLUMNS, "coaches", "competition_coaches")
         del_id = c2.number_input("ID za brisanje", min_value=0, step=1, value=0)
         if c3.button("Obriši trenera") and del_id>0:
-            conn.execute("DELETE FROM coaches WHERE id=?", (int(del_id),)); conn.commit(); st.success("Trener obrisan."); st.rerun()
+            coaches.delete(conn, del_id); bump("coaches", "competition_coaches"); st.success("Trener obrisan."); st.rerun()
     conn.close()
 
 # ---- Sekcija 4: Natjecanja i rezultati ----
 def section_competitions():
+    import pandas as pd
+    from hkpodravka import bouts, competitions, images, stats, uploads
     page_header("Natjecanja i rezultati", "Unos natjecanja + rezultata")
     conn = get_conn()
     kind = st.selectbox("Vrsta", ["PRVENSTVO HRVATSKE","MEĐUNARODNI TURNIR","REPREZENTATIVNI NASTUP","HRVAČKA LIGA ZA SENIORE","MEĐUNARODNA HRVAČKA LIGA ZA KADETE","REGIONALNO PRVENSTVO","LIGA ZA DJEVOJČICE","OSTALO"])
@@ -388,23 +327,27 @@ def section_competitions():
     total_n = n3.number_input("Uk. natjecatelja", min_value=0, step=1)
     clubs_n = n4.number_input("Broj klubova", min_value=0, step=1)
     countries_n = n5.number_input("Broj zemalja", min_value=0, step=1)
+    coach_names = reference.coach_names(conn)
+    comp_coaches = st.multiselect("Treneri", options=list(coach_names), format_func=lambda c: coach_names.get(c, c))
     notes = st.text_area("Zapažanje trenera / opis")
     gallery = st.file_uploader("Slike (višestruko)", type=["png","jpg","jpeg"], accept_multiple_files=True)
     bulletin_url = st.text_input("Poveznica na rezultate / bilten"); website_link = st.text_input("Poveznica na objavu na webu")
     if st.button("Spremi natjecanje"):
-        paths = [save_upload(f,"competitions/gallery") for f in (gallery or [])]
-        conn.execute("""INSERT INTO competitions(kind,kind_other,name,date_from,date_to,place,style,age_cat,country,country_iso3,team_rank,club_competitors,total_competitors,clubs_count,countries_count,coaches_json,notes,bulletin_url,website_link,gallery_paths_json)
-                        VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                     (kind,kind_other,name,date_from.isoformat(),date_to.isoformat(),place,style,age,country,iso3,int(team_rank),int(club_n),int(total_n),int(clubs_n),int(countries_n),"[]",notes,bulletin_url,website_link,json.dumps(paths)))
-        conn.commit(); st.success("Natjecanje spremljeno.")
+        paths = [uploads.store(f) for f in (gallery or [])]
+        if paths: jobs.submit(conn, "images", {"paths": paths})
+        competitions.save(conn, {"kind": kind, "kind_other": kind_other, "name": name, "date_from": date_from.isoformat(), "date_to": date_to.isoformat(),
+                                 "place": place, "style": style, "age_cat": age, "country": country, "country_iso3": iso3,
+                                 "team_rank": int(team_rank), "club_competitors": int(club_n), "total_competitors": int(total_n),
+                                 "clubs_count": int(clubs_n), "countries_count": int(countries_n), "notes": notes,
+                                 "bulletin_url": bulletin_url, "website_link": website_link, "gallery_paths_json": json.dumps(paths)},
+                          comp_coaches, coach_names)
+        bump("competitions", "competition_coaches"); st.success("Natjecanje spremljeno.")
     st.markdown("---"); st.markdown("### Rezultati")
-    comps = pd.read_sql_query("SELECT id, COALESCE(name, kind) AS title, date_from FROM competitions ORDER BY date_from DESC", conn)
-    comp_opts = {f"{r['id']} – {r['title']} ({r['date_from']})": r['id'] for _, r in comps.iterrows()}
-    comp_sel = st.selectbox("Odaberi natjecanje", options=["-"] + list(comp_opts.keys()))
-    mems = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS full FROM members ORDER BY last_name, first_name", conn)
-    mem_opts = {f"{r['id']} – {r['full']}": r['id'] for _, r in mems.iterrows()}
+    comp_opts = reference.competition_options(conn)
+    comp_sel = st.selectbox("Odaberi natjecanje", options=["-"] + list(comp_opts))
     if comp_sel != "-":
         comp_id = comp_opts[comp_sel]
+        mem_opts = reference.member_options(conn)
         mem_sel = st.selectbox("Član", options=["-"] + list(mem_opts.keys()))
         if mem_sel != "-":
             member_id = mem_opts[mem_sel]
@@ -415,27 +358,39 @@ def section_competitions():
             wins = c1.number_input("Pobjede", min_value=0, step=1)
             losses = c2.number_input("Porazi", min_value=0, step=1)
             placement = c3.number_input("Plasman (1–100)", min_value=0, max_value=100, step=1)
-            wins_d = st.text_area("Pobjede – unesite stavke odvojene | (npr. 'Ivo Ivić;HKX | Marko Markić;HKY')")
-            losses_d = st.text_area("Porazi – unesite stavke odvojene |")
+            st.caption("Borbe – jedan redak po borbi (protivnik, klub, rezultat borbe, kolo)")
+            bouts_df = st.data_editor(pd.DataFrame(columns=bouts.EDITOR_COLUMNS), num_rows="dynamic", use_container_width=True, key=grid_key("result_bouts"),
+                                      column_config={"ishod": st.column_config.SelectboxColumn("ishod", options=list(bouts.OUTCOMES), default="Pobjeda")})
             note = st.text_area("Napomena trenera")
             if st.button("Spremi rezultat"):
-                conn.execute("""INSERT INTO results(competition_id,member_id,category,style,fights_total,wins,losses,placement,wins_detail_json,losses_detail_json,note)
-                                VALUES(?,?,?,?,?,?,?,?,?,?,?)""",
-                             (comp_id, member_id, category, stl, int(fights), int(wins), int(losses), int(placement),
-                              json.dumps([s for s in wins_d.split('|') if s.strip()]), json.dumps([s for s in losses_d.split('|') if s.strip()]), note))
-                conn.commit(); st.success("Rezultat spremljen.")
+                competitions.add_result(conn, comp_id, member_id, {"category": category, "style": stl, "fights_total": int(fights), "wins": int(wins),
+                                                                   "losses": int(losses), "placement": int(placement), "note": note},
+                                        bouts.from_editor(bouts_df))
+                bump("results", "bouts"); st.success("Rezultat spremljen.")
+                st.session_state["result_bouts_rev"] = st.session_state.get("result_bouts_rev", 0) + 1
+        # galerija: samo umanjene slike; srednja veličina tek za odabranu sliku
+        gallery_paths = [p for p in competitions.gallery_paths(conn, comp_id) if images.is_image(p)]
+        if gallery_paths:
+            with st.expander(f"Galerija ({len(gallery_paths)})"):
+                per_page = 24
+                page = st.number_input("Stranica", min_value=1, max_value=-(-len(gallery_paths) // per_page), value=1, step=1, key=f"gallery_page_{comp_id}") - 1
+                shown = gallery_paths[page * per_page:(page + 1) * per_page]
+                cols = st.columns(6)
+                for i, p in enumerate(shown):
+                    cols[i % 6].image(images.derive(p, "thumb"), caption=str(page * per_page + i + 1))
+                pick = st.selectbox("Prikaži veću", ["-"] + [str(page * per_page + i + 1) for i in range(len(shown))], key=f"gallery_pick_{comp_id}")
+                if pick != "-":
+                    st.image(images.derive(gallery_paths[int(pick) - 1], "medium"))
     year = st.number_input("Godina za izvoz", min_value=2000, max_value=2100, value=datetime.now().year, step=1)
-    df = pd.read_sql_query("""SELECT c.date_from, c.kind, c.name, c.place, c.style, c.age_cat, r.member_id,
-           (SELECT first_name || ' ' || last_name FROM members m WHERE m.id=r.member_id) AS sportas,
-           r.category, r.fights_total, r.wins, r.losses, r.placement
-        FROM results r JOIN competitions c ON r.competition_id=c.id WHERE substr(c.date_from,1,4)=?
-        ORDER BY c.date_from DESC""", conn, params=(str(year),))
+    df = stats.year_results(conn, year)
     st.dataframe(df, use_container_width=True)
-    st.download_button("Skini rezultate (Excel)", data=excel_bytes(df,"Rezultati"), file_name=f"rezultati_{year}.xlsx", disabled=df.empty)
+    job_export("rezultati (Excel)", f"rezultati_{year}.xlsx", ("results", int(year)), "export",
+               {"export": "year_results", "filters": {"year": int(year)}}, disabled=df.empty)
     conn.close()
 
 # ---- Sekcija 5: Statistika ----
 def section_stats():
+    from hkpodravka import bouts, stats
     page_header("Statistika", "Po godini, vrsti i stilu")
     conn = get_conn()
     st.subheader("Napredni filtri")
@@ -445,190 +400,89 @@ def section_stats():
     with c2:
         year_to = st.number_input("Godina do", min_value=2000, max_value=2100, value=datetime.now().year, step=1)
     with c3:
-        group_filter = st.selectbox("Grupa", options=["(sve)"] + pd.read_sql_query("SELECT DISTINCT COALESCE(group_name,'') AS g FROM members ORDER BY g", conn)['g'].fillna('').tolist())
+        group_filter = st.selectbox("Grupa", options=[stats.ALL_GROUPS] + reference.member_group_names(conn))
+    coaches_list = stats.competition_coaches(conn)
+    coach_names = dict(zip(coaches_list['id'].tolist(), coaches_list['ime'].tolist()))
     with c4:
-        _tmp=[]
-        try:
-            _d = pd.read_sql_query("SELECT DISTINCT json_each.value AS coach FROM competitions, json_each(competitions.coaches_json) ORDER BY 1", conn)
-        except Exception:
-            _d = pd.DataFrame({'coach': []})
-        coach_filter = st.selectbox("Trener", options=["(svi)"] + _d['coach'].fillna('').tolist() if not _d.empty else ["(svi)"])
+        coach_filter = st.selectbox("Trener", options=[stats.ALL_COACHES] + list(coach_names), format_func=lambda c: coach_names.get(c, c))
     year = year_to
-    where, pars = _stats_where_clause(group_filter, coach_filter, year_from, year_to)
-    df = pd.read_sql_query(f"""SELECT c.kind, c.age_cat, r.style,
-        SUM(r.fights_total) AS borbi, SUM(r.wins) AS pobjede, SUM(r.losses) AS porazi,
-        SUM(CASE WHEN r.placement=1 THEN 1 ELSE 0 END) AS zlato,
-        SUM(CASE WHEN r.placement=2 THEN 1 ELSE 0 END) AS srebro,
-        SUM(CASE WHEN r.placement=3 THEN 1 ELSE 0 END) AS bronca
-        FROM competitions c JOIN results r ON r.competition_id=c.id
-        {where}
-        GROUP BY c.kind, c.age_cat, r.style
-        ORDER BY c.kind, c.age_cat""", conn, params=pars)
+    df = stats.summary(conn, year_from, year_to, group_filter, coach_filter)
     st.dataframe(df, use_container_width=True)
-    st.download_button("Skini statistiku (Excel)", data=excel_bytes(df, "Statistika"), file_name=f"stat_{year}.xlsx", disabled=df.empty)
-    conn.close()
+    export_button("statistika (Excel)", f"stat_{year}.xlsx", ("stats", year_from, year_to, group_filter, coach_filter),
+                  lambda: [export.frame_sheet("Statistika", df)], stats.STATS_TABLES, disabled=df.empty)
 
     st.divider()
     st.subheader("Grafovi")
     # Po godinama – broj borbi i medalje
-    df_y = pd.read_sql_query("""SELECT substr(c.date_from,1,4) AS godina,
-        SUM(r.fights_total) AS borbi,
-        SUM(CASE WHEN r.placement=1 THEN 1 ELSE 0 END) AS zlato,
-        SUM(CASE WHEN r.placement=2 THEN 1 ELSE 0 END) AS srebro,
-        SUM(CASE WHEN r.placement=3 THEN 1 ELSE 0 END) AS bronca
-        FROM competitions c JOIN results r ON r.competition_id=c.id
-        GROUP BY substr(c.date_from,1,4)
-        ORDER BY godina""", conn)
+    df_y = stats.per_year(conn)
     if not df_y.empty:
         st.bar_chart(df_y.set_index('godina')[['borbi']])
         st.bar_chart(df_y.set_index('godina')[['zlato','srebro','bronca']])
 
     # Po uzrastima
-    df_u = pd.read_sql_query("""SELECT c.age_cat AS uzrast,
-        SUM(r.wins) AS pobjede, SUM(r.losses) AS porazi
-        FROM competitions c JOIN results r ON r.competition_id=c.id
-        WHERE substr(c.date_from,1,4)=?
-        GROUP BY c.age_cat
-        ORDER BY c.age_cat""", conn, params=(str(year),))
+    df_u = stats.per_age(conn, year)
     if not df_u.empty:
         st.bar_chart(df_u.set_index('uzrast')[['pobjede','porazi']])
 
     # Po vrsti natjecanja
+    df_k = stats.per_kind(conn, year)
+    if not df_k.empty:
+        st.bar_chart(df_k.set_index('natjecanje')[['broj_natjecanja','medalje']])
 
     st.divider()
     st.subheader("Per-sportaš (po godinama)")
-    athletes = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime FROM members ORDER BY last_name, first_name", conn)
-    sel_ath = st.selectbox("Sportaš", options=["(odaberi)"] + athletes['ime'].tolist())
+    aid = None
+    athlete_opts = reference.member_options(conn)
+    sel_ath = st.selectbox("Sportaš", options=["(odaberi)"] + list(athlete_opts))
     if sel_ath != "(odaberi)":
-        aid = int(athletes.loc[athletes['ime']==sel_ath,'id'].values[0])
-        dfa = pd.read_sql_query("""
-            SELECT substr(c.date_from,1,4) AS godina,
-                   SUM(r.fights_total) AS borbi,
-                   SUM(r.wins) AS pobjede,
-                   SUM(r.losses) AS porazi,
-                   SUM(CASE WHEN r.placement IN (1,2,3) THEN 1 ELSE 0 END) AS medalje
-            FROM competitions c JOIN results r ON r.competition_id=c.id
-            WHERE r.member_id=?
-            GROUP BY substr(c.date_from,1,4)
-            ORDER BY godina
-        """, conn, params=(aid,))
+        aid = athlete_opts[sel_ath]
+        dfa = stats.per_athlete(conn, aid)
         if not dfa.empty:
             st.bar_chart(dfa.set_index('godina')[['borbi','pobjede','porazi','medalje']])
 
+        h2h = bouts.head_to_head(conn, aid)
+        if not h2h.empty:
+            st.markdown("**Protiv protivnika**"); st.dataframe(h2h, use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.subheader("Protivnici i klubovi")
+    clubs = bouts.clubs(conn); club_counts = dict(zip(clubs["klub"], clubs["borbi"]))
+    club_sel = st.selectbox("Klub protivnika", options=["(odaberi)"] + list(club_counts),
+                            format_func=lambda k: f"{k} ({club_counts[k]} borbi)" if k in club_counts else k)
+    if club_sel != "(odaberi)":
+        rec = bouts.club_record(conn, club_sel, year_from, year_to)
+        if rec.empty:
+            st.info(f"Nema borbi protiv kluba {club_sel} od {year_from}. do {year_to}.")
+        else:
+            w, l = int(rec["pobjede"].sum()), int(rec["porazi"].sum())
+            st.metric(f"Omjer protiv {club_sel} ({year_from}–{year_to})", f"{w} : {l}")
+            st.dataframe(rec, use_container_width=True, hide_index=True)
+    opp = bouts.opponents(conn, year_from, year_to)
+    if not opp.empty:
+        st.markdown("**Najčešći protivnici**"); st.dataframe(opp, use_container_width=True, hide_index=True)
+
     st.divider()
     st.subheader("Per-trener (po godinama)")
-    try:
-        coaches_list = pd.read_sql_query("SELECT DISTINCT json_each.value AS coach FROM competitions, json_each(competitions.coaches_json) ORDER BY 1", conn)
-    except Exception:
-        coaches_list = pd.DataFrame({'coach': []})
-    sel_coach = st.selectbox("Trener", options=["(odaberi)"] + coaches_list['coach'].fillna('').tolist()) if not coaches_list.empty else "(odaberi)"
+    sel_coach = st.selectbox("Trener", options=["(odaberi)"] + list(coach_names), format_func=lambda c: coach_names.get(c, c), key="stats_coach_sel") if coach_names else "(odaberi)"
     if sel_coach != "(odaberi)":
-        dfc = pd.read_sql_query("""
-            SELECT substr(c.date_from,1,4) AS godina,
-                   COUNT(DISTINCT c.id) AS broj_natjecanja,
-                   SUM(CASE WHEN r.placement IN (1,2,3) THEN 1 ELSE 0 END) AS medalje
-            FROM competitions c JOIN results r ON r.competition_id=c.id
-            WHERE EXISTS (SELECT 1 FROM json_each(c.coaches_json) j WHERE j.value = ?)
-            GROUP BY substr(c.date_from,1,4)
-            ORDER BY godina
-        """, conn, params=(sel_coach,))
+        dfc = stats.per_coach(conn, sel_coach)
         if not dfc.empty:
             st.bar_chart(dfc.set_index('godina')[['broj_natjecanja','medalje']])
 
     st.divider()
     st.subheader("Izvoz napredne statistike (Excel)")
-    import io
-    out = io.BytesIO()
-    with pd.ExcelWriter(out, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Sažetak')
-        try:
-            df_y.to_excel(writer, index=False, sheet_name='Po_godinama')
-        except Exception: pass
-        try:
-            df_u.to_excel(writer, index=False, sheet_name='Po_uzrastima')
-        except Exception: pass
-        try:
-            df_k.to_excel(writer, index=False, sheet_name='Po_vrsti')
-        except Exception: pass
-        try:
-            dfa.to_excel(writer, index=False, sheet_name='Sportas_godine')
-        except Exception: pass
-        try:
-            dfc.to_excel(writer, index=False, sheet_name='Trener_godine')
-        except Exception: pass
-    st.download_button("Skini Excel (sve tablice)", data=out.getvalue(), file_name=f"statistike_{year_from}-{year_to}.xlsx")
-
-    # Po vrsti natjecanja
-    df_k = pd.read_sql_query("""SELECT c.kind AS natjecanje,
-        COUNT(DISTINCT c.id) AS broj_natjecanja,
-        SUM(CASE WHEN r.placement IN (1,2,3) THEN 1 ELSE 0 END) AS medalje
-        FROM competitions c JOIN results r ON r.competition_id=c.id
-        WHERE substr(c.date_from,1,4)=?
-        GROUP BY c.kind ORDER BY broj_natjecanja DESC""", conn, params=(str(year),))
-    if not df_k.empty:
-        st.bar_chart(df_k.set_index('natjecanje')[['broj_natjecanja','medalje']])
-
-# ---- App ----
-def main():
-    st.set_page_config(page_title="HK Podravka – Admin", layout="wide")
-    css_style()
-    init_db()
-    menu = st.sidebar.radio("Izbornik", ["Klub", "Članovi", "Treneri", "Natjecanja i rezultati", "Statistika", "Grupe", "Veterani", "Prisustvo"])
-    if menu == "Klub": section_club()
-    elif menu == "Članovi": section_members()
-    elif menu == "Treneri": section_coaches()
-    elif menu == "Natjecanja i rezultati": section_competitions()
-    elif menu == "Statistika": section_stats()
-    elif menu == "Grupe": section_groups()
-    elif menu == "Veterani": section_veterans()
-    else: section_attendance()
-
-if __name__ == "__main__":
-    main()
-
-
-def ensure_extra_tables(conn):
-    cur = conn.cursor()
-    # Grupe
-    cur.execute("""CREATE TABLE IF NOT EXISTS groups (
-        name TEXT PRIMARY KEY,
-        description TEXT DEFAULT ''
-    )""")
-    # Trening sesije (prisustvo)
-    cur.execute("""CREATE TABLE IF NOT EXISTS training_sessions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        trainer_id INTEGER,
-        trainer_name TEXT,
-        group_name TEXT,
-        start_dt TEXT,
-        end_dt TEXT,
-        location TEXT,
-        rep_prep INTEGER DEFAULT 0
-    )""")
-    # Raspored grupa s trenerima
-    cur.execute("""CREATE TABLE IF NOT EXISTS group_schedules (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        group_name TEXT,
-        coach_id INTEGER,
-        coach_name TEXT,
-        day_of_week INTEGER,  -- 0=Mon .. 6=Sun
-        start_time TEXT,  -- 'HH:MM'
-        end_time TEXT,
-        location TEXT
-    )""")
-    # Evidencija prisustva po članu
-    cur.execute("""CREATE TABLE IF NOT EXISTS attendance (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        session_id INTEGER,
-        member_id INTEGER,
-        present INTEGER DEFAULT 1,
-        UNIQUE(session_id, member_id)
-    )""")
-    conn.commit()
-
+    job_export("sve tablice (Excel)", f"statistike_{year_from}-{year_to}.xlsx",
+               ("stats_all", year_from, year_to, group_filter, coach_filter, sel_ath, sel_coach), "stats_export",
+               {"year_from": int(year_from), "year_to": int(year_to), "group": group_filter, "coach": coach_filter,
+                "athlete_id": aid, "coach_id": None if sel_coach == "(odaberi)" else sel_coach})
+    ci = stats.CACHE.info()
+    st.caption(f"Predmemorija statistike: {ci['hits']} pogodaka, {ci['misses']} promašaja, {ci['size']}/{ci['maxsize']} unosa")
+    conn.close()
 
 # ---- Sekcija: Grupe ----
 def section_groups():
+    import pandas as pd
+    from hkpodravka import members
     st.header("Grupe")
     conn = get_conn()
     cur = conn.cursor()
@@ -644,7 +498,7 @@ def section_groups():
         if submitted:
             if g_name.strip():
                 cur.execute("INSERT OR REPLACE INTO groups (name, description) VALUES (?,?)", (g_name.strip(), g_desc.strip()))
-                conn.commit()
+                conn.commit(); bump("groups")
                 st.success("Grupa spremljena.")
             else:
                 st.warning("Upišite naziv grupe.")
@@ -654,28 +508,28 @@ def section_groups():
     st.divider()
 
     st.subheader("Članovi i grupe")
-    members_df = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime, COALESCE(group_name,'') AS grupa FROM members ORDER BY last_name, first_name", conn)
-    all_groups = [""] + grp_df["grupa"].tolist()
-    sel_member = st.selectbox("Odaberi člana", options=members_df["ime"].tolist() if not members_df.empty else ["-"])
-    if sel_member:
-        current_group = members_df.loc[members_df['ime']==sel_member, 'grupa'].values[0]
+    member_opts = reference.member_options(conn)
+    all_groups = [""] + reference.group_names(conn)
+    sel_member = st.selectbox("Odaberi člana", options=list(member_opts) or ["-"])
+    if sel_member in member_opts:
+        mem_id = member_opts[sel_member]
+        current_group = reference.member_groups(conn).get(mem_id, "")
         new_group = st.selectbox("Dodijeli u grupu", options=all_groups, index=all_groups.index(current_group) if current_group in all_groups else 0)
         if st.button("Spremi dodjelu/premještanje"):
-            mem_id = int(members_df.loc[members_df['ime']==sel_member, 'id'].values[0])
             cur.execute("UPDATE members SET group_name=? WHERE id=?", (new_group if new_group else None, mem_id))
-            conn.commit()
+            conn.commit(); bump("members")
             st.success("Član ažuriran.")
-            st.experimental_rerun()
+            st.rerun()
 
     # Raspored: spajanje grupa s trenerima po rasporedu
     st.subheader("Raspored grupa")
-    coaches_df = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime FROM coaches ORDER BY last_name, first_name", conn)
+    coach_opts = reference.coach_options(conn)
     if grp_df.empty:
         st.info("Prvo dodajte barem jednu grupu.")
     else:
         with st.form("grp_sched_form", clear_on_submit=True):
             sg = st.selectbox("Grupa", options=grp_df['grupa'].tolist())
-            sc = st.selectbox("Trener", options=(coaches_df['ime'].tolist() if not coaches_df.empty else ["-"]))
+            sc = st.selectbox("Trener", options=list(coach_opts) or ["-"])
             sdow = st.selectbox("Dan u tjednu", options=[("Ponedjeljak",0),("Utorak",1),("Srijeda",2),("Četvrtak",3),("Petak",4),("Subota",5),("Nedjelja",6)], format_func=lambda x: x[0])
             colt = st.columns(3)
             with colt[0]: stime = st.time_input("Početak")
@@ -685,11 +539,9 @@ def section_groups():
                 if sc == "-":
                     st.warning("Dodajte trenere.")
                 else:
-                    crow = coaches_df.loc[coaches_df['ime']==sc]
-                    cid = int(crow['id'].values[0]) if not crow.empty else None
                     cur.execute("INSERT INTO group_schedules (group_name, coach_id, coach_name, day_of_week, start_time, end_time, location) VALUES (?,?,?,?,?,?,?)",
-                                (sg, cid, sc, sdow[1], stime.strftime('%H:%M'), etime.strftime('%H:%M'), loc))
-                    conn.commit(); st.success("Dodano u raspored.")
+                                (sg, coach_opts.get(sc), sc, sdow[1], stime.strftime('%H:%M'), etime.strftime('%H:%M'), loc))
+                    conn.commit(); bump("group_schedules"); st.success("Dodano u raspored.")
 
     # Pregled rasporeda
     sched_df = pd.read_sql_query("SELECT id, group_name AS grupa, coach_name AS trener, day_of_week AS dan, start_time AS pocetak, end_time AS kraj, location AS lokacija FROM group_schedules ORDER BY day_of_week, start_time", conn)
@@ -700,37 +552,31 @@ def section_groups():
         del_id = st.number_input("ID stavke za brisanje", min_value=0, value=0, step=1)
         if st.button("Obriši stavku rasporeda") and del_id>0:
             cur.execute("DELETE FROM group_schedules WHERE id=?", (int(del_id),))
-            conn.commit(); st.success("Obrisano.")
+            conn.commit(); bump("group_schedules"); st.success("Obrisano.")
 
     # Excel export/import grupa
     st.subheader("Excel import/export (grupe)")
-    export_df = pd.read_sql_query("SELECT first_name AS ime, last_name AS prezime, COALESCE(group_name,'') AS grupa FROM members ORDER BY last_name, first_name", conn)
-    excel_buf = io.BytesIO()
-    with pd.ExcelWriter(excel_buf, engine="xlsxwriter") as writer:
-        export_df.to_excel(writer, index=False, sheet_name="grupe")
-    st.download_button("Skini Excel grupe", data=excel_buf.getvalue(), file_name="grupe_export.xlsx")
-    up = st.file_uploader("Upload Excel grupe (kolone: ime, prezime, grupa)", type=["xlsx"], key="grupe_xlsx_up")
-    if up is not None:
+    job_export("grupe (Excel)", "grupe_export.xlsx", ("groups",), "export", {"export": "groups"})
+    up = st.file_uploader("Upload Excel grupe (kolone: ime, prezime, grupa; po želji oib)", type=["xlsx"], key="grupe_xlsx_up")
+    if up is not None and st.session_state.get("groups_import_id") != getattr(up, "file_id", up.name):
         try:
-            df_up = pd.read_excel(up)
-            for _, r in df_up.iterrows():
-                g = str(r.get("grupa","") or "").strip()
-                ime = str(r.get("ime","")).strip()
-                prez = str(r.get("prezime","")).strip()
-                if not ime or not prez:
-                    continue
-                row = pd.read_sql_query("SELECT id FROM members WHERE first_name=? AND last_name=? LIMIT 1", conn, params=(ime, prez))
-                if not row.empty:
-                    mem_id = int(row.iloc[0]["id"])
-                    cur.execute("UPDATE members SET group_name=? WHERE id=?", (g if g else None, mem_id))
-            conn.commit()
-            st.success("Grupe su uvezene.")
+            st.session_state["groups_import_report"] = members.assign_groups(conn, pd.read_excel(up))
+            st.session_state["groups_import_id"] = getattr(up, "file_id", up.name)
+            bump("members")
         except Exception as e:
             st.error(f"Greška pri uvozu: {e}")
+    if up is not None and "groups_import_report" in st.session_state:
+        report = st.session_state["groups_import_report"]
+        missed = report[report["member_id"].isna()]
+        (st.warning if len(missed) else st.success)(f"Grupe su uvezene: upisano {len(report) - len(missed)}, nije upisano {len(missed)}.")
+        if len(missed):
+            st.dataframe(missed.drop(columns=["member_id"]), use_container_width=True, hide_index=True)
+    conn.close()
 
 
 # ---- Sekcija: Veterani ----
 def section_veterans():
+    import pandas as pd
     st.header("Veterani")
     conn = get_conn()
     df = pd.read_sql_query("""
@@ -760,6 +606,8 @@ def section_veterans():
 
 # ---- Sekcija: Prisustvo ----
 def section_attendance():
+    import pandas as pd
+    from hkpodravka import attendance, attendance_stats, lookup, schedule
     st.header("Prisustvo")
     conn = get_conn()
     cur = conn.cursor()
@@ -769,55 +617,89 @@ def section_attendance():
     st.caption("Brzo stvaranje termina iz tjednog rasporeda")
     colq = st.columns(3)
     with colq[0]:
-        _dfgs = pd.read_sql_query("SELECT DISTINCT group_name FROM group_schedules ORDER BY group_name", conn)
-        q_group = st.selectbox("Grupa (raspored)", options=_dfgs["group_name"].tolist() if not _dfgs.empty else ["-"])
+        sched_groups = reference.schedule_groups(conn)
+        q_group = st.selectbox("Grupa (raspored)", options=sched_groups or ["-"])
     with colq[1]:
         q_day = st.selectbox("Dan", options=[("Danas", -1),("Ponedjeljak",0),("Utorak",1),("Srijeda",2),("Četvrtak",3),("Petak",4),("Subota",5),("Nedjelja",6)], index=0, format_func=lambda x: x[0])
     with colq[2]:
         q_loc_override = st.text_input("Lokacija (po želji nadjačaj)")
     if st.button("Kreiraj današnji trening iz rasporeda") and q_group != "-":
-        import datetime
-        wd = datetime.datetime.now().weekday() if q_day[1] == -1 else q_day[1]
-        rows = pd.read_sql_query("SELECT * FROM group_schedules WHERE group_name=? AND day_of_week=? ORDER BY start_time", conn, params=(q_group, int(wd)))
-        if rows.empty:
-            st.warning("Nema stavki rasporeda za odabrani dan.")
+        # "Danas" ili najbliži odabrani dan u tjednu (od danas)
+        today = date.today()
+        day = today if q_day[1] == -1 else today + timedelta(days=(q_day[1] - today.weekday()) % 7)
+        added, existing, closed = schedule.generate(conn, day, day, groups=[q_group], location=q_loc_override or None)
+        if added:
+            bump("training_sessions"); st.success(f"Kreirani treninzi prema rasporedu ({day.strftime('%d.%m.%Y.')}): {added}.")
+        elif closed:
+            st.warning("Odabrani dan je u kalendaru kluba označen kao zatvoren.")
+        elif existing:
+            st.info("Treninzi za taj dan već postoje.")
         else:
-            for _, rr in rows.iterrows():
-                today = datetime.datetime.now().date()
-                stime = datetime.datetime.combine(today, datetime.time.fromisoformat(rr["start_time"]))
-                etime = datetime.datetime.combine(today, datetime.time.fromisoformat(rr["end_time"]))
-                cur.execute("""INSERT INTO training_sessions (trainer_id, trainer_name, group_name, start_dt, end_dt, location, rep_prep)
-                               VALUES (?,?,?,?,?,?,0)""", (rr["coach_id"], rr["coach_name"], rr["group_name"], stime.isoformat(), etime.isoformat(), (q_loc_override or rr["location"])))
-            conn.commit(); st.success("Kreirani treninzi prema rasporedu.")
+            st.warning("Nema stavki rasporeda za odabrani dan.")
+
+    with st.expander("Generiraj treninge za sezonu"):
+        today = date.today()
+        season_start = date(today.year if today.month >= 9 else today.year - 1, 9, 1)
+        g1,g2 = st.columns(2)
+        gen_from = g1.date_input("Od", value=season_start, key="gen_from")
+        gen_to = g2.date_input("Do", value=date(season_start.year + 1, 6, 30), key="gen_to")
+        gen_groups = st.multiselect("Grupe (prazno = sve iz rasporeda)", options=sched_groups, key="gen_groups")
+        if st.button("Generiraj treninge"):
+            added, existing, closed = schedule.generate(conn, gen_from, gen_to, groups=gen_groups or None)
+            bump("training_sessions")
+            st.success(f"Dodano treninga: {added}, već postoji: {existing}, preskočeno (kalendar): {closed}.")
+
+        st.markdown("**Kalendar kluba (praznici i zatvoreni dani)**")
+        k1,k2,k3 = st.columns([1,2,1])
+        closed_day = k1.date_input("Dan", value=today, key="cal_day")
+        closed_note = k2.text_input("Napomena", key="cal_note")
+        if k3.button("Zatvori dan"):
+            conn.execute("INSERT OR REPLACE INTO club_calendar(day, kind, note) VALUES (?, 'zatvoreno', ?)", (closed_day.isoformat(), closed_note))
+            conn.commit(); st.success("Dan dodan u kalendar.")
+        if st.button(f"Dodaj državne praznike ({gen_from.year}. i {gen_to.year}.)"):
+            n = sum(schedule.add_holidays(conn, y) for y in range(gen_from.year, gen_to.year + 1))
+            st.success(f"Dodano praznika: {n}.")
+        cal_df = pd.read_sql_query("SELECT day AS dan, kind AS vrsta, note AS napomena FROM club_calendar WHERE day BETWEEN ? AND ? ORDER BY day",
+                                   conn, params=(gen_from.isoformat(), gen_to.isoformat()))
+        if not cal_df.empty:
+            st.dataframe(cal_df, use_container_width=True, hide_index=True)
+            del_day = st.selectbox("Ukloni dan iz kalendara", ["-"] + cal_df["dan"].tolist(), key="cal_del")
+            if st.button("Ukloni") and del_day != "-":
+                conn.execute("DELETE FROM club_calendar WHERE day=?", (del_day,)); conn.commit(); st.rerun()
 
     # Treneri i grupe
-    coaches = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime FROM coaches ORDER BY last_name, first_name", conn)
-    groups = pd.read_sql_query("SELECT name FROM groups ORDER BY name", conn)
+    coach_opts = reference.coach_options(conn)
     col = st.columns(2)
     with col[0]:
-        trainer_name = st.selectbox("Trener", options=coaches["ime"].tolist() if not coaches.empty else ["-"], index=0)
+        trainer_name = st.selectbox("Trener", options=list(coach_opts) or ["-"], index=0)
     with col[1]:
-        group_name = st.selectbox("Grupa", options=groups["name"].tolist() if not groups.empty else ["-"], index=0)
+        group_name = st.selectbox("Grupa", options=reference.group_names(conn) or ["-"], index=0)
 
-    col2 = st.columns(3)
+    # st.datetime_input ne postoji u Streamlitu 1.38 – datum i vrijeme zasebno
+    start_default = datetime.now().replace(minute=0, second=0, microsecond=0)
+    end_default = start_default + timedelta(hours=1)
+    col2 = st.columns(5)
     with col2[0]:
-        start_dt = st.datetime_input("Vrijeme početka", value=datetime.now().replace(minute=0, second=0, microsecond=0))
+        start_day = st.date_input("Datum početka", value=start_default.date(), key="session_start_day")
     with col2[1]:
-        end_dt = st.datetime_input("Vrijeme završetka", value=datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+        start_time = st.time_input("Vrijeme početka", value=start_default.time(), key="session_start_time")
     with col2[2]:
+        end_day = st.date_input("Datum završetka", value=end_default.date(), key="session_end_day")
+    with col2[3]:
+        end_time = st.time_input("Vrijeme završetka", value=end_default.time(), key="session_end_time")
+    with col2[4]:
         location = st.text_input("Lokacija", "")
+    start_dt, end_dt = datetime.combine(start_day, start_time), datetime.combine(end_day, end_time)
 
     rep_prep = st.checkbox("Pripreme reprezentacije", value=False)
     if st.button("Spremi trening"):
         if trainer_name == "-" or group_name == "-":
             st.warning("Dodajte trenere i grupe prije spremanja.")
         else:
-            trow = coaches.loc[coaches['ime']==trainer_name]
-            trainer_id = int(trow['id'].values[0]) if not trow.empty else None
             cur.execute("""INSERT INTO training_sessions (trainer_id, trainer_name, group_name, start_dt, end_dt, location, rep_prep)
                            VALUES (?,?,?,?,?,?,?)""",
-                        (trainer_id, trainer_name, group_name, start_dt.isoformat(), end_dt.isoformat(), location, 1 if rep_prep else 0))
-            conn.commit()
+                        (coach_opts.get(trainer_name), trainer_name, group_name, start_dt.isoformat(), end_dt.isoformat(), location, 1 if rep_prep else 0))
+            conn.commit(); bump("training_sessions")
             st.success("Trening je spremljen.")
 
     st.divider()
@@ -834,61 +716,175 @@ def section_attendance():
 
     # Članovi u grupi (plus ručno dodavanje)
     grp = sessions.iloc[idx]["group_name"]
-    members = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime FROM members WHERE group_name=? ORDER BY last_name, first_name", conn, params=(grp,))
-    extra_member = st.text_input("Dodaj člana iz druge grupe (ime i prezime, točan zapis)")
-    if st.button("Dodaj dodatnog člana"):
-        if extra_member.strip():
-            row = pd.read_sql_query("SELECT id FROM members WHERE first_name || ' ' || last_name = ? LIMIT 1", conn, params=(extra_member.strip(),))
-            if not row.empty:
-                mem_id = int(row.iloc[0]["id"])
-                cur.execute("INSERT OR IGNORE INTO attendance (session_id, member_id, present) VALUES (?,?,1)", (sel_session, mem_id))
-                conn.commit()
-                st.success("Član dodan.")
-            else:
-                st.warning("Član nije pronađen.")
-
-    # Popis i kvačice prisustva
-    att_df = pd.read_sql_query("""
-        SELECT m.id AS member_id, m.first_name || ' ' || m.last_name AS ime,
-               COALESCE(a.present, 0) AS prisutan
-        FROM members m
-        LEFT JOIN attendance a ON a.member_id = m.id AND a.session_id = ?
-        WHERE m.group_name=?
-        ORDER BY m.last_name, m.first_name
-    """, conn, params=(sel_session, grp))
-    for _, r in att_df.iterrows():
-        val = st.checkbox(r["ime"], value=bool(r["prisutan"]))
-        cur.execute("INSERT OR IGNORE INTO attendance (session_id, member_id, present) VALUES (?,?,?)", (sel_session, int(r["member_id"]), 1 if val else 0))
-        cur.execute("UPDATE attendance SET present=? WHERE session_id=? AND member_id=?", (1 if val else 0, sel_session, int(r["member_id"])))
-    conn.commit()
+    extra_q = st.text_input("Dodaj člana iz druge grupe (ime i prezime ili OIB)")
+    extra_opts = lookup.search(conn, extra_q) if extra_q.strip() else {}
+    e1, e2 = st.columns([3, 1])
+    extra_sel = e1.selectbox("Pronađeni članovi", list(extra_opts) or ["-"], key="extra_member_sel", disabled=not extra_opts)
+    if e2.button("Dodaj dodatnog člana"):
+        if extra_sel in extra_opts:
+            cur.execute("INSERT OR IGNORE INTO attendance (session_id, member_id, present) VALUES (?,?,1)", (sel_session, extra_opts[extra_sel]))
+            conn.commit(); bump("attendance")
+            st.success("Član dodan.")
+        else:
+            st.warning("Član nije pronađen.")
+
+    # Popis i kvačice prisustva – upis tek na potvrdu forme, samo promijenjeni retci
+    att_df = attendance.roster(conn, sel_session, grp)
+    if "attendance_msg" in st.session_state: st.success(st.session_state.pop("attendance_msg"))
+    if att_df.empty:
+        st.info("U grupi nema članova.")
+    else:
+        with st.form(f"attendance_form_{sel_session}"):
+            marked = {int(r.member_id): st.checkbox(r.ime, value=bool(r.prisutan), key=f"att_{sel_session}_{r.member_id}")
+                      for r in att_df.itertuples()}
+            submit_att = st.form_submit_button("Spremi prisustvo")
+        st.caption(f"Prisutno: {int(att_df['prisutan'].sum())}/{len(att_df)} (zabilježeno {int(att_df['zabiljezen'].sum())})")
+        if submit_att:
+            n = attendance.save(conn, sel_session, attendance.changed_rows(att_df, marked))
+            bump("attendance"); st.session_state["attendance_msg"] = f"Prisustvo spremljeno (upisano redaka: {n})."; st.rerun()
 
     st.divider()
     st.subheader("Statistika (mjesec) – treninzi i sati")
     year = st.number_input("Godina", min_value=2020, max_value=datetime.now().year, value=datetime.now().year, step=1)
     month = st.number_input("Mjesec", min_value=1, max_value=12, value=datetime.now().month, step=1)
-    stats_df = pd.read_sql_query("""
-        SELECT date(start_dt) AS datum,
-               CAST((julianday(end_dt) - julianday(start_dt)) * 24.0 AS REAL) AS sati
-        FROM training_sessions
-        WHERE strftime('%Y', start_dt)=? AND strftime('%m', start_dt)=?
-        ORDER BY start_dt
-    """, conn, params=(str(year), f"{int(month):02d}"))
+    first = date(int(year), int(month), 1)
+    stats_df = attendance_stats.sessions(conn, first, (first + timedelta(days=31)).replace(day=1) - timedelta(days=1))
     total_sessions = len(stats_df)
     total_hours = round(stats_df["sati"].sum(), 2) if not stats_df.empty else 0.0
     st.metric("Broj treninga", total_sessions)
     st.metric("Sati", total_hours)
 
-if __name__ == "__main__":
-    main()
+    st.divider()
+    st.subheader("Analitika prisustva")
+    today = date.today()
+    season_start = date(today.year if today.month >= 9 else today.year - 1, 9, 1)
+    r1,r2,r3 = st.columns(3)
+    a_from = r1.date_input("Od", value=season_start, key="att_from")
+    a_to = r2.date_input("Do", value=today, key="att_to")
+    a_group = r3.selectbox("Grupa", [attendance_stats.ALL_GROUPS] + reference.group_names(conn), key="att_group")
+    g_df = attendance_stats.group_rates(conn, a_from, a_to, a_group)
+    if g_df.empty:
+        st.info("Nema treninga u odabranom razdoblju.")
+    else:
+        st.dataframe(g_df, use_container_width=True, hide_index=True)
+        m_df = attendance_stats.member_rates(conn, a_from, a_to, a_group)
+        st.dataframe(m_df.drop(columns=["member_id"]), use_container_width=True, hide_index=True,
+                     column_config={"stopa": st.column_config.ProgressColumn("stopa", min_value=0.0, max_value=1.0, format="%.2f")})
+        w_df = attendance_stats.weekly_matrix(conn, a_from, a_to, a_group)
+        with st.expander("Po tjednima (broj treninga)"):
+            st.dataframe(w_df.drop(columns=["member_id"]), use_container_width=True, hide_index=True)
+        export_button("prisustvo (Excel)", f"prisustvo_{a_from}_{a_to}.xlsx", ("attendance", str(a_from), str(a_to), a_group),
+                      lambda: [export.frame_sheet("Grupe", g_df), export.frame_sheet("Clanovi", m_df),
+                               export.frame_sheet("Tjedni", w_df)], attendance_stats.ATTENDANCE_TABLES)
+    conn.close()
+
+
+# ---- Sekcija: Dokumenti ----
+def section_documents():
+    from hkpodravka import compliance
+    page_header("Dokumenti", "Liječnički pregled, osobna iskaznica i putovnica – istek")
+    conn = get_conn()
+    today = date.today().isoformat()
+    st.subheader("Uskoro istječe")
+    d1,d2 = st.columns(2)
+    group = d1.selectbox("Grupa", [compliance.ALL_GROUPS] + [g for g in reference.member_group_names(conn) if g], key="docs_group")
+    days = int(d2.number_input("Istječe u idućih (dana)", min_value=1, max_value=365, value=compliance.DIGEST_DAYS, step=1, key="docs_days"))
+    digest = compliance.digest(conn, today, group, days)
+    st.caption(f"Istekli u zadnjih {compliance.EXPIRED_DAYS} dana ili istječu do {date.today() + timedelta(days=days)}")
+    if digest.empty: st.success("Nema dokumenata koji uskoro istječu.")
+    else: st.dataframe(digest.drop(columns=["member_id"]), use_container_width=True, hide_index=True)
+    export_button("pregled dokumenata (Excel)", f"dokumenti_{today}.xlsx", ("documents", today, group, days),
+                  lambda: [export.frame_sheet("Dokumenti", digest)], ("members",), disabled=digest.empty)
+
+    st.subheader("Provjera za natjecanje")
+    comp_opts = reference.competition_options(conn)
+    comp_sel = st.selectbox("Natjecanje", ["-"] + list(comp_opts), key="docs_comp")
+    if comp_sel != "-":
+        mem_opts = reference.member_options(conn)
+        picked = st.multiselect("Sportaši (prazno = aktivni natjecatelji odabrane grupe)", list(mem_opts), key="docs_roster")
+        ids = [mem_opts[m] for m in picked] or None
+        issues = compliance.check_roster(conn, comp_opts[comp_sel], today, ids, group)
+        if issues.empty: st.success("Svi dokumenti vrijede do kraja natjecanja.")
+        else:
+            st.warning(f"Sportaša s neispravnim dokumentima: {issues['member_id'].nunique()}")
+            st.dataframe(issues.drop(columns=["member_id"]), use_container_width=True, hide_index=True)
+        export_button("provjera za natjecanje (Excel)", f"dokumenti_natjecanje_{comp_opts[comp_sel]}.xlsx",
+                      ("documents_comp", comp_opts[comp_sel], today, group, hash(tuple(ids or ()))),
+                      lambda: [export.frame_sheet("Natjecanje", issues)], ("members", "competitions"), disabled=issues.empty)
+    conn.close()
+
+# ---- Pretraga ----
+def section_search():
+    from hkpodravka import search
+    page_header("Pretraga", "Članovi, treneri, natjecanja i napomene rezultata")
+    conn = get_conn()
+    q1,q2 = st.columns([3,2])
+    text = q1.text_input("Traži (ime, OIB, grad, natjecanje, mjesto, napomena)", key="search_text")
+    kinds = q2.multiselect("Vrsta", list(search.KINDS), format_func=search.KIND_LABELS.get, key="search_kinds")
+    # nova pretraga kreće od prve stranice
+    if st.session_state.get("search_filters") != (text, tuple(kinds)):
+        st.session_state["search_filters"] = (text, tuple(kinds)); st.session_state["search_page"] = 0
+    total = search.count(conn, text, tuple(kinds))
+    pages = max(1, -(-total // search.PAGE_SIZE)); page_no = min(st.session_state["search_page"], pages - 1)
+    hits = search.page(conn, text, tuple(kinds), page_no * search.PAGE_SIZE)
+    if text.strip():
+        n1,n2,n3 = st.columns([1,1,4])
+        if n1.button("← Prethodna", disabled=page_no == 0, key="search_prev"):
+            st.session_state["search_page"] = page_no - 1; st.rerun()
+        if n2.button("Sljedeća →", disabled=page_no + 1 >= pages, key="search_next"):
+            st.session_state["search_page"] = page_no + 1; st.rerun()
+        n3.caption(f"Stranica {page_no + 1} / {pages} · pronađeno: {total}")
+        if hits.empty: st.info("Nema pogodaka.")
+        else: st.dataframe(hits.drop(columns=["vrsta_id"]), use_container_width=True, hide_index=True)
+    conn.close()
+
+# ---- Performanse (skrivena, ?perf=1) ----
+def section_perf():
+    import pandas as pd
+    page_header("Performanse", f"Zadnjih {len(perf.EVENTS)} od najviše {perf.MAX_EVENTS} događaja u memoriji ovog procesa")
+    if not perf.ENABLED:
+        st.warning("Mjerenje je isključeno (HKP_PERF=0)."); return
+    st.subheader("Sekcije")
+    st.dataframe(pd.DataFrame(perf.section_stats()), use_container_width=True, hide_index=True)
+    runs = pd.DataFrame(perf.events("section")[-200:])
+    if not runs.empty:
+        st.caption("Upiti po izvođenju (zadnjih 200 izvođenja)")
+        st.bar_chart(runs.set_index("rerun")[["queries"]])
+    st.subheader(f"Najsporiji upiti (plan za sporije od {perf.SLOW_MS:.0f} ms)")
+    st.dataframe(pd.DataFrame(perf.slow_queries()), use_container_width=True, hide_index=True)
+    st.subheader("Izvozi u Excel")
+    exports = pd.DataFrame(perf.events("export")[-50:])
+    if exports.empty: st.caption("Nema izvoza.")
+    else: st.dataframe(exports.assign(kb=exports["bytes"] // 1024).drop(columns=["bytes", "t"]), use_container_width=True, hide_index=True)
+    c1, c2 = st.columns(2)
+    c1.download_button("Skini događaje (JSON lines)", data=perf.jsonl(), file_name="hkp_perf.jsonl", mime="application/x-ndjson")
+    if c2.button("Očisti"):
+        perf.clear(); st.rerun()
 
+# ---- App ----
+# sve sekcije su definirane iznad, pa izbornik i poziv sekcije idu iz jedne tablice
+SECTIONS = {"Klub": section_club, "Članovi": section_members, "Treneri": section_coaches,
+            "Natjecanja i rezultati": section_competitions, "Statistika": section_stats, "Grupe": section_groups,
+            "Veterani": section_veterans, "Prisustvo": section_attendance, "Dokumenti": section_documents,
+            "Pretraga": section_search,
+            "Performanse": section_perf}
+HIDDEN = {"Performanse": "perf"}  # skrivene stranice: vidljive uz ?perf=1
+
+def main():
+    st.set_page_config(page_title="HK Podravka – Admin", layout="wide")
+    css_style()
+    ensure_schema()
+    jobs.start()
+    with db.connection() as conn, perf.quiet():
+        cache.sync(conn)  # izmjene drugih procesa (naredbeni redak, radnik poslova)
+    menus = [m for m in SECTIONS if m not in HIDDEN or st.query_params.get(HIDDEN[m]) == "1"]
+    menu = st.sidebar.radio("Izbornik", menus)
+    try:
+        with perf.section(menu):
+            SECTIONS[menu]()
+    finally:
+        # konekcije koje sekcija nije zatvorila vraćaju se u bazen
+        db.release_thread()
 
-def _stats_where_clause(group_filter, coach_filter, year_from, year_to):
-    where = " WHERE substr(c.date_from,1,4) BETWEEN ? AND ? "
-    params = [str(year_from), str(year_to)]
-    if coach_filter and coach_filter != "(svi)":
-        where += " AND EXISTS (SELECT 1 FROM json_each(c.coaches_json) j WHERE j.value = ?) "
-        params.append(coach_filter)
-    if group_filter and group_filter != "(sve)":
-        where += " AND EXISTS (SELECT 1 FROM members mm WHERE mm.id=r.member_id AND COALESCE(mm.group_name,'') = ?) "
-        params.append(group_filter if group_filter != "(sve)" else "")
-    return where, params
+if __name__ == "__main__":
+    main()
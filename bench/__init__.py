@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – mjerenja performansi (pokretanje: python -m bench.<modul>).
+"""
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Analitika prisustva za sezonu (300 članova, 4 grupe x 3 treninga tjedno,
+40 tjedana ≈ 36k zapisa): matrica član x tjedan, stope po članu i grupi,
+izvoz u Excel. S --check završava greškom ako matrica (bez predmemorije)
+traje dulje od --limit sekundi ili upiti ne koriste indekse.
+
+    python -m bench.attendance_matrix --check
+"""
+import argparse, sys, time
+
+from hkpodravka import attendance_stats, export
+from bench.generator import new_db, fill, fill_attendance
+
+SEASON = ("2024-09-01", "2025-06-30")
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=300)
+    ap.add_argument("--weeks", type=int, default=40)
+    ap.add_argument("--limit", type=float, default=1.0)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+    fill_attendance(conn, start="2024-09-02", weeks=a.weeks)
+    n = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+    print(f"{a.members} članova, {n} zapisa prisustva")
+
+    timings = {}
+    for label, fn in (("weekly_matrix", lambda: attendance_stats.weekly_matrix(conn, *SEASON)),
+                      ("member_rates", lambda: attendance_stats.member_rates(conn, *SEASON)),
+                      ("group_rates", lambda: attendance_stats.group_rates(conn, *SEASON))):
+        attendance_stats.CACHE.clear()
+        t0 = time.perf_counter(); df = fn(); timings[label] = time.perf_counter() - t0
+        print(f"{label:14s}{timings[label] * 1000:8.1f} ms   {df.shape}")
+    t0 = time.perf_counter(); fn()
+    print(f"{'(predmemorija)':14s}{(time.perf_counter() - t0) * 1000:8.1f} ms")
+    t0 = time.perf_counter()
+    data = export.workbook([export.frame_sheet("Tjedni", attendance_stats.weekly_matrix(conn, *SEASON)),
+                            export.frame_sheet("Clanovi", attendance_stats.member_rates(conn, *SEASON))])
+    print(f"{'izvoz':14s}{(time.perf_counter() - t0) * 1000:8.1f} ms   {len(data) / 1024:.0f} kB")
+
+    plans = [r[3] for sql in (attendance_stats.SESSIONS_SQL, attendance_stats.RECORDS_SQL)
+             for r in conn.execute("EXPLAIN QUERY PLAN " + sql.format(group=""), SEASON)]
+    print("plan:", " | ".join(plans))
+    if a.check:
+        if timings["weekly_matrix"] > a.limit:
+            print(f"REGRESIJA: matrica traje {timings['weekly_matrix']:.2f} s > {a.limit} s"); return 1
+        if any("SCAN" in p for p in plans):
+            print("REGRESIJA: upit prisustva ne koristi indeks"); return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Pisanja u bazu po ponovnom izvođenju sekcije Prisustvo za jednu grupu:
+stari kod (INSERT OR IGNORE + UPDATE za svakog člana na svakom rerunu)
+naspram forme (ništa do potvrde, zatim jedan upsert promijenjenih redaka).
+
+    python -m bench.attendance_writes --group-size 40
+"""
+import argparse, time
+
+from hkpodravka import attendance
+from bench.generator import new_db, fill
+
+def legacy_rerun(conn, session_id, roster_df, marked):
+    cur = conn.cursor()
+    for _, r in roster_df.iterrows():
+        val = marked[int(r["member_id"])]
+        cur.execute("INSERT OR IGNORE INTO attendance (session_id, member_id, present) VALUES (?,?,?)", (session_id, int(r["member_id"]), 1 if val else 0))
+        cur.execute("UPDATE attendance SET present=? WHERE session_id=? AND member_id=?", (1 if val else 0, session_id, int(r["member_id"])))
+    conn.commit()
+
+def form_rerun(conn, session_id, roster_df, marked, submitted):
+    if submitted:
+        attendance.save(conn, session_id, attendance.changed_rows(roster_df, marked))
+
+def counted(conn, fn):
+    writes = []
+    conn.set_trace_callback(lambda sql: writes.append(sql) if sql.lstrip().upper().startswith(("INSERT", "UPDATE")) else None)
+    t0 = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - t0) * 1000
+    conn.set_trace_callback(None)
+    return len(writes), elapsed
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--group-size", type=int, default=40)
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.group_size, comps_per_season=1, results_per_comp=1)
+    conn.execute("UPDATE members SET group_name='Hrvači'")
+    sid = conn.execute("INSERT INTO training_sessions(group_name, start_dt, end_dt) VALUES ('Hrvači','2025-01-07T18:00','2025-01-07T19:30')").lastrowid
+    conn.commit()
+
+    roster_df = attendance.roster(conn, sid, "Hrvači")
+    marked = {int(m): True for m in roster_df["member_id"]}
+    print(f"grupa od {len(roster_df)} članova; naredbe INSERT/UPDATE (trace) i vrijeme")
+    print(f"{'':28s}{'stari':>14s}{'forma':>14s}")
+    for label, submitted, change in (("prvi upis (svi prisutni)", True, None), ("rerun bez promjene", False, None),
+                                      ("potvrda, 3 promjene", True, 3)):
+        if change:
+            for mid in list(marked)[:change]:
+                marked[mid] = False
+        conn.execute("DELETE FROM attendance"); conn.commit()
+        if label != "prvi upis (svi prisutni)":
+            attendance.save(conn, sid, [(m, 1) for m in marked])
+        before = attendance.roster(conn, sid, "Hrvači")
+        old = counted(conn, lambda: legacy_rerun(conn, sid, before, marked))
+        conn.execute("DELETE FROM attendance"); conn.commit()
+        if label != "prvi upis (svi prisutni)":
+            attendance.save(conn, sid, [(m, 1) for m in marked])
+        new = counted(conn, lambda: form_rerun(conn, sid, before, marked, submitted))
+        print(f"{label:28s}{old[0]:6d} {old[1]:6.2f}ms{new[0]:6d} {new[1]:6.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Hladni start aplikacije, kao prvi zahtjev nakon ponovnog pokretanja: svako
+mjerenje je novi proces s praznom bazom u privremenom direktoriju. Mjeri
+se uvoz streamlita (to server ionako plaća), uvoz app.py bez izvođenja,
+prvo iscrtavanje početne stranice kroz AppTest (migracije, pokretanje
+poslova, stranica Klub) i drugo izvođenje, te koji su teški moduli
+učitani nakon prvog iscrtavanja. S --check provjerava da nijedan od LAZY
+modula nije učitan, da app.py nema poziv main() prije zadnje sekcije i
+da su medijani ispod IMPORT_LIMIT_MS / FIRST_PAINT_LIMIT_MS.
+
+    python -m bench.cold_start --repeat 5 --check
+"""
+import argparse, ast, json, os, statistics, subprocess, sys, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+LAZY = ("openpyxl", "xlsxwriter", "reportlab", "PIL")
+IMPORT_LIMIT_MS = 1500.0
+FIRST_PAINT_LIMIT_MS = 3000.0
+
+# izvodi se u novom procesu (cwd = prazan privremeni direktorij), ispisuje JSON
+CHILD = f"""
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("hkp_app", {APP!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+t2 = time.perf_counter()
+at = AppTest.from_string('''
+import importlib.util
+spec = importlib.util.spec_from_file_location("hkp_app", {APP!r})
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+app.main()
+''', default_timeout=120)
+t3 = time.perf_counter(); at.run(); t4 = time.perf_counter(); at.run(); t5 = time.perf_counter()
+print(json.dumps({{"streamlit_ms": (t1 - t0) * 1000, "import_ms": (t2 - t1) * 1000, "first_paint_ms": (t4 - t3) * 1000,
+                  "rerun_ms": (t5 - t4) * 1000, "loaded": [m for m in {LAZY!r} if m in sys.modules],
+                  "errors": [e.value[:300] for e in at.exception]}}))
+"""
+
+def run_once():
+    work = tempfile.mkdtemp(prefix="hkp_cold_")
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONWARNINGS="ignore")
+    p = subprocess.run([sys.executable, "-c", CHILD], cwd=work, env=env, capture_output=True, text=True)
+    if p.returncode != 0:
+        raise SystemExit(p.stderr[-2000:])
+    return json.loads(p.stdout.strip().splitlines()[-1])
+
+def main_before_sections():
+    """Sekcije definirane nakon prvog 'if __name__ == "__main__"' bloka (kad se main() pozove, još ne postoje)."""
+    tree = ast.parse(open(APP, encoding="utf-8").read())
+    late, seen_main = [], False
+    for node in tree.body:
+        if isinstance(node, ast.If) and "__main__" in ast.unparse(node.test):
+            seen_main = True
+        elif seen_main and isinstance(node, ast.FunctionDef):
+            late.append(node.name)
+    return late
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    runs = [run_once() for _ in range(a.repeat)]
+    med = {k: statistics.median(r[k] for r in runs) for k in ("streamlit_ms", "import_ms", "first_paint_ms", "rerun_ms")}
+    loaded = sorted({m for r in runs for m in r["loaded"]})
+    errors = [e for r in runs for e in r["errors"]]
+    late = main_before_sections()
+    print(f"uvoz streamlita {med['streamlit_ms']:7.1f} ms  uvoz app.py {med['import_ms']:7.1f} ms  "
+          f"prvo iscrtavanje {med['first_paint_ms']:7.1f} ms  ponovno {med['rerun_ms']:6.1f} ms  (medijan od {a.repeat})")
+    print(f"učitano nakon prvog iscrtavanja: {', '.join(loaded) or '–'}")
+    if not a.check:
+        return 0
+    ok = True
+    if loaded:
+        print(f"GREŠKA: prvo iscrtavanje učitava {', '.join(loaded)}"); ok = False
+    if late:
+        print(f"GREŠKA: sekcije definirane nakon poziva main(): {', '.join(late)}"); ok = False
+    if errors:
+        print(f"GREŠKA: {errors[0]}"); ok = False
+    if med["import_ms"] > IMPORT_LIMIT_MS or med["first_paint_ms"] > FIRST_PAINT_LIMIT_MS:
+        print("GREŠKA: hladni start sporiji od ograničenja"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
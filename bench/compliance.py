@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Istek dokumenata: popis za natjecanje (aktivni natjecatelji i izričiti
+popis od --roster sportaša) jednim upitom compliance.check_roster naspram
+čitanja svih članova i usporedbe datuma u Pythonu. S --check provjerava
+da oba načina daju iste (član, dokument) parove, da plan koristi indekse
+idx_members_*_valid, da je upit ispod QUERY_LIMIT_MS i da drugi poziv
+dnevnog pregleda dolazi iz predmemorije.
+
+    python -m bench.compliance --members 5000 --roster 500 --check
+"""
+import argparse, random, statistics, sys, time
+from datetime import date, timedelta
+
+from hkpodravka import compliance
+from bench.generator import new_db, fill
+
+QUERY_LIMIT_MS = 50
+TODAY = date(2026, 10, 1)
+
+def timed(fn, repeat=5):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = fn(); times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), out
+
+def legacy(conn, day, abroad, ids=None):
+    """Ručna provjera: svi članovi, datum po datum."""
+    labels = [label for _, label in compliance.DOCUMENTS.values()]
+    out = set()
+    for row in conn.execute("SELECT id, active_competitor, medical_valid_until, id_card_valid_until, passport_valid_until FROM members"):
+        if (ids is None and not row[1]) or (ids is not None and row[0] not in ids):
+            continue
+        for label, value, needed in zip(labels, row[2:], (True, True, abroad)):
+            if needed and (not value or date.fromisoformat(value) < day):
+                out.add((row[0], label))
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=5000)
+    ap.add_argument("--roster", type=int, default=500)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+    rnd = random.Random(1)
+    when = lambda p_missing: None if rnd.random() < p_missing else (TODAY + timedelta(days=rnd.randint(-400, 1500))).isoformat()
+    conn.executemany("UPDATE members SET active_competitor=?, medical_valid_until=?, id_card_valid_until=?, passport_valid_until=? WHERE id=?",
+                     [(int(rnd.random() < .3), when(.05), when(.02), when(.5), i) for (i,) in conn.execute("SELECT id FROM members").fetchall()])
+    day = TODAY + timedelta(days=20)
+    conn.execute("INSERT INTO competitions(kind,date_from,date_to,country_iso3) VALUES ('OSTALO',?,?,'SLO')", ((day - timedelta(days=1)).isoformat(), day.isoformat()))
+    comp_id = conn.execute("SELECT MAX(id) FROM competitions").fetchone()[0]
+    conn.commit()
+    roster = rnd.sample([i for (i,) in conn.execute("SELECT id FROM members")], a.roster)
+
+    ok = True
+    for name, ids in (("aktivni natjecatelji", None), (f"popis od {a.roster}", roster)):
+        t_old, old = timed(lambda: legacy(conn, day, True, set(ids) if ids else None), repeat=3)
+        t_new, df = timed(lambda: compliance.check_roster(conn, comp_id, TODAY.isoformat(), ids))
+        new = set(zip(df["member_id"], df["dokument"]))
+        print(f"{name:<22} Python {t_old:7.1f} ms   upit {t_new:6.1f} ms   neispravnih dokumenata {len(new)} (Python {len(old)})")
+        if new != old or t_new > QUERY_LIMIT_MS:
+            print(f"GREŠKA: {name}: razlika {len(new ^ old)}, {t_new:.1f} ms"); ok = False
+    plan = " | ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + compliance.roster_sql(False),
+                                                  {"competition_id": comp_id, "today": "", "group": None}))
+    used = [k for k in compliance.DOCUMENTS if f"idx_members_{k}_valid" in plan]
+    t_first, dg = timed(lambda: compliance.digest(conn, TODAY.isoformat()), repeat=1)
+    t_again, _ = timed(lambda: compliance.digest(conn, TODAY.isoformat()), repeat=1)
+    print(f"indeksi u planu: {', '.join(used)}")
+    print(f"dnevni pregled: {len(dg)} dokumenata, prvi put {t_first:.1f} ms, ponovno {t_again:.2f} ms")
+    if not a.check:
+        return 0
+    if len(used) != len(compliance.DOCUMENTS):
+        print(f"GREŠKA: plan ne koristi sve indekse: {plan}"); ok = False
+    if compliance.CACHE.info()["hits"] < 1:
+        print("GREŠKA: dnevni pregled nije iz predmemorije"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Usporedba konekcija pod istovremenim pisanjem:
+  legacy – sqlite3.connect() po operaciji (stari get_conn: rollback journal, zadani timeout 5 s)
+  pool   – hkpodravka.db bazen (WAL, busy_timeout)
+Opterećenje oponaša staru aplikaciju: upisi redak po redak u jednoj
+transakciji i čitanja koja prolaze kursor u Pythonu. Ispisuje udio
+"database is locked" grešaka i p50/p95 latenciju čitanja i upisa zasebno.
+
+    python -m bench.db_pool --threads 12 --ops 200
+"""
+import argparse, json, os, sqlite3, statistics, tempfile, threading, time
+
+from hkpodravka.db import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE competitions (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, date_from TEXT);
+CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, competition_id INTEGER, member_id INTEGER,
+                      fights_total INTEGER, wins INTEGER, losses INTEGER, placement INTEGER);
+"""
+
+def _prepare(path, journal):
+    conn = sqlite3.connect(path)
+    conn.execute(f"PRAGMA journal_mode = {journal}")
+    conn.executescript(SCHEMA)
+    conn.executemany("INSERT INTO competitions(name,date_from) VALUES (?,?)",
+                     [(f"Turnir {i}", f"{2000 + i % 25}-05-01") for i in range(200)])
+    conn.executemany("INSERT INTO results(competition_id,member_id,fights_total,wins,losses,placement) VALUES (?,?,?,?,?,?)",
+                     [(i % 200 + 1, i % 300, 3, 2, 1, i % 8) for i in range(5000)])
+    conn.commit(); conn.close()
+
+WRITE_ROWS = 40       # redaka po upisu (kao spremanje prisustva / uvoz dijela Excela)
+ROW_WORK_S = 0.0005   # rad u Pythonu po retku dok je transakcija otvorena
+
+def _one_op(conn, i):
+    if i % 4 == 0:
+        # upis kao u staroj aplikaciji: redak po redak u jednoj transakciji, commit na kraju
+        for k in range(WRITE_ROWS):
+            conn.execute("INSERT INTO results(competition_id,member_id,fights_total,wins,losses,placement) VALUES (?,?,?,?,?,?)",
+                         (i % 200 + 1, (i + k) % 300, 3, 2, 1, 1))
+            time.sleep(ROW_WORK_S)
+        conn.commit()
+    else:
+        # čitanje kao stara statistika: kursor se prolazi u Pythonu (SHARED lock drži se do kraja)
+        total = 0
+        for year, fights, wins in conn.execute("""SELECT substr(c.date_from,1,4), r.fights_total, r.wins
+                                                  FROM competitions c JOIN results r ON r.competition_id=c.id"""):
+            total += fights or 0
+
+def run(mode, threads, ops, legacy_timeout):
+    tmp = tempfile.mkdtemp(prefix="hkp_bench_")
+    path = os.path.join(tmp, "bench.db")
+    _prepare(path, "WAL" if mode == "pool" else "DELETE")
+    pool = ConnectionPool(path, size=threads) if mode == "pool" else None
+    latencies, errors = {"read": [], "write": []}, {"read": 0, "write": 0}
+    lock = threading.Lock()
+
+    def worker(tid):
+        local_lat, local_err = {"read": [], "write": []}, {"read": 0, "write": 0}
+        for i in range(ops):
+            n = tid * ops + i
+            kind = "write" if n % 4 == 0 else "read"
+            t0 = time.perf_counter()
+            try:
+                if pool is not None:
+                    with pool.connection() as conn:
+                        _one_op(conn, n)
+                else:
+                    conn = sqlite3.connect(path, timeout=legacy_timeout, check_same_thread=False)
+                    conn.execute("PRAGMA foreign_keys = ON")
+                    try:
+                        _one_op(conn, n)
+                    finally:
+                        conn.close()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                local_err[kind] += 1
+            local_lat[kind].append((time.perf_counter() - t0) * 1000)
+        with lock:
+            for k in latencies:
+                latencies[k].extend(local_lat[k]); errors[k] += local_err[k]
+
+    ts = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    t0 = time.perf_counter()
+    for t in ts: t.start()
+    for t in ts: t.join()
+    wall = time.perf_counter() - t0
+    if pool is not None:
+        pool.close_all()
+    total = threads * ops
+    out = {"mode": mode, "threads": threads, "ops": total,
+           "lock_error_rate": sum(errors.values()) / total, "ops_per_s": round(total / wall, 1)}
+    for k, lat in latencies.items():
+        out[f"{k}_errors"] = errors[k]
+        out[f"{k}_p50_ms"] = round(statistics.median(lat), 3)
+        out[f"{k}_p95_ms"] = round(statistics.quantiles(lat, n=20)[18], 3)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=12)
+    ap.add_argument("--ops", type=int, default=200)
+    ap.add_argument("--legacy-timeout", type=float, default=5.0, help="timeout starog sqlite3.connect (s)")
+    ap.add_argument("--json", action="store_true")
+    a = ap.parse_args()
+    rows = [run(m, a.threads, a.ops, a.legacy_timeout) for m in ("legacy", "pool")]
+    if a.json:
+        print(json.dumps(rows, indent=2)); return
+    print(f"{'mode':8} {'ops':>6} {'lock err %':>10} {'čit. p50':>9} {'čit. p95':>9} {'upis p50':>9} {'upis p95':>9} {'ops/s':>8}")
+    for r in rows:
+        print(f"{r['mode']:8} {r['ops']:>6} {r['lock_error_rate']*100:>10.2f} {r['read_p50_ms']:>9} {r['read_p95_ms']:>9} "
+              f"{r['write_p50_ms']:>9} {r['write_p95_ms']:>9} {r['ops_per_s']:>8}")
+
+if __name__ == "__main__":
+    main()
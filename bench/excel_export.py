@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Izvoz rezultata u Excel (~100k redaka): stari put (cijeli DataFrame +
+pd.ExcelWriter) naspram hkpodravka.export (fetchmany + pisanje u načinu
+stalne memorije). Mjeri vrijeme i vrh Python memorije (tracemalloc).
+S --check završava greškom ako vrh memorije strujnog izvoza nije barem
+--ratio puta manji od starog.
+
+    python -m bench.excel_export --check
+"""
+import argparse, io, sys, time, tracemalloc
+
+import pandas as pd
+
+from hkpodravka import export
+from bench.generator import new_db, fill
+
+SQL = """SELECT c.date_from, c.kind, c.name, c.place, c.style, c.age_cat, r.member_id,
+       (SELECT first_name || ' ' || last_name FROM members m WHERE m.id=r.member_id) AS sportas,
+       r.category, r.fights_total, r.wins, r.losses, r.placement
+    FROM competitions c JOIN results r ON r.competition_id=c.id
+    ORDER BY c.date_from DESC"""
+
+def legacy(conn):
+    df = pd.read_sql_query(SQL, conn)
+    out = io.BytesIO()
+    with pd.ExcelWriter(out, engine=export.ENGINE) as w:
+        df.to_excel(w, index=False, sheet_name="Rezultati")
+    return out.getvalue()
+
+def streaming(conn):
+    return export.workbook([export.query_sheet(conn, "Rezultati", SQL)])
+
+def measure(fn, conn):
+    # vrijeme bez tracemalloca (on usporava pisanje nekoliko puta), memorija u drugom prolazu
+    t0 = time.perf_counter()
+    data = fn(conn)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    fn(conn)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, len(data)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seasons", type=int, default=20)
+    ap.add_argument("--ratio", type=float, default=4.0)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=a.seasons)
+    n = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    print(f"{n} redaka, pisač: {export.ENGINE}")
+    res = {}
+    for label, fn in (("legacy", legacy), ("export", streaming)):
+        elapsed, peak, size = res[label] = measure(fn, conn)
+        print(f"{label:8s} {elapsed:7.2f} s   vrh memorije {peak / 2**20:7.1f} MB   datoteka {size / 2**20:6.1f} MB")
+    if a.check and res["export"][1] * a.ratio > res["legacy"][1]:
+        print("REGRESIJA: strujni izvoz ne štedi memoriju")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
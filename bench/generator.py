@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Deterministički generator sintetičkog kluba za mjerenja.
+fill_club(conn, scale) puni sve tablice; 1x je klub veličine HK Podravke
+(CLUB_1X), 10x i 100x množe članove, trenere i natjecanja (pa i
+rezultate, borbe i prisustvo), a broj grupa raste s korijenom mjerila.
+"""
+import json, math, os, random, sqlite3, tempfile
+from datetime import date, timedelta
+
+from hkpodravka import bouts, migrations, schedule
+
+KINDS = ["PRVENSTVO HRVATSKE","MEĐUNARODNI TURNIR","REPREZENTATIVNI NASTUP","HRVAČKA LIGA ZA SENIORE",
+         "MEĐUNARODNA HRVAČKA LIGA ZA KADETE","REGIONALNO PRVENSTVO","LIGA ZA DJEVOJČICE","OSTALO"]
+STYLES = ["GR","FS","WW","BW","MODIFICIRANO"]
+AGES = ["POČETNICI","U11","U13","U15","U17","U20","U23","SENIORI"]
+GROUPS = ["Hrvači","Hrvačice","Veterani","Ostalo"]
+FIRST = ["Ivan","Marko","Luka","Petar","Ana","Iva","Lucija","Matej","Josip","Šime","Đuro","Željka","Čedo","Ćiro"]
+LAST = ["Horvat","Kovačević","Babić","Marić","Jurić","Novak","Knežević","Vuković","Šarić","Đurić","Čolak","Žagar"]
+
+
+def new_db(path=None):
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="hkp_bench_"), "bench.db")
+    conn = sqlite3.connect(path)
+    migrations.migrate(conn)
+    return conn, path
+
+def fill(conn, seasons=20, members=300, coaches=12, comps_per_season=50, results_per_comp=100, seed=1, groups=GROUPS, last_year=2025):
+    """Puni osnovne tablice; ~seasons*comps_per_season*results_per_comp rezultata."""
+    rnd = random.Random(seed)
+    first_year = last_year - seasons + 1
+    conn.executemany("""INSERT INTO members(first_name,last_name,dob,gender,oib,city,group_name,pays_fee,fee_amount,veteran)
+                        VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                     [(rnd.choice(FIRST), rnd.choice(LAST), f"{rnd.randint(1960,2018)}-{rnd.randint(1,12):02d}-{rnd.randint(1,28):02d}",
+                       rnd.choice("MŽ"), f"{10000000000 + i:011d}", "Koprivnica", rnd.choice(groups), rnd.randint(0,1), 30.0, int(rnd.random() < .05))
+                      for i in range(members)])
+    conn.executemany("INSERT INTO coaches(first_name,last_name,oib,group_name) VALUES (?,?,?,?)",
+                     [(rnd.choice(FIRST), rnd.choice(LAST), f"{20000000000 + i:011d}", rnd.choice(groups)) for i in range(coaches)])
+    coach_names = dict(conn.execute("SELECT id, first_name || ' ' || last_name FROM coaches ORDER BY id"))
+    comps, comp_coaches = [], []
+    for y in range(first_year, first_year + seasons):
+        for k in range(comps_per_season):
+            d = f"{y}-{rnd.randint(1,12):02d}-{rnd.randint(1,28):02d}"
+            picked = rnd.sample(sorted(coach_names), k=min(2, len(coach_names)))
+            comp_coaches.append(picked)
+            comps.append((rnd.choice(KINDS), f"Turnir {y}/{k}", d, d, "Zagreb", rnd.choice(STYLES), rnd.choice(AGES),
+                          json.dumps([coach_names[c] for c in picked], ensure_ascii=False), "[]"))
+    conn.executemany("""INSERT INTO competitions(kind,name,date_from,date_to,place,style,age_cat,coaches_json,gallery_paths_json)
+                        VALUES (?,?,?,?,?,?,?,?,?)""", comps)
+    comp_ids = [r[0] for r in conn.execute("SELECT id FROM competitions ORDER BY id")]
+    conn.executemany("INSERT INTO competition_coaches(competition_id,coach_id) VALUES (?,?)",
+                     [(cid, co) for cid, picked in zip(comp_ids, comp_coaches) for co in picked])
+    member_ids = [r[0] for r in conn.execute("SELECT id FROM members")]
+    rows = []
+    for cid in comp_ids:
+        for _ in range(results_per_comp):
+            w = rnd.randint(0, 4); l = rnd.randint(0, 3)
+            rows.append((cid, rnd.choice(member_ids), "-65", rnd.choice(STYLES), w + l, w, l, rnd.randint(1, 16),
+                         json.dumps([f"{rnd.choice(FIRST)} {rnd.choice(LAST)};HK{rnd.randint(1,40)}" for _ in range(w)], ensure_ascii=False),
+                         json.dumps([f"{rnd.choice(FIRST)} {rnd.choice(LAST)};HK{rnd.randint(1,40)}" for _ in range(l)], ensure_ascii=False), ""))
+    conn.executemany("""INSERT INTO results(competition_id,member_id,category,style,fights_total,wins,losses,placement,wins_detail_json,losses_detail_json,note)
+                        VALUES (?,?,?,?,?,?,?,?,?,?,?)""", rows)
+    conn.commit()
+    return conn
+
+def fill_attendance(conn, start="2024-09-02", weeks=40, days=(0, 2, 4), p_present=0.8, seed=1):
+    """Treninzi svake grupe u danima days (pon/sri/pet), 18:00-19:30, i prisustvo njezinih članova."""
+    rnd = random.Random(seed)
+    monday = date.fromisoformat(start)
+    sessions = [(g, f"{d.isoformat()}T18:00:00", f"{d.isoformat()}T19:30:00")
+                for w in range(weeks) for day in days for g in GROUPS
+                for d in [monday + timedelta(weeks=w, days=day)]]
+    conn.executemany("INSERT INTO training_sessions(group_name,trainer_name,start_dt,end_dt,location,rep_prep) VALUES (?,'Trener',?,?,'Dvorana',0)",
+                     sessions)
+    by_group = {}
+    for mid, g in conn.execute("SELECT id, group_name FROM members"):
+        by_group.setdefault(g, []).append(mid)
+    conn.executemany("INSERT INTO attendance(session_id,member_id,present) VALUES (?,?,?)",
+                     [(sid, mid, int(rnd.random() < p_present))
+                      for sid, g in conn.execute("SELECT id, group_name FROM training_sessions").fetchall()
+                      for mid in by_group.get(g, [])])
+    conn.commit()
+    return conn
+
+
+SESSION_WEEKS = 40
+CLUB_1X = {"members": 150, "coaches": 8, "seasons": 5, "comps_per_season": 20, "results_per_comp": 8, "groups": 4}
+
+def club_size(scale=1):
+    """Veličine tablica za mjerilo (1, 10, 100...)."""
+    size = {k: v if k in ("seasons", "results_per_comp") else v * scale for k, v in CLUB_1X.items()}
+    size["groups"] = max(CLUB_1X["groups"], round(CLUB_1X["groups"] * math.sqrt(scale)))
+    return size
+
+def fill_club(conn, scale=1, seed=1, p_present=0.8, today=None):
+    """Sve tablice: članovi, treneri, natjecanja, rezultati s borbama, grupe, raspored,
+    kalendar, treninzi (schedule.generate) i prisustvo. Razdoblja završavaju oko today, da
+    zadani filtri stranica (tekuća godina, zadnji mjeseci) pogađaju podatke.
+    Vraća broj redaka po tablici."""
+    size = club_size(scale)
+    groups = (GROUPS + [f"Grupa {i}" for i in range(len(GROUPS) + 1, size["groups"] + 1)])[:size["groups"]]
+    today = today or date.today()
+    fill(conn, seasons=size["seasons"], members=size["members"], coaches=size["coaches"],
+         comps_per_season=size["comps_per_season"], results_per_comp=size["results_per_comp"], seed=seed, groups=groups,
+         last_year=today.year)
+    bouts.import_details(conn.cursor())
+    rnd = random.Random(seed)
+    coaches = conn.execute("SELECT id, first_name || ' ' || last_name FROM coaches ORDER BY id").fetchall()
+    conn.executemany("INSERT INTO groups(name, description) VALUES (?,?)", [(g, f"Sintetička grupa {g}") for g in groups])
+    conn.executemany("""INSERT INTO group_schedules(group_name,coach_id,coach_name,day_of_week,start_time,end_time,location)
+                        VALUES (?,?,?,?,?,?,'Dvorana')""",
+                     [(g, *coaches[i % len(coaches)], day, f"{17 + i % 3}:00", f"{18 + i % 3}:30")
+                      for i, g in enumerate(groups) for day in (0, 2, 4)])
+    conn.commit()
+    start, end = today - timedelta(weeks=SESSION_WEEKS), today + timedelta(weeks=2)
+    for y in range(start.year, end.year + 1):
+        schedule.add_holidays(conn, y)
+    schedule.generate(conn, start, end)  # i dva tjedna unaprijed, bez prisustva
+    by_group = {}
+    for mid, g in conn.execute("SELECT id, group_name FROM members"):
+        by_group.setdefault(g, []).append(mid)
+    conn.executemany("INSERT INTO attendance(session_id,member_id,present) VALUES (?,?,?)",
+                     ((sid, mid, int(rnd.random() < p_present))
+                      for sid, g in conn.execute("SELECT id, group_name FROM training_sessions WHERE start_dt<?",
+                                                 ((today + timedelta(days=1)).isoformat(),)).fetchall()
+                      for mid in by_group.get(g, [])))
+    conn.commit()
+    return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+            for t in ("members", "coaches", "competitions", "results", "bouts", "groups", "group_schedules",
+                      "training_sessions", "attendance", "club_calendar")}
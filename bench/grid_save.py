@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+Spremanje jedne izmjene u gridu članova: stari UPDATE-za-svaki-redak
+naspram hkpodravka.grid (samo promijenjeni retci). Broj redaka je ono
+što ide u apply(); conn.total_changes uključuje i upise okidača (FTS,
+zbrojne tablice) pa se ispisuje zasebno.
+
+    python -m bench.grid_save --members 2000
+"""
+import argparse, time
+
+from hkpodravka import grid
+from hkpodravka.db import query_df
+from bench.generator import new_db, fill
+
+GRID_SQL = """SELECT id, first_name, last_name, gender, dob, oib, street, city, postal_code, athlete_email, parent_email,
+    group_name, pays_fee, fee_amount, medical_valid_until FROM members ORDER BY last_name, first_name"""
+
+def legacy_save(conn, edited):
+    for _, r in edited.iterrows():
+        conn.execute("UPDATE members SET " + ", ".join(c + "=?" for c in grid.MEMBERS_COLUMNS) + " WHERE id=?",
+                     [conv(r.get(c)) for c, conv in grid.MEMBERS_COLUMNS.items()] + [int(r["id"])])
+    conn.commit()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=2000)
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+    df = query_df(conn, GRID_SQL)
+    state = {"edited_rows": {17: {"city": "Đurđevac"}}, "added_rows": [], "deleted_rows": []}
+    edited = df.copy(); edited.loc[17, "city"] = "Đurđevac"
+
+    before = conn.total_changes
+    t0 = time.perf_counter(); legacy_save(conn, edited); t_legacy = time.perf_counter() - t0
+    legacy_writes, before = conn.total_changes - before, conn.total_changes
+    t0 = time.perf_counter()
+    changeset = grid.from_editor(df, state, grid.MEMBERS_COLUMNS)
+    grid.apply(conn, "members", grid.MEMBERS_COLUMNS, changeset)
+    t_diff = time.perf_counter() - t0
+    diff_writes = conn.total_changes - before
+    print(f"legacy  {t_legacy * 1000:8.2f} ms  ({len(df)} UPDATE naredbi)")
+    print(f"diff    {t_diff * 1000:8.2f} ms  ({len(changeset)} redak)")
+    print(f"upisi s okidačima (total_changes): legacy {legacy_writes}, diff {diff_writes}")
+
+if __name__ == "__main__":
+    main()
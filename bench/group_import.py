@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Uvoz grupa iz Excela (ime, prezime, grupa): stari uvoz (pd.read_sql_query po
+retku, točan zapis imena) naspram members.assign_groups (indeks iz
+lookup.py, jedan executemany). Pola redaka ima ime bez dijakritike ili
+velikim slovima. Mjeri se i interaktivna pretraga (lookup.search) s
+tipfelerom i s počecima riječi, nad već izgrađenim indeksom. S --check
+provjerava broj SELECT upita, pronađene retke i da je pretraga ispod
+SEARCH_LIMIT_MS.
+
+    python -m bench.group_import --members 20000 --rows 2000 --check
+"""
+import argparse, random, statistics, sys, time
+
+import pandas as pd
+
+from hkpodravka import lookup, members
+from hkpodravka.cache import bump
+from bench.generator import GROUPS, new_db, fill
+
+SEARCH_LIMIT_MS = 30
+
+def legacy(conn, df_up):
+    for _, r in df_up.iterrows():
+        g = str(r.get("grupa","") or "").strip()
+        ime = str(r.get("ime","")).strip()
+        prez = str(r.get("prezime","")).strip()
+        if not ime or not prez:
+            continue
+        row = pd.read_sql_query("SELECT id FROM members WHERE first_name=? AND last_name=? LIMIT 1", conn, params=(ime, prez))
+        if not row.empty:
+            conn.execute("UPDATE members SET group_name=? WHERE id=?", (g if g else None, int(row.iloc[0]["id"])))
+    conn.commit()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=20000)
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+    # jedinstvena imena da "točan zapis" i indeks imaju isti broj mogućih pogodaka
+    conn.execute("UPDATE members SET first_name = first_name || 'x' || id"); conn.commit()
+    rnd = random.Random(7)
+    picked = conn.execute("SELECT first_name, last_name FROM members ORDER BY random() LIMIT ?", (a.rows,)).fetchall()
+    typed = [(f, l) if i % 2 else (lookup.fold(f), l.upper()) for i, (f, l) in enumerate(picked)]
+    df = pd.DataFrame({"ime": [f for f, _ in typed], "prezime": [l for _, l in typed],
+                       "grupa": [rnd.choice(GROUPS) for _ in typed]})
+
+    selects = []
+    conn.set_trace_callback(lambda sql: selects.append(sql) if sql.lstrip().upper().startswith("SELECT") else None)
+    t0 = time.perf_counter(); legacy(conn, df); t_legacy = time.perf_counter() - t0
+    legacy_selects = len(selects); selects.clear()
+    bump("members")
+    t0 = time.perf_counter(); report = members.assign_groups(conn, df); t_new = time.perf_counter() - t0
+    new_selects = len(selects)
+    conn.set_trace_callback(None)
+    found = int(report["member_id"].notna().sum())
+
+    wanted = f"{picked[0][0]} {picked[0][1]}"
+    lookup.index(conn)  # indeks se gradi jednom po verziji; mjeri se samo pretraga
+    searches = []
+    for name, text in (("tipfeler", picked[0][1][:-2] + "q" + picked[0][1][-1] + " " + picked[0][0]),  # prezime s tipfelerom, ime
+                       ("početak", picked[0][1][:3] + " " + picked[0][0][:-1])):
+        times = []
+        for _ in range(5):
+            t0 = time.perf_counter(); hits = lookup.search(conn, text); times.append((time.perf_counter() - t0) * 1000)
+        searches.append((name, text, statistics.median(times), any(wanted in label for label in hits), list(hits)))
+
+    print(f"staro:          {t_legacy:6.2f} s, SELECT upita {legacy_selects}, pronađeno {a.rows // 2} (samo točan zapis)")
+    print(f"assign_groups:  {t_new:6.2f} s, SELECT upita {new_selects}, pronađeno {found}/{a.rows}")
+    for name, text, ms, ok_hit, hits in searches:
+        print(f"pretraga ({name}) '{text}': {ms:.1f} ms -> {hits[:3]}")
+    if not a.check:
+        return 0
+    ok = True
+    if new_selects > 1:
+        print(f"GREŠKA: assign_groups šalje {new_selects} SELECT upita"); ok = False
+    if found != a.rows:
+        print(f"GREŠKA: pronađeno {found} od {a.rows}"); ok = False
+    for name, text, ms, ok_hit, hits in searches:
+        if ms > SEARCH_LIMIT_MS or not ok_hit:
+            print(f"GREŠKA: pretraga ({name}) {ms:.0f} ms, pogoci {hits}"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
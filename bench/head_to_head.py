@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Omjer protiv kluba: stari zapis (čitanje svih rezultata u razdoblju i
+parsiranje wins/losses_detail_json u Pythonu) naspram tablice bouts
+(idx_bouts_club). Mjeri se i prijenos starog zapisa (migracija 10 na
+postojećoj bazi). S --check provjerava da oba načina daju isti omjer,
+da plan upita koristi indeks i da ponovni prijenos ništa ne dodaje.
+
+    python -m bench.head_to_head --seasons 20 --comps 50 --results 100 --check
+"""
+import argparse, json, statistics, sys, time
+
+from hkpodravka import bouts
+from hkpodravka.lookup import fold
+from bench.generator import new_db, fill
+
+QUERY_LIMIT_MS = 50
+
+def _club(item):
+    parts = item.split(";")
+    return fold(parts[1]) if len(parts) > 1 else ""
+
+def legacy(conn, club, year_from, year_to):
+    per_year, key = {}, fold(club)
+    for year, wins_json, losses_json in conn.execute("""SELECT c.year, r.wins_detail_json, r.losses_detail_json
+            FROM results r JOIN competitions c ON c.id=r.competition_id WHERE c.year BETWEEN ? AND ?""", (year_from, year_to)):
+        w = sum(1 for s in json.loads(wins_json or "[]") if _club(s) == key)
+        l = sum(1 for s in json.loads(losses_json or "[]") if _club(s) == key)
+        if w or l:
+            acc = per_year.setdefault(year, [0, 0]); acc[0] += w; acc[1] += l
+    return {str(y): tuple(v) for y, v in sorted(per_year.items())}
+
+def timed(fn, repeat=5):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = fn(); times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seasons", type=int, default=20)
+    ap.add_argument("--comps", type=int, default=50)
+    ap.add_argument("--results", type=int, default=100)
+    ap.add_argument("--club", default="hk7")
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=a.seasons, comps_per_season=a.comps, results_per_comp=a.results)
+    t0 = time.perf_counter(); moved = bouts.import_details(conn.cursor()); conn.commit(); t_import = time.perf_counter() - t0
+    again = bouts.import_details(conn.cursor())
+    year_to = conn.execute("SELECT MAX(year) FROM competitions").fetchone()[0]; year_from = year_to - 4
+
+    t_legacy, old = timed(lambda: legacy(conn, a.club, year_from, year_to), repeat=3)
+    t_new, rec = timed(lambda: bouts.club_record.uncached(conn, a.club, year_from, year_to))
+    new = {r.godina: (int(r.pobjede), int(r.porazi)) for r in rec.itertuples()}
+    plan = " | ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + bouts.CLUB_RECORD_SQL, (fold(a.club), year_from, year_to)))
+
+    print(f"prijenos starog zapisa: {moved} borbi u {t_import:.2f} s (ponovno: {again})")
+    print(f"staro (JSON):  {t_legacy:8.1f} ms")
+    print(f"bouts:         {t_new:8.1f} ms  {a.club} {year_from}–{year_to}: {sum(w for w, _ in new.values())} : {sum(l for _, l in new.values())}")
+    print(f"plan: {plan}")
+    if not a.check:
+        return 0
+    ok = True
+    if old != new:
+        print(f"GREŠKA: omjeri se razlikuju {old} != {new}"); ok = False
+    if "idx_bouts_club" not in plan:
+        print("GREŠKA: upit ne koristi idx_bouts_club"); ok = False
+    if again:
+        print(f"GREŠKA: ponovni prijenos dodao {again} borbi"); ok = False
+    if t_new > QUERY_LIMIT_MS:
+        print(f"GREŠKA: upit traje {t_new:.0f} ms (> {QUERY_LIMIT_MS})"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Uvoz članova iz Excela: koliko dugo stranica čeka. Prije se uvoz izvodio u
+izvođenju Streamlit skripte (stranica blokirana do kraja); sada submit()
+samo spremi datoteku i upiše redak u jobs, a uvoz radi radnik. S --check
+provjerava i da je čekanje stranice kratko, da posao završi s istim
+brojevima kao izravni uvoz i da otkazani uvoz ne ostavlja izmjene.
+
+    python -m bench.job_queue --members 20000 --check
+"""
+import argparse, io, os, sys, time
+
+import pandas as pd
+
+from hkpodravka import db, jobs, members
+from bench.generator import fill, new_db
+
+SUBMIT_LIMIT = 0.1  # s
+
+def wait(conn, job_id, timeout=300):
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:
+        job = jobs.get(conn, job_id)
+        if job["status"] not in jobs.ACTIVE:
+            return job
+        time.sleep(0.02)
+    return jobs.get(conn, job_id)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=20000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    raw, path = new_db(); raw.close()
+    root = os.path.join(os.path.dirname(path), "jobs")
+    with db.connection(path) as conn:
+        fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+        df = members.export_df(conn)
+    buf = io.BytesIO(); df.to_excel(buf, index=False)
+    print(f"{len(df)} redaka, Excel {buf.tell() / 2**20:.1f} MB")
+
+    with db.connection(path) as conn:
+        t0 = time.perf_counter()
+        _, direct = members.import_members(conn, pd.read_excel(io.BytesIO(buf.getvalue())))
+        blocked = time.perf_counter() - t0
+
+        jobs.start(path, root=root)
+        t0 = time.perf_counter()
+        job_id = jobs.submit(conn, "members_import", files={"input.xlsx": buf}, root=root)
+        submitted = time.perf_counter() - t0
+        job = wait(conn, job_id)
+        total = time.perf_counter() - t0
+
+        jobs.stop(path); time.sleep(jobs.POLL + 0.5)  # otkazivanje: posao se zaustavi na prvom javljanju napretka
+        buf = io.BytesIO(); df.head(100).assign(ime="Otkazano").to_excel(buf, index=False)
+        cancelled_id = jobs.submit(conn, "members_import", files={"input.xlsx": buf}, root=root)
+        jobs._cancel.add(cancelled_id)
+        jobs.start(path, root=root)
+        cancelled = wait(conn, cancelled_id)
+        leaked = conn.execute("SELECT COUNT(*) FROM members WHERE first_name='Otkazano'").fetchone()[0]
+
+    print(f"izravni uvoz: stranica čeka {blocked:6.2f} s")
+    print(f"posao:        stranica čeka {submitted * 1000:6.1f} ms, uvoz gotov za {total:.2f} s ({job['status']})")
+    if not a.check:
+        return 0
+    ok = True
+    if submitted > SUBMIT_LIMIT:
+        print(f"GREŠKA: submit traje {submitted:.3f} s (> {SUBMIT_LIMIT} s)"); ok = False
+    if job["status"] != jobs.DONE or job["result"]["counts"] != direct:
+        print(f"GREŠKA: posao {job['status']} {job['result']} != izravno {direct}"); ok = False
+    if cancelled["status"] != jobs.CANCELLED or leaked:
+        print(f"GREŠKA: otkazani posao {cancelled['status']}, upisano redaka: {leaked}"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Uvoz članova iz Excela: stari iterrows/INSERT-po-retku naspram
+hkpodravka.members.import_members (vektorska provjera + executemany).
+
+    python -m bench.member_import --rows 10000
+"""
+import argparse, io, random, time
+
+import pandas as pd
+
+from hkpodravka import members
+from bench.generator import new_db, FIRST, LAST, GROUPS
+
+def _oib(rnd):
+    body = [rnd.randint(0, 9) for _ in range(10)]
+    a = 10
+    for d in body:
+        a = (a + d) % 10 or 10
+        a = (a * 2) % 11
+    return "".join(map(str, body)) + str((11 - a) % 10)
+
+def make_file(rows, seed=1):
+    rnd = random.Random(seed)
+    df = pd.DataFrame({
+        "ime": [rnd.choice(FIRST) for _ in range(rows)],
+        "prezime": [rnd.choice(LAST) for _ in range(rows)],
+        "datum_rodenja(YYYY-MM-DD)": [f"{rnd.randint(1960,2018)}-{rnd.randint(1,12):02d}-{rnd.randint(1,28):02d}" for _ in range(rows)],
+        "spol(M/Ž)": [rnd.choice("MŽ") for _ in range(rows)],
+        "oib": [_oib(rnd) for _ in range(rows)],
+        "grad": "Koprivnica",
+        "aktivni_natjecatelj(0/1)": [rnd.randint(0, 1) for _ in range(rows)],
+        "placa_clanarinu(0/1)": 1,
+        "iznos_clanarine(EUR)": 30.0,
+        "grupa": [rnd.choice(GROUPS) for _ in range(rows)],
+    })
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    return buf.getvalue()
+
+def legacy_import(conn, df_up):
+    for _, r in df_up.iterrows():
+        vals = [str(r.get(c, "") or "")[:10] if "YYYY" in c else
+                (int(r.get(c, 0) or 0) if "(0/1)" in c else
+                 (float(r.get(c, 30) or 30.0) if "EUR" in c else str(r.get(c, "") or "")))
+                for c in members.IMPORT_COLUMNS]
+        conn.execute(members.UPSERT_SQL, vals)
+    conn.commit()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10000)
+    a = ap.parse_args()
+    data = make_file(a.rows)
+    t0 = time.perf_counter(); df = pd.read_excel(io.BytesIO(data)); t_read = time.perf_counter() - t0
+    print(f"read_excel: {t_read:.2f} s ({a.rows / t_read:,.0f} redaka/s)")
+    for name, fn in (("legacy", legacy_import), ("bulk", lambda c, d: members.import_members(c, d))):
+        conn, _ = new_db()
+        t0 = time.perf_counter(); fn(conn, df); dt = time.perf_counter() - t0
+        n = conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+        print(f"{name:7} {dt:7.3f} s  {a.rows / dt:>10,.0f} redaka/s  ({n} članova u bazi)")
+
+if __name__ == "__main__":
+    main()
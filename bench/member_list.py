@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Popis članova: stara stranica (cijela tablica) naspram keyset stranice na
+početku, u sredini i na kraju registra. S --check završava greškom ako
+stranica ne traži po indeksu idx_members_name.
+
+    python -m bench.member_list --members 50000 --check
+"""
+import argparse, statistics, sys, time
+
+from hkpodravka import members
+from hkpodravka.db import query_df
+from bench.generator import new_db, fill
+
+LEGACY_SQL = """SELECT id, first_name, last_name, gender, dob, oib, street, city, postal_code, athlete_email, parent_email,
+    group_name, pays_fee, fee_amount, medical_valid_until FROM members ORDER BY last_name, first_name"""
+
+def timed(fn, repeat=5):
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=50000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=1, members=a.members, comps_per_season=1, results_per_comp=1)
+
+    print(f"cijela tablica  {timed(lambda: query_df(conn, LEGACY_SQL), 3):8.2f} ms")
+    for label, offset in (("početak", None), ("sredina", a.members // 2), ("kraj", a.members - members.PAGE_SIZE - 1)):
+        after = None if offset is None else conn.execute(
+            f"SELECT COALESCE(last_name,''), COALESCE(first_name,''), id FROM members ORDER BY {members.SORT_KEY} LIMIT 1 OFFSET ?",
+            (offset,)).fetchone()
+        print(f"stranica/{label:8s}{timed(lambda: members.list_page(conn, (), after=after)):8.2f} ms")
+    print(f"pretraga 'ana'  {timed(lambda: members.list_page(conn, ('ana',))):8.2f} ms")
+
+    where = " WHERE " + members.KEYSET_SQL
+    plan = " | ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + members.LIST_SQL.format(where=where),
+                                                 ["M", "M", "A", "A", 0, members.PAGE_SIZE + 1]))
+    print("plan:", plan)
+    if a.check and "SEARCH members USING INDEX idx_members_name" not in plan:
+        print("REGRESIJA: keyset stranica ne koristi idx_members_name")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
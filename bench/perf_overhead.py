@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Cijena mjerenja (hkpodravka.perf): iste kratke naredbe kroz konekciju iz
+bazena s uključenim i isključenim mjerenjem. S --check provjerava da je
+dodatak po naredbi ispod OVERHEAD_US, da spremnik ne prelazi MAX_EVENTS,
+da perf.quiet() ništa ne bilježi i da sekcija broji svoje upite.
+
+    python -m bench.perf_overhead --statements 20000 --check
+"""
+import argparse, statistics, sys, time
+
+from hkpodravka import db, perf
+from bench.generator import new_db, fill
+
+OVERHEAD_US = 50
+
+def run(conn, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        conn.execute("SELECT id, first_name, last_name FROM members WHERE id=?", (i % 300 + 1,)).fetchall()
+    return (time.perf_counter() - t0) / n * 1e6
+
+def timed(conn, n, enabled, repeat=5):
+    perf.ENABLED = enabled
+    try:
+        return statistics.median(run(conn, n) for _ in range(repeat))
+    finally:
+        perf.ENABLED = True
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=20000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, path = new_db()
+    fill(conn, seasons=1, comps_per_season=5, results_per_comp=20); conn.close()
+
+    with db.connection(path) as conn:
+        off = timed(conn, a.statements, False)
+        on = timed(conn, a.statements, True)
+        perf.clear()
+        with perf.quiet():
+            run(conn, 100)
+        quiet = len(perf.events())
+        with perf.section("bench"):
+            run(conn, 10)
+        sec = perf.events("section")[-1]
+        run(conn, perf.MAX_EVENTS + 100)
+        size = len(perf.EVENTS)
+
+    print(f"bez mjerenja: {off:6.1f} µs/naredba")
+    print(f"s mjerenjem:  {on:6.1f} µs/naredba  (+{on - off:.1f} µs)")
+    print(f"quiet: {quiet} događaja, sekcija: {sec['queries']} upita / {sec['rows']} redaka, spremnik: {size}")
+    if not a.check:
+        return 0
+    ok = True
+    if on - off > OVERHEAD_US:
+        print(f"GREŠKA: mjerenje dodaje {on - off:.1f} µs po naredbi"); ok = False
+    if quiet or sec["queries"] != 10 or sec["rows"] != 10 or size > perf.MAX_EVENTS:
+        print("GREŠKA: quiet/sekcija/spremnik"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Padajući izbornici na stranici natjecanja i rezultata: stari način (upit u
+pandas i iterrows() na svakom izvođenju) naspram hkpodravka.reference
+(rječnik iz predmemorije dok se tablica ne promijeni). S --check provjerava
+da ponovljeni prikaz ne šalje nijedan upit i da bump() osvježava popis.
+
+    python -m bench.reference_lists --members 20000 --check
+"""
+import argparse, statistics, sys, time
+
+import pandas as pd
+
+from hkpodravka import reference
+from hkpodravka.cache import bump
+from bench.generator import new_db, fill
+
+def legacy(conn):
+    coaches = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS ime FROM coaches ORDER BY last_name, first_name", conn)
+    coach_names = dict(zip(coaches['id'].tolist(), coaches['ime'].tolist()))
+    comps = pd.read_sql_query("SELECT id, COALESCE(name, kind) AS title, date_from FROM competitions ORDER BY date_from DESC", conn)
+    comp_opts = {f"{r['id']} – {r['title']} ({r['date_from']})": r['id'] for _, r in comps.iterrows()}
+    mems = pd.read_sql_query("SELECT id, first_name || ' ' || last_name AS full FROM members ORDER BY last_name, first_name", conn)
+    mem_opts = {f"{r['id']} – {r['full']}": r['id'] for _, r in mems.iterrows()}
+    return coach_names, comp_opts, mem_opts
+
+def current(conn):
+    return reference.coach_names(conn), reference.competition_options(conn), reference.member_options(conn)
+
+def timed(fn, repeat=5):
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); fn(); out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=20000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=10, members=a.members, comps_per_season=50, results_per_comp=1)
+
+    reference.CACHE.clear(); t0 = time.perf_counter(); current(conn); cold = (time.perf_counter() - t0) * 1000
+    print(f"staro (svako izvođenje)      {timed(lambda: legacy(conn), 3):8.2f} ms")
+    print(f"reference, prvo izvođenje    {cold:8.2f} ms")
+    print(f"reference, ponovno izvođenje {timed(lambda: current(conn)):8.2f} ms")
+    if not a.check:
+        return 0
+
+    ok = True
+    statements = []
+    conn.set_trace_callback(statements.append)
+    current(conn)
+    if statements:
+        print(f"GREŠKA: ponovni prikaz šalje upite: {statements}"); ok = False
+    if [len(x) for x in current(conn)] != [len(x) for x in legacy(conn)]:
+        print("GREŠKA: popisi se razlikuju od starih"); ok = False
+    conn.execute("INSERT INTO competitions(name, date_from) VALUES ('Novo natjecanje', '2099-01-01')"); conn.commit()
+    bump("competitions")
+    if not next(iter(reference.competition_options(conn))).endswith("Novo natjecanje (2099-01-01)"):
+        print("GREŠKA: bump('competitions') ne osvježava popis natjecanja"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Pretraga nad arhivom od više desetljeća: search_fts (FTS5, bm25, po
+stranicama) naspram LIKE '%...%' bez dijakritike (fold() u Pythonu) po
+članovima, trenerima, natjecanjima i napomenama rezultata. Mjeri se i
+ponovna izgradnja indeksa (migracija 11 na postojećoj bazi) i cijena
+okidača pri upisu napomena. S --check provjerava da je svaki upit ispod
+QUERY_LIMIT_MS, da je svaki FTS pogodak i LIKE pogodak, da indeks prati
+izmjene i brisanja te integrity-check.
+
+    python -m bench.search --seasons 40 --members 5000 --check
+"""
+import argparse, random, sqlite3, statistics, sys, time
+
+from hkpodravka import search
+from hkpodravka.lookup import fold
+from bench.generator import new_db, fill
+
+QUERY_LIMIT_MS = 50
+QUERIES = ["horvat", "Kovačević", "ana hor", "turnir 2003", "zagreb", "ozljeda", "10000000042", "đur"]
+NOTES = ["ozljeda ramena", "odlična borba u finalu", "diskvalifikacija", "prvi nastup", "Đurđevac – gostovanje"]
+
+def timed(fn, repeat=5):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = fn(); times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times), out
+
+def like(conn, text):
+    """LIKE po svim stupcima (sve riječi bilo gdje u retku), bez dijakritike preko fold() u Pythonu."""
+    conn.create_function("fold", 1, fold, deterministic=True)
+    ids = set()
+    words = fold(text).split()
+    for kind, (table, title, body, _) in search.SOURCES.items():
+        cols = title + body
+        text_sql = search._text(*(f"t.{c}" for c in cols))
+        where = " AND ".join(f"fold({text_sql}) LIKE ?" for _ in words)
+        k = search.KINDS.index(kind)
+        rows = conn.execute(f"SELECT id FROM {table} t WHERE {where}", [f"%{w}%" for w in words])
+        ids.update(r[0] * 4 + k for r in rows)
+    return ids
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seasons", type=int, default=40)
+    ap.add_argument("--members", type=int, default=5000)
+    ap.add_argument("--comps", type=int, default=50)
+    ap.add_argument("--results", type=int, default=100)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    fill(conn, seasons=a.seasons, members=a.members, comps_per_season=a.comps, results_per_comp=a.results)
+    rnd = random.Random(1)
+    ids = [r[0] for r in conn.execute("SELECT id FROM results")]
+    noted = rnd.sample(ids, len(ids) // 5)
+    t0 = time.perf_counter()
+    conn.executemany("UPDATE results SET note=? WHERE id=?", [(rnd.choice(NOTES), i) for i in noted]); conn.commit()
+    t_notes = time.perf_counter() - t0
+    t0 = time.perf_counter(); search.rebuild(conn.cursor()); conn.commit(); t_rebuild = time.perf_counter() - t0
+    indexed = conn.execute("SELECT COUNT(*) FROM search_fts").fetchone()[0]
+    print(f"rezultata: {len(ids)}, napomena: {len(noted)} (upis s okidačima {t_notes:.2f} s), "
+          f"indeks: {indexed} redaka, izgradnja {t_rebuild:.2f} s")
+
+    ok = True
+    for q in QUERIES:
+        t_fts, (total, df) = timed(lambda: (search.count.uncached(conn, q), search.page.uncached(conn, q)))
+        t_like, old = timed(lambda: like(conn, q), repeat=1)
+        found = {r[0] for r in conn.execute("SELECT rowid FROM search_fts WHERE search_fts MATCH ?", (search.match_query(q),))}
+        print(f"  {q!r:<16} fts {t_fts:7.1f} ms  like {t_like:8.1f} ms  pogodaka {total:>6} (like {len(old):>6})"
+              + (f"  prvi: {df.iloc[0]['vrsta']} {df.iloc[0]['naziv']}" if len(df) else ""))
+        if t_fts > QUERY_LIMIT_MS:
+            print(f"GREŠKA: {q!r} traje {t_fts:.1f} ms"); ok = False
+        # LIKE nalazi i sredine riječi, FTS samo početke – svaki FTS pogodak mora biti i LIKE pogodak
+        if not found <= old or total != len(found):
+            print(f"GREŠKA: {q!r}: FTS {len(found)}, od toga nije u LIKE {len(found - old)}"); ok = False
+
+    conn.execute("UPDATE members SET last_name='Zzzyzx' WHERE id=1")
+    conn.execute("DELETE FROM competitions WHERE id=1")  # briše i rezultate (ON DELETE CASCADE)
+    conn.execute("UPDATE results SET note='' WHERE id=?", (noted[0],)); conn.commit()
+    stale = conn.execute("""SELECT COUNT(*) FROM search_fts WHERE rowid & 3 = 3
+                             AND (rowid >> 2) NOT IN (SELECT id FROM results WHERE COALESCE(note,'')<>'')""").fetchone()[0]
+    renamed = search.count.uncached(conn, "zzzyzx")
+    try:
+        conn.execute("INSERT INTO search_fts(search_fts) VALUES ('integrity-check')"); integrity = "ok"
+    except sqlite3.Error as e:
+        integrity = str(e)
+    print(f"nakon izmjena: preimenovan {renamed}, zastarjelih redaka rezultata {stale}, integrity-check {integrity}")
+    if not a.check:
+        return 0
+    if renamed != 1 or stale or integrity != "ok":
+        print("GREŠKA: indeks ne prati izmjene"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
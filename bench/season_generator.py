@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Generiranje sezone treninga iz rasporeda (4 grupe x 3 termina tjedno,
+rujan-lipanj) uz praznike iz club_calendar. S --check završava greškom
+ako sezona traje dulje od --limit ms. Ispravnost (ponovno pokretanje,
+preklapanje, zatvoreni dani, praznici) provjerava tests/test_schedule.py.
+
+    python -m bench.season_generator --check
+"""
+import argparse, sys, time
+from datetime import date
+
+from hkpodravka import schedule
+from bench.generator import new_db, GROUPS
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--limit", type=float, default=100.0)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, _ = new_db()
+    conn.executemany("""INSERT INTO group_schedules(group_name,coach_id,coach_name,day_of_week,start_time,end_time,location)
+                        VALUES (?,NULL,'Trener',?,'18:00','19:30','Dvorana')""", [(g, d) for g in GROUPS for d in (0, 2, 4)])
+    conn.commit()
+    for y in (2024, 2025):
+        schedule.add_holidays(conn, y)
+
+    t0 = time.perf_counter()
+    added, existing, closed = schedule.generate(conn, date(2024, 9, 1), date(2025, 6, 30))
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"sezona: dodano {added}, postojalo {existing}, preskočeno {closed}  ({elapsed:.1f} ms)")
+    if a.check and elapsed > a.limit:
+        print(f"GREŠKA: sezona traje {elapsed:.1f} ms > {a.limit} ms")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
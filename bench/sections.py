@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Stranice aplikacije kako klub raste: sintetički klub (generator.fill_club)
+u mjerilima 1x/10x/100x i svaka sekcija izvedena bez preglednika kroz
+Streamlitov AppTest. Po sekciji i mjerilu bilježi se prvo izvođenje
+(prazne predmemorije), medijan ponovnih izvođenja, broj SQL naredbi po
+izvođenju (db.ON_CONNECT + trace callback, bez dretvi pozadinskih poslova)
+i vrh memorije (tracemalloc, u zasebnom izvođenju s poništenim
+predmemorijama da ne usporava mjerenje vremena). Rezultat je JSON datoteka (--out); --baseline uspoređuje s
+ranijom datotekom, a --check tada javlja sekciju koja je sporija od
+TOLERANCE puta (uz NOISE_MS šuma) ili šalje više upita, te svaku iznimku.
+
+    python -m bench.sections --scales 1 10 100 --out sections.json
+    python -m bench.sections --scales 1 10 --baseline sections.json --check
+"""
+import argparse, json, os, platform, statistics, subprocess, sys, tempfile, threading, time, tracemalloc
+from datetime import datetime
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from hkpodravka import db, jobs
+from hkpodravka.cache import bump
+from bench.generator import club_size, fill_club, new_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+SECTIONS = {"section_club": "Klub", "section_members": "Članovi", "section_coaches": "Treneri",
+            "section_competitions": "Natjecanja i rezultati", "section_stats": "Statistika", "section_groups": "Grupe",
+            "section_veterans": "Veterani", "section_attendance": "Prisustvo", "section_documents": "Dokumenti",
+            "section_search": "Pretraga"}
+TOLERANCE = 1.5
+NOISE_MS = 50.0
+
+# app.py se učitava kao modul i poziva se main(), kao što to radi "streamlit run"
+DRIVER = f"""
+import importlib.util
+spec = importlib.util.spec_from_file_location("hkp_app", {APP!r})
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+app.main()
+"""
+
+_queries = [0]
+
+def _count(sql):
+    if not sql.startswith("--") and not threading.current_thread().name.startswith("hkp-job"):
+        _queries[0] += 1
+
+def _trace(conn):
+    conn.set_trace_callback(_count)
+
+def _run(at, menu, timeout):
+    _queries[0] = 0
+    t0 = time.perf_counter()
+    at.sidebar.radio[0].set_value(menu).run(timeout=timeout)
+    return (time.perf_counter() - t0) * 1000, _queries[0]
+
+def measure(menu, tables, repeat, timeout):
+    at = AppTest.from_string(DRIVER, default_timeout=timeout)
+    at.run()
+    cold_ms, cold_q = _run(at, menu, timeout)
+    warm = [_run(at, menu, timeout) for _ in range(repeat)]
+    bump(*tables)  # memorija se mjeri za izvođenje s praznim predmemorijama, kao prvo
+    tracemalloc.start()
+    at.sidebar.radio[0].set_value(menu).run(timeout=timeout)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"cold_ms": round(cold_ms, 1), "warm_ms": round(statistics.median(t for t, _ in warm), 1),
+            "queries_cold": cold_q, "queries": max(q for _, q in warm), "peak_kb": peak // 1024,
+            "errors": [e.value[:300] for e in at.exception]}
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline):
+    """Retci koji su lošiji od baseline-a (vrijeme ili broj upita)."""
+    old = {(r["scale"], r["section"]): r for r in baseline["results"]}
+    worse = []
+    for r in results:
+        b = old.get((r["scale"], r["section"]))
+        if b is None:
+            continue
+        slower = r["warm_ms"] > b["warm_ms"] * TOLERANCE + NOISE_MS
+        more = r["queries"] > b["queries"]
+        print(f"  {r['scale']:>4}x {r['section']:<22} {b['warm_ms']:8.1f} -> {r['warm_ms']:8.1f} ms   "
+              f"upita {b['queries']:>4} -> {r['queries']:<4}{'  LOŠIJE' if slower or more else ''}")
+        if slower or more:
+            worse.append(r)
+    return worse
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--sections", nargs="+", choices=list(SECTIONS), default=list(SECTIONS))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--timeout", type=float, default=600)
+    ap.add_argument("--out", default="sections.json")
+    ap.add_argument("--baseline")
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+
+    db.ON_CONNECT.append(_trace)
+    cwd, results, sizes = os.getcwd(), [], {}
+    try:
+        for scale in a.scales:
+            work = tempfile.mkdtemp(prefix=f"hkp_sections_{scale}x_")
+            os.chdir(work)  # uploads/ i jobs/ aplikacije idu u privremeni direktorij
+            conn, path = new_db(os.path.join(work, "hk_podravka.db"))
+            t0 = time.perf_counter(); sizes[scale] = fill_club(conn, scale)
+            tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]; conn.close()
+            print(f"{scale}x: generirano za {time.perf_counter() - t0:.1f} s  {sizes[scale]}")
+            db.DB_PATH = path
+            for name in a.sections:
+                r = dict(scale=scale, section=name, **measure(SECTIONS[name], tables, a.repeat, a.timeout))
+                results.append(r)
+                print(f"  {name:<22} prvo {r['cold_ms']:8.1f} ms  ponovno {r['warm_ms']:8.1f} ms  "
+                      f"upita {r['queries_cold']:>4}/{r['queries']:<4} memorija {r['peak_kb'] / 1024:7.1f} MB"
+                      + (f"  GREŠKA: {r['errors']}" if r["errors"] else ""))
+            jobs.stop(path)
+            db.get_pool(path).close_all()
+    finally:
+        os.chdir(cwd)
+        db.ON_CONNECT.remove(_trace)
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "git": _git_rev(),
+              "python": platform.python_version(), "streamlit": streamlit.__version__,
+              "sizes": {str(s): dict(club_size(s), rows=sizes[s]) for s in sizes}, "results": results}
+    with open(a.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"Zapisano: {a.out}")
+
+    worse = []
+    if a.baseline:
+        with open(a.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"Usporedba s {a.baseline} ({baseline.get('git')}, {baseline.get('created')}):")
+        worse = compare(results, baseline)
+    if not a.check:
+        return 0
+    errors = [r for r in results if r["errors"]]
+    for r in errors:
+        print(f"GREŠKA: {r['scale']}x {r['section']}: {r['errors']}")
+    for r in worse:
+        print(f"GREŠKA: {r['scale']}x {r['section']} lošiji od baseline-a")
+    print("U redu." if not errors and not worse else "Neuspjeh.")
+    return 1 if errors or worse else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Podatkovni sloj bez Streamlita: python -m hkpodravka <naredba> nad
+generiranom bazom. Mjeri se start (--help) i svaka naredba kao zaseban
+proces, kao u noćnom poslu. S --check provjerava i da uvoz modula ne
+učitava streamlit, da izvoz članova vraćen uvozom ne dodaje nove
+članove, da se grupe dodijele svima te da unos člana, trenera, natjecanja
+i rezultata s borbama kroz module daje očekivane retke.
+
+    python -m bench.service_cli --members 20000 --check
+"""
+import argparse, os, subprocess, sys, time
+
+import pandas as pd
+
+from hkpodravka import bouts, coaches, competitions, members
+from bench.generator import fill, fill_attendance, new_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HELP_LIMIT = 1.0  # s
+MODULES = ["attendance", "attendance_stats", "bouts", "cli", "coaches", "competitions", "compliance", "export", "jobs",
+           "lookup", "members", "migrations", "reference", "schedule", "search", "stats", "uploads"]
+
+def run(path, *args):
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-m", "hkpodravka", "--db", path, *args], cwd=ROOT, capture_output=True, text=True)
+    return time.perf_counter() - t0, p.returncode, (p.stdout + p.stderr).strip()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--members", type=int, default=20000)
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    conn, path = new_db()
+    fill(conn, seasons=5, members=a.members, comps_per_season=20, results_per_comp=50)
+    fill_attendance(conn, weeks=12)
+    conn.execute("INSERT INTO group_schedules(group_name, coach_name, day_of_week, start_time, end_time, location) VALUES ('Hrvači','Trener',0,'18:00','19:30','Dvorana')")
+    conn.commit()
+    out = os.path.dirname(path)
+    year = conn.execute("SELECT MAX(year) FROM competitions").fetchone()[0]
+    ok = True
+
+    probe = subprocess.run([sys.executable, "-c", "import sys; from hkpodravka import " + ", ".join(MODULES) + "; print('streamlit' in sys.modules)"],
+                           cwd=ROOT, capture_output=True, text=True)
+    steps = [("--help", ("--help",)),
+             ("export-members", ("export-members", os.path.join(out, "clanovi.xlsx"))),
+             ("import-members", ("import-members", os.path.join(out, "clanovi.xlsx"), "--report", os.path.join(out, "uvoz.xlsx"))),
+             ("export-results", ("export-results", os.path.join(out, "rezultati.xlsx"), "--year", str(year))),
+             ("report-stats", ("report-stats", os.path.join(out, "stat.xlsx"), "--from", str(year - 4), "--to", str(year))),
+             ("report-attendance", ("report-attendance", os.path.join(out, "prisustvo.xlsx"), "--from", "2024-09-01", "--to", "2024-12-31")),
+             ("sessions", ("sessions", "--from", "2025-01-06", "--to", "2025-01-31", "--group", "Hrvači"))]
+    timings = {}
+    for name, args in steps:
+        t, code, text = run(path, *args)
+        timings[name] = t
+        print(f"{name:<18} {t:6.2f} s  izlaz {code}  {text.splitlines()[-1] if text else ''}")
+        if code != 0 and name != "import-members":  # izlaz 1 = ima odbijenih redaka (generator ne pazi na kontrolnu znamenku OIB-a)
+            print(text); ok = False
+
+    picked = pd.read_excel(os.path.join(out, "clanovi.xlsx"))[["ime", "prezime", "oib"]].head(500).assign(grupa="Veterani")
+    picked.to_excel(os.path.join(out, "grupe.xlsx"), index=False)
+    t, code, text = run(path, "assign-groups", os.path.join(out, "grupe.xlsx"))
+    print(f"{'assign-groups':<18} {t:6.2f} s  izlaz {code}  {text.splitlines()[0]}")
+
+    report = pd.read_excel(os.path.join(out, "uvoz.xlsx"))
+    total = conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+    member_id = members.save(conn, {"first_name": "Ana", "last_name": "Horvat", "oib": "69435151530", "group_name": "Hrvačice"})
+    again = members.save(conn, {"first_name": "Ana", "last_name": "Horvat-Kos", "oib": "69435151530", "group_name": "Hrvačice"})
+    coach_id = coaches.save(conn, {"first_name": "Ivo", "last_name": "Trener"})
+    comp_id = competitions.save(conn, {"kind": "PRVENSTVO HRVATSKE", "date_from": f"{year}-05-01", "date_to": f"{year}-05-01"},
+                                [coach_id], {coach_id: "Ivo Trener"})
+    result_id = competitions.add_result(conn, comp_id, member_id, {"wins": 1, "losses": 1, "placement": 3},
+                                        [(bouts.WIN, {"opponent": "Marko Marić", "club": "HK Zagreb"}),
+                                         (bouts.LOSS, {"opponent": "Luka Lukić", "club": "HK Split", "score": "2:4"})])
+    saved = conn.execute("SELECT COUNT(*), SUM(outcome='W') FROM bouts WHERE result_id=?", (result_id,)).fetchone()
+    linked = conn.execute("SELECT coach_id FROM competition_coaches WHERE competition_id=?", (comp_id,)).fetchall()
+    if not a.check:
+        return 0
+    if probe.stdout.strip() != "False":
+        print(f"GREŠKA: uvoz podatkovnog sloja učitava streamlit ({probe.stdout.strip() or probe.stderr.strip()[-200:]})"); ok = False
+    if timings["--help"] > HELP_LIMIT:
+        print(f"GREŠKA: --help traje {timings['--help']:.2f} s"); ok = False
+    if "novi" in set(report["status"]) or len(report) != a.members or total != a.members:
+        print(f"GREŠKA: ponovni uvoz izvoza: {report['status'].value_counts().to_dict()}"); ok = False
+    if code != 0 or conn.execute("SELECT COUNT(*) FROM members WHERE group_name='Veterani' AND oib IN (%s)"
+                                 % ",".join("?" * len(picked)), [f"{o:011d}" for o in picked["oib"]]).fetchone()[0] != len(picked):
+        print(f"GREŠKA: assign-groups: {text}"); ok = False
+    if again != member_id or conn.execute("SELECT last_name FROM members WHERE id=?", (member_id,)).fetchone()[0] != "Horvat-Kos":
+        print("GREŠKA: members.save po OIB-u nije ažurirao istog člana"); ok = False
+    if tuple(saved) != (2, 1) or linked != [(coach_id,)]:
+        print(f"GREŠKA: natjecanje/rezultat: borbe {tuple(saved)}, treneri {linked}"); ok = False
+    print("U redu." if ok else "Neuspjeh.")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
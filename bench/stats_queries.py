@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Statistički upiti nad sintetičkim klubom (20 sezona, ~100k rezultata):
+vrijeme izvođenja + EXPLAIN QUERY PLAN. Da planovi koriste indekse
+provjerava tests/test_stats_plans.py.
+
+    python -m bench.stats_queries
+"""
+import argparse, statistics, time
+
+from hkpodravka import stats
+from bench.generator import new_db, fill
+
+# (naziv, sql, parametri)
+def cases(year):
+    where, params = stats.where_clause(None, None, year - 3, year)
+    cwhere, cparams = stats.where_clause(None, 1, year - 3, year)
+    return [
+        ("summary", stats.SUMMARY_AGG_SQL, (year - 3, year)),
+        ("summary_raw", stats.SUMMARY_SQL.format(where=where), params),
+        ("summary_coach", stats.SUMMARY_SQL.format(where=cwhere), cparams),
+        ("per_coach", stats.PER_COACH_SQL, (1,)),
+        ("coach_options", stats.COMPETITION_COACHES_SQL, ()),
+        ("per_year", stats.PER_YEAR_SQL, ()),
+        ("per_age", stats.PER_AGE_SQL, (year,)),
+        ("per_kind", stats.PER_KIND_SQL, (year, year)),
+        ("per_athlete", stats.PER_ATHLETE_SQL, (42,)),
+        ("year_results", stats.YEAR_RESULTS_SQL, (year,)),
+    ]
+
+def plan(conn, sql, params):
+    return [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+def timed(conn, sql, params, repeat):
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter(); conn.execute(sql, params).fetchall(); out.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(out)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--seasons", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=5)
+    a = ap.parse_args()
+    conn, path = new_db()
+    fill(conn, seasons=a.seasons)
+    conn.execute("ANALYZE")
+    n = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    year = conn.execute("SELECT MAX(year) FROM competitions").fetchone()[0]
+    print(f"{path}: {n} rezultata, zadnja sezona {year}")
+    for name, sql, params in cases(year):
+        p = plan(conn, sql, params)
+        ms = timed(conn, sql, params, a.repeat)
+        print(f"{name:13} {ms:9.2f} ms")
+        for line in p:
+            print(f"{'':16}{line}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Galerija natjecanja s fotografijama s mobitela: koliko bajtova ide u
+preglednik za mrežu slika (originali naspram umanjenih) i koliko traje
+izrada izvedenica (jedna dretva naspram bazena). EXIF se provjerava na
+izvedenicama.
+
+    python -m bench.thumbnails --photos 24
+"""
+import argparse, io, os, shutil, tempfile, time
+
+from PIL import Image
+
+from hkpodravka import images, uploads
+
+class Upload(io.BytesIO):
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def phone_photo(i, size=(4032, 3024)):
+    im = Image.effect_noise(size, 40 + i).convert("RGB")
+    exif = Image.Exif(); exif[0x0112] = 6; exif[0x010F] = "Mobitel"
+    out = io.BytesIO(); im.save(out, "JPEG", quality=90, exif=exif)
+    return out.getvalue()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--photos", type=int, default=24)
+    ap.add_argument("--workers", type=int, default=images.WORKERS)
+    a = ap.parse_args()
+    root = tempfile.mkdtemp(prefix="hkp_thumbs_")
+    paths = [uploads.store(Upload(phone_photo(i), f"IMG_{i:04d}.jpg"), root) for i in range(a.photos)]
+    original = sum(os.path.getsize(p) for p in paths)
+
+    timings = {}
+    for label, workers in (("1 dretva", 1), (f"{a.workers} dretve", a.workers)):
+        shutil.rmtree(uploads.derived_dir(root), ignore_errors=True)
+        t0 = time.perf_counter(); images.derive_all(paths, root=root, workers=workers); timings[label] = time.perf_counter() - t0
+    t0 = time.perf_counter(); thumbs = [images.derive(p, "thumb", root) for p in paths]; cached = time.perf_counter() - t0
+    thumb_bytes = sum(os.path.getsize(p) for p in thumbs)
+    with Image.open(thumbs[0]) as im:
+        exif_left = len(im.getexif())
+
+    print(f"{a.photos} fotografija, CPU: {os.cpu_count()}")
+    print(f"mreža: originali {original / 2**20:7.1f} MB   umanjene {thumb_bytes / 2**20:7.2f} MB")
+    for label, t in timings.items():
+        print(f"izvedenice ({label}): {t:6.2f} s")
+    print(f"ponovni prikaz (predmemorija): {cached * 1000:.1f} ms   EXIF oznaka na umanjenoj: {exif_left}")
+
+if __name__ == "__main__":
+    main()
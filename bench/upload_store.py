@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Galerija natjecanja: stari save_upload (vrijeme_ime, cijeli sadržaj u
+memoriji) naspram spremišta adresiranog sadržajem (hkpodravka.uploads).
+Mjeri zauzeće diska, vrijeme i vrh memorije; s --check provjerava i da
+isti sadržaj postoji samo jednom, da se isto ime u istoj sekundi ne
+prepisuje i da GC briše samo blobove bez reference.
+
+    python -m bench.upload_store --photos 200 --dup 0.3 --check
+"""
+import argparse, io, json, os, random, sys, tempfile, time, tracemalloc
+from datetime import datetime
+
+from hkpodravka import uploads
+from bench.generator import new_db
+
+class Upload(io.BytesIO):
+    """Zamjena za streamlit UploadedFile (BytesIO s imenom)."""
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+def legacy_save(file, root, subdir="competitions/gallery"):
+    path = os.path.join(root, subdir); os.makedirs(path, exist_ok=True)
+    full = os.path.join(path, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.name}")
+    with open(full, "wb") as f: f.write(file.getbuffer())
+    return full
+
+def disk_usage(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+def run(save, files):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    paths = [save(Upload(data, name)) for data, name in files]
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return paths, elapsed, peak
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--photos", type=int, default=200)
+    ap.add_argument("--size-kb", type=int, default=2048)
+    ap.add_argument("--dup", type=float, default=0.3, help="udio ponovno poslanih fotografija")
+    ap.add_argument("--check", action="store_true")
+    a = ap.parse_args()
+    rnd = random.Random(1)
+    unique = [os.urandom(a.size_kb * 1024) for _ in range(max(1, int(a.photos * (1 - a.dup))))]
+    # ista imena (IMG_0001.jpg …) kao s mobitela, dio sadržaja ponovljen
+    files = [(unique[i] if i < len(unique) else rnd.choice(unique), f"IMG_{i % 50:04d}.jpg") for i in range(a.photos)]
+
+    base = tempfile.mkdtemp(prefix="hkp_uploads_")
+    old_root, new_root = os.path.join(base, "legacy"), os.path.join(base, "cas")
+    # stari način dobiva jedinstvena imena da ništa ne prepiše – usporedba diska je onda ista količina datoteka
+    legacy_files = [(data, f"{i:04d}_{name}") for i, (data, name) in enumerate(files)]
+    old_paths, old_t, old_peak = run(lambda f: legacy_save(f, old_root), legacy_files)
+    new_paths, new_t, new_peak = run(lambda f: uploads.store(f, new_root), files)
+    print(f"{a.photos} fotografija po {a.size_kb} kB, {len(unique)} različitih; "
+          f"poslano {sum(len(d) for d, _ in files) / 2**20:.1f} MB")
+    usage = {}
+    for label, paths, t, peak, root in (("stari", old_paths, old_t, old_peak, old_root), ("blob", new_paths, new_t, new_peak, new_root)):
+        usage[label] = disk_usage(root)
+        print(f"{label:6s} disk {usage[label] / 2**20:8.1f} MB   datoteka {len(set(paths)):5d}   "
+              f"{t:6.2f} s   vrh memorije {peak / 2**20:6.1f} MB")
+    saved = usage["stari"] - usage["blob"]
+    print(f"ušteda deduplikacijom: {saved / 2**20:.1f} MB ({saved / max(usage['stari'], 1):.0%})")
+
+    failures = []
+    # imena s mobitela (IMG_0001.jpg …) na starom načinu – prazan sadržaj, broji se samo prepisivanje
+    lost_paths = [legacy_save(Upload(b"", name), os.path.join(base, "legacy_names")) for _, name in files]
+    lost = len(files) - len(set(lost_paths))
+    print(f"stari s imenima s mobitela: prepisano istim imenom u istoj sekundi: {lost}")
+    if len(set(new_paths)) != len(unique):
+        failures.append("isti sadržaj spremljen više puta")
+    conn, _ = new_db()
+    keep = new_paths[: len(new_paths) // 2]
+    conn.execute("INSERT INTO competitions(name, gallery_paths_json) VALUES ('Turnir', ?)", (json.dumps(keep),))
+    conn.commit()
+    deleted, freed = uploads.gc(conn, new_root, min_age=0)
+    left = {os.path.normpath(p) for p in uploads._blobs(new_root)}
+    print(f"GC: obrisano {deleted} blobova ({freed / 2**20:.1f} MB), ostalo {len(left)}")
+    if left != {os.path.normpath(p) for p in keep}:
+        failures.append("GC obrisao referencirani ili ostavio nereferencirani blob")
+    if a.check and failures:
+        print("GREŠKA: " + "; ".join(failures))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
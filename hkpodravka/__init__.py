@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – podatkovni sloj aplikacije (SQLite).
+"""
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""python -m hkpodravka <naredba> – vidi cli.py."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
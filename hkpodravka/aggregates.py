@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – materijalizirani zbrojevi rezultata.
+  agg_medals      (year, kind, age_cat, style)  – borbe, pobjede, porazi, medalje
+  agg_member_year (member_id, year)             – isto po sportašu i godini
+Okidači na results ih ažuriraju inkrementalno (+/- jedan redak); promjena
+datuma/vrste/uzrasta natjecanja ponovno izračunava samo pogođene ključeve.
+NULL vrijednosti ključeva spremaju se kao '' odnosno 0.
+
+    python -m hkpodravka.aggregates check|rebuild [--db hk_podravka.db]
+"""
+import argparse, sys
+
+from . import db
+
+COUNTERS = ("results_count", "fights", "wins", "losses", "gold", "silver", "bronze")
+
+TABLES_SQL = (
+    """CREATE TABLE IF NOT EXISTS agg_medals (
+        year INTEGER NOT NULL, kind TEXT NOT NULL, age_cat TEXT NOT NULL, style TEXT NOT NULL,
+        results_count INTEGER NOT NULL DEFAULT 0, fights INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0, losses INTEGER NOT NULL DEFAULT 0,
+        gold INTEGER NOT NULL DEFAULT 0, silver INTEGER NOT NULL DEFAULT 0, bronze INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (year, kind, age_cat, style)
+    ) WITHOUT ROWID""",
+    """CREATE TABLE IF NOT EXISTS agg_member_year (
+        member_id INTEGER NOT NULL, year INTEGER NOT NULL,
+        results_count INTEGER NOT NULL DEFAULT 0, fights INTEGER NOT NULL DEFAULT 0,
+        wins INTEGER NOT NULL DEFAULT 0, losses INTEGER NOT NULL DEFAULT 0,
+        gold INTEGER NOT NULL DEFAULT 0, silver INTEGER NOT NULL DEFAULT 0, bronze INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (member_id, year)
+    ) WITHOUT ROWID""",
+)
+
+# doprinos jednog retka rezultata ({r} = NEW / OLD / alias), redom kao COUNTERS
+def _value_list(r):
+    return ["1", f"COALESCE({r}.fights_total,0)", f"COALESCE({r}.wins,0)", f"COALESCE({r}.losses,0)",
+            f"(COALESCE({r}.placement,0)=1)", f"(COALESCE({r}.placement,0)=2)", f"(COALESCE({r}.placement,0)=3)"]
+
+def _values(r):
+    return ", ".join(_value_list(r))
+
+def _sums(r):
+    return ", ".join("COUNT(*)" if v == "1" else f"SUM({v})" for v in _value_list(r))
+
+_UPSERT = ", ".join(f"{c}={c}+excluded.{c}" for c in COUNTERS)
+_COLS = ", ".join(COUNTERS)
+
+def _add_sql(r):
+    return f"""
+    INSERT INTO agg_medals(year, kind, age_cat, style, {_COLS})
+    SELECT COALESCE(c.year,0), COALESCE(c.kind,''), COALESCE(c.age_cat,''), COALESCE({r}.style,''), {_values(r)}
+      FROM competitions c WHERE c.id={r}.competition_id
+    ON CONFLICT(year, kind, age_cat, style) DO UPDATE SET {_UPSERT};
+    INSERT INTO agg_member_year(member_id, year, {_COLS})
+    SELECT {r}.member_id, COALESCE(c.year,0), {_values(r)}
+      FROM competitions c WHERE c.id={r}.competition_id AND {r}.member_id IS NOT NULL
+    ON CONFLICT(member_id, year) DO UPDATE SET {_UPSERT};"""
+
+def _sub_sql(r):
+    dec = ", ".join(f"{c}={c}-{v}" for c, v in zip(COUNTERS, _value_list(r)))
+    medals_key = f"""(year, kind, age_cat) = (SELECT COALESCE(c.year,0), COALESCE(c.kind,''), COALESCE(c.age_cat,'')
+                                      FROM competitions c WHERE c.id={r}.competition_id)
+       AND style=COALESCE({r}.style,'')"""
+    member_key = f"""member_id={r}.member_id
+       AND year=(SELECT COALESCE(c.year,0) FROM competitions c WHERE c.id={r}.competition_id)"""
+    return f"""
+    UPDATE agg_medals SET {dec}
+     WHERE {medals_key};
+    DELETE FROM agg_medals WHERE results_count<=0 AND {medals_key};
+    UPDATE agg_member_year SET {dec}
+     WHERE {member_key};
+    DELETE FROM agg_member_year WHERE results_count<=0 AND {member_key};"""
+
+def _slice_sql(comp):
+    """Briše i ponovno računa ključeve pogođene natjecanjem {comp} (OLD ili NEW)."""
+    year = f"COALESCE(CAST(substr({comp}.date_from,1,4) AS INTEGER),0)"
+    return f"""
+    DELETE FROM agg_medals WHERE year={year} AND kind=COALESCE({comp}.kind,'') AND age_cat=COALESCE({comp}.age_cat,'');
+    INSERT INTO agg_medals(year, kind, age_cat, style, {_COLS})
+    SELECT COALESCE(c.year,0), COALESCE(c.kind,''), COALESCE(c.age_cat,''), COALESCE(r.style,''), {_sums('r')}
+      FROM competitions c JOIN results r ON r.competition_id=c.id
+     WHERE COALESCE(c.year,0)={year} AND COALESCE(c.kind,'')=COALESCE({comp}.kind,'') AND COALESCE(c.age_cat,'')=COALESCE({comp}.age_cat,'')
+     GROUP BY 1, 2, 3, 4;
+    DELETE FROM agg_member_year WHERE year={year}
+       AND member_id IN (SELECT member_id FROM results WHERE competition_id={comp}.id);
+    INSERT INTO agg_member_year(member_id, year, {_COLS})
+    SELECT r.member_id, COALESCE(c.year,0), {_sums('r')}
+      FROM results r JOIN competitions c ON c.id=r.competition_id
+     WHERE COALESCE(c.year,0)={year} AND r.member_id IN (SELECT member_id FROM results WHERE competition_id={comp}.id)
+     GROUP BY 1, 2;"""
+
+TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS trg_results_agg_ins AFTER INSERT ON results
+    BEGIN {_add_sql('NEW')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_results_agg_del AFTER DELETE ON results
+    BEGIN {_sub_sql('OLD')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_results_agg_upd
+    AFTER UPDATE OF competition_id, member_id, style, fights_total, wins, losses, placement ON results
+    BEGIN {_sub_sql('OLD')} {_add_sql('NEW')}
+    END""",
+    # rezultati se brišu prije natjecanja da okidač na results još vidi godinu/vrstu
+    """CREATE TRIGGER IF NOT EXISTS trg_competitions_agg_del BEFORE DELETE ON competitions
+    BEGIN
+        DELETE FROM results WHERE competition_id=OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_competitions_agg_upd AFTER UPDATE OF date_from, kind, age_cat ON competitions
+    BEGIN {_slice_sql('OLD')} {_slice_sql('NEW')}
+    END""",
+)
+
+FULL_MEDALS_SQL = f"""SELECT COALESCE(c.year,0), COALESCE(c.kind,''), COALESCE(c.age_cat,''), COALESCE(r.style,''), {_sums('r')}
+    FROM competitions c JOIN results r ON r.competition_id=c.id GROUP BY 1, 2, 3, 4"""
+
+FULL_MEMBER_YEAR_SQL = f"""SELECT r.member_id, COALESCE(c.year,0), {_sums('r')}
+    FROM results r JOIN competitions c ON c.id=r.competition_id
+    WHERE r.member_id IS NOT NULL GROUP BY 1, 2"""
+
+
+def install(cur):
+    """Tablice + okidači + početno punjenje (poziva se iz migracije)."""
+    for sql in TABLES_SQL + TRIGGERS_SQL:
+        cur.execute(sql)
+    _fill(cur)
+
+def _fill(cur):
+    cur.execute("DELETE FROM agg_medals")
+    cur.execute("DELETE FROM agg_member_year")
+    cur.execute(f"INSERT INTO agg_medals(year, kind, age_cat, style, {_COLS}) {FULL_MEDALS_SQL}")
+    cur.execute(f"INSERT INTO agg_member_year(member_id, year, {_COLS}) {FULL_MEMBER_YEAR_SQL}")
+
+def rebuild(conn):
+    """Puni zbrojne tablice iznova iz results/competitions u jednoj transakciji."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _fill(conn.cursor())
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def check(conn):
+    """Uspoređuje zbrojne tablice s punim izračunom; vraća listu razlika (prazna = u redu)."""
+    problems = []
+    for table, key, full in (("agg_medals", "year, kind, age_cat, style", FULL_MEDALS_SQL),
+                             ("agg_member_year", "member_id, year", FULL_MEMBER_YEAR_SQL)):
+        stored = f"SELECT {key}, {_COLS} FROM {table}"
+        for label, sql in (("nedostaje", f"{full} EXCEPT {stored}"), ("višak", f"{stored} EXCEPT {full}")):
+            problems += [(table, label, row) for row in conn.execute(sql)]
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Provjera i ponovna izgradnja zbrojnih tablica.")
+    ap.add_argument("command", choices=["check", "rebuild"])
+    ap.add_argument("--db", default=db.DB_PATH)
+    a = ap.parse_args(argv)
+    from .migrations import ensure_schema
+    ensure_schema(a.db)
+    with db.connection(a.db) as conn:
+        if a.command == "rebuild":
+            rebuild(conn)
+        problems = check(conn)
+    for table, label, row in problems:
+        print(f"{table}: {label} {row}")
+    print("U redu." if not problems else f"{len(problems)} razlika.")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
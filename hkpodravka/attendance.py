@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – evidencija prisustva na treninzima.
+Kvačice se skupljaju u formi i ništa se ne piše dok trener ne potvrdi;
+tada se upisuju samo retci koji se razlikuju od stanja u bazi, jednim
+executemany upsertom (ON CONFLICT(session_id, member_id)).
+"""
+from .db import query_df
+
+# članovi grupe + svi koji već imaju zapis za trening (npr. dodani iz druge grupe)
+ROSTER_SQL = """SELECT m.id AS member_id, m.first_name || ' ' || m.last_name AS ime,
+       COALESCE(a.present, 0) AS prisutan, a.member_id IS NOT NULL AS zabiljezen
+    FROM members m
+    LEFT JOIN attendance a ON a.member_id = m.id AND a.session_id = ?
+    WHERE m.group_name = ? OR a.member_id IS NOT NULL
+    ORDER BY m.last_name, m.first_name"""
+
+UPSERT_SQL = """INSERT INTO attendance(session_id, member_id, present) VALUES (?,?,?)
+    ON CONFLICT(session_id, member_id) DO UPDATE SET present=excluded.present"""
+
+
+def roster(conn, session_id, group_name):
+    return query_df(conn, ROSTER_SQL, (int(session_id), group_name))
+
+def changed_rows(roster_df, marked):
+    """marked: {member_id: bool} iz forme -> [(member_id, present)] koje treba upisati.
+    Upisuje se i nezabilježen član (odsutan je tek kad ga trener tako potvrdi)."""
+    out = []
+    for mid, present, recorded in roster_df[["member_id", "prisutan", "zabiljezen"]].itertuples(index=False, name=None):
+        value = int(bool(marked.get(int(mid), present)))
+        if not recorded or value != int(present):
+            out.append((int(mid), value))
+    return out
+
+def save(conn, session_id, rows):
+    """Upisuje [(member_id, present)] u jednoj transakciji; vraća broj redaka."""
+    try:
+        conn.executemany(UPSERT_SQL, [(int(session_id), mid, present) for mid, present in rows])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(rows)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – analitika prisustva.
+Za razdoblje se jednim upitom čitaju treninzi (idx_training_sessions_start_group),
+jednim zapisi prisustva tih treninga, a stope, sati, nizovi i tjedna matrica
+računaju se vektorski u pandas. Očekivani treninzi člana su treninzi njegove
+grupe u razdoblju i svi treninzi na kojima ima zapis.
+Rezultati se pamte u CACHE dok bump() na ATTENDANCE_TABLES ne promijeni verziju.
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+
+from .cache import LRUCache, cached_query
+from .db import query_df
+
+ATTENDANCE_TABLES = ("training_sessions", "attendance", "members")
+CACHE = LRUCache(maxsize=64)
+cached = cached_query(CACHE, ATTENDANCE_TABLES)
+
+ALL_GROUPS = "(sve)"
+
+SESSIONS_SQL = """SELECT id AS session_id, COALESCE(group_name,'') AS grupa, start_dt,
+       COALESCE((julianday(end_dt) - julianday(start_dt)) * 24.0, 0) AS sati
+    FROM training_sessions
+    WHERE start_dt >= ? AND start_dt < ? {group}
+    ORDER BY start_dt"""
+
+RECORDS_SQL = """SELECT a.session_id, a.member_id, a.present
+    FROM training_sessions s JOIN attendance a ON a.session_id = s.id
+    WHERE s.start_dt >= ? AND s.start_dt < ? {group}"""
+
+MEMBERS_SQL = """SELECT id AS member_id, last_name || ' ' || first_name AS ime, COALESCE(group_name,'') AS grupa
+    FROM members"""
+
+GROUP_COLUMNS = ["grupa", "treninga", "sati", "prisutnih", "ocekivanih", "prosjek_po_treningu", "stopa"]
+MEMBER_COLUMNS = ["member_id", "ime", "grupa", "treninga", "prisutan", "stopa", "sati", "niz", "najdulji_niz"]
+
+
+def _range(date_from, date_to):
+    # start_dt je ISO tekst: [od, do + 1 dan) hvata cijeli zadnji dan
+    return str(date_from)[:10], (date.fromisoformat(str(date_to)[:10]) + timedelta(days=1)).isoformat()
+
+def _group(group, alias=""):
+    if group and group != ALL_GROUPS:
+        return f" AND COALESCE({alias}group_name,'') = ?", [group]
+    return "", []
+
+@cached
+def sessions(conn, date_from, date_to, group=None):
+    cond, extra = _group(group)
+    return query_df(conn, SESSIONS_SQL.format(group=cond), [*_range(date_from, date_to), *extra])
+
+@cached
+def expected(conn, date_from, date_to, group=None):
+    """Jedan redak po (član, očekivani trening): member_id, ime, grupa, session_id, start_dt, sati, present."""
+    s = sessions(conn, date_from, date_to, group)
+    cond, extra = _group(group, "s.")
+    rec = query_df(conn, RECORDS_SQL.format(group=cond), [*_range(date_from, date_to), *extra])
+    m = query_df(conn, MEMBERS_SQL)
+    by_group = m[["member_id", "grupa"]].merge(s[["session_id", "grupa"]], on="grupa")[["member_id", "session_id"]]
+    pairs = pd.concat([by_group, rec[["member_id", "session_id"]]]).drop_duplicates()
+    out = (pairs.merge(rec, on=["member_id", "session_id"], how="left")
+                .merge(s[["session_id", "start_dt", "sati"]], on="session_id")
+                .merge(m, on="member_id"))
+    out["present"] = pd.to_numeric(out["present"]).fillna(0).astype(int)
+    return out.sort_values(["member_id", "start_dt"], ignore_index=True)
+
+def _streaks(e):
+    """(trenutni, najdulji) niz uzastopnih prisustava po članu."""
+    p = e["present"].to_numpy()
+    new_run = (e["member_id"] != e["member_id"].shift()) | (e["present"] != e["present"].shift())
+    run_len = e.groupby(new_run.cumsum()).cumcount() + 1
+    run_len = run_len.where(p == 1, 0)
+    longest = run_len.groupby(e["member_id"]).max()
+    current = run_len.groupby(e["member_id"]).last()
+    return current, longest
+
+@cached
+def member_rates(conn, date_from, date_to, group=None):
+    e = expected(conn, date_from, date_to, group)
+    if e.empty:
+        return pd.DataFrame(columns=MEMBER_COLUMNS)
+    e["sati_prisutan"] = e["sati"] * e["present"]
+    out = e.groupby(["member_id", "ime", "grupa"], as_index=False).agg(
+        treninga=("session_id", "size"), prisutan=("present", "sum"), sati=("sati_prisutan", "sum"))
+    out["stopa"] = (out["prisutan"] / out["treninga"]).round(3)
+    out["sati"] = out["sati"].round(1)
+    current, longest = _streaks(e)
+    out["niz"] = out["member_id"].map(current)
+    out["najdulji_niz"] = out["member_id"].map(longest)
+    return out[MEMBER_COLUMNS].sort_values(["grupa", "ime"], ignore_index=True)
+
+@cached
+def group_rates(conn, date_from, date_to, group=None):
+    s = sessions(conn, date_from, date_to, group)
+    if s.empty:
+        return pd.DataFrame(columns=GROUP_COLUMNS)
+    e = expected(conn, date_from, date_to, group)
+    per_session = e.groupby("session_id")["present"].agg(["sum", "size"])
+    s = s.join(per_session, on="session_id").fillna({"sum": 0, "size": 0})
+    out = s.groupby("grupa", as_index=False).agg(
+        treninga=("session_id", "size"), sati=("sati", "sum"), prisutnih=("sum", "sum"), ocekivanih=("size", "sum"))
+    out["prosjek_po_treningu"] = (out["prisutnih"] / out["treninga"]).round(1)
+    out["stopa"] = (out["prisutnih"] / out["ocekivanih"].where(out["ocekivanih"] > 0)).round(3)
+    out["sati"] = out["sati"].round(1)
+    return out[GROUP_COLUMNS]
+
+@cached
+def weekly_matrix(conn, date_from, date_to, group=None):
+    """Član x ISO tjedan ('2025-W03') -> broj treninga na kojima je bio."""
+    e = expected(conn, date_from, date_to, group)
+    if e.empty:
+        return pd.DataFrame(columns=["member_id", "ime"])
+    s = sessions(conn, date_from, date_to, group)
+    # tjedan se računa po treningu (stotine), ne po zapisu (desetci tisuća)
+    week = pd.Series(pd.to_datetime(s["start_dt"], format="ISO8601").dt.strftime("%G-W%V").to_numpy(), index=s["session_id"])
+    e["tjedan"] = e["session_id"].map(week)
+    return (e.groupby(["member_id", "ime", "tjedan"])["present"].sum()
+             .unstack("tjedan", fill_value=0).reset_index().rename_axis(columns=None))
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – pojedinačne borbe (tablica bouts).
+Jedan redak po borbi: rezultat (results.id), ishod W/L, protivnik, klub,
+rezultat borbe i kolo. opponent_key / club_key su isti tekst bez
+dijakritike i velikih slova (lookup.fold) i indeksirani su, pa je
+"omjer protiv kluba X zadnjih 5 sezona" traženje po indeksu, bez
+parsiranja JSON-a po retku rezultata. Stari zapis "Ime Prezime;Klub" iz
+results.wins_detail_json / losses_detail_json prenosi se migracijom 10
+(import_details); ti stupci ostaju kao arhiva, ali se više ne pišu.
+"""
+import functools, json
+
+from .cache import LRUCache, cached_query
+from .db import query_df
+from .lookup import fold
+
+BOUT_TABLES = ("bouts", "results", "competitions", "members")
+CACHE = LRUCache(maxsize=64)
+cached = cached_query(CACHE, BOUT_TABLES)
+
+WIN, LOSS = "W", "L"
+OUTCOMES = {"Pobjeda": WIN, "Poraz": LOSS}
+FIELDS = ("opponent", "club", "score", "round")
+EDITOR_COLUMNS = ["ishod", "protivnik", "klub", "rezultat", "kolo"]
+
+_key = functools.lru_cache(maxsize=8192)(fold)  # imena i klubovi se ponavljaju kroz tisuće borbi
+
+TABLES_SQL = (
+    """CREATE TABLE IF NOT EXISTS bouts (
+        id INTEGER PRIMARY KEY,
+        result_id INTEGER NOT NULL REFERENCES results(id) ON DELETE CASCADE,
+        outcome TEXT NOT NULL CHECK (outcome IN ('W','L')),
+        opponent TEXT NOT NULL DEFAULT '', opponent_key TEXT NOT NULL DEFAULT '',
+        club TEXT NOT NULL DEFAULT '', club_key TEXT NOT NULL DEFAULT '',
+        score TEXT NOT NULL DEFAULT '', round TEXT NOT NULL DEFAULT ''
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_bouts_result ON bouts(result_id)",
+    "CREATE INDEX IF NOT EXISTS idx_bouts_opponent ON bouts(opponent_key, result_id, outcome)",
+    "CREATE INDEX IF NOT EXISTS idx_bouts_club ON bouts(club_key, result_id, outcome)",
+)
+
+INSERT_SQL = """INSERT INTO bouts(result_id, outcome, opponent, opponent_key, club, club_key, score, round)
+    VALUES (?,?,?,?,?,?,?,?)"""
+
+# rezultati sa starim zapisom, a bez redaka u bouts (ponovno pokretanje ništa ne udvostručuje)
+DETAILS_SQL = """SELECT r.id, r.wins_detail_json, r.losses_detail_json FROM results r
+    WHERE (COALESCE(r.wins_detail_json,'') NOT IN ('','[]') OR COALESCE(r.losses_detail_json,'') NOT IN ('','[]'))
+      AND NOT EXISTS (SELECT 1 FROM bouts b WHERE b.result_id=r.id)"""
+
+CLUBS_SQL = """SELECT MIN(club) AS klub, club_key, COUNT(*) AS borbi FROM bouts
+    WHERE club_key<>'' GROUP BY club_key ORDER BY borbi DESC, klub"""
+
+CLUB_RECORD_SQL = """SELECT CAST(c.year AS TEXT) AS godina, COUNT(*) AS borbi,
+       SUM(b.outcome='W') AS pobjede, SUM(b.outcome='L') AS porazi
+    FROM bouts b
+    JOIN results r ON r.id=b.result_id
+    JOIN competitions c ON c.id=r.competition_id
+    WHERE b.club_key=? AND c.year BETWEEN ? AND ?
+    GROUP BY c.year ORDER BY c.year"""
+
+OPPONENTS_SQL = """SELECT MIN(b.opponent) AS protivnik, MIN(b.club) AS klub, COUNT(*) AS borbi,
+       SUM(b.outcome='W') AS pobjede, SUM(b.outcome='L') AS porazi, MAX(c.date_from) AS zadnja
+    FROM bouts b
+    JOIN results r ON r.id=b.result_id
+    JOIN competitions c ON c.id=r.competition_id
+    WHERE c.year BETWEEN ? AND ? AND b.opponent_key<>''
+    GROUP BY b.opponent_key ORDER BY borbi DESC, protivnik LIMIT ?"""
+
+HEAD_TO_HEAD_SQL = """SELECT MIN(b.opponent) AS protivnik, MIN(b.club) AS klub, COUNT(*) AS borbi,
+       SUM(b.outcome='W') AS pobjede, SUM(b.outcome='L') AS porazi, MAX(c.date_from) AS zadnja
+    FROM results r
+    JOIN bouts b ON b.result_id=r.id
+    JOIN competitions c ON c.id=r.competition_id
+    WHERE r.member_id=?
+    GROUP BY b.opponent_key ORDER BY borbi DESC, protivnik"""
+
+RESULT_BOUTS_SQL = """SELECT CASE outcome WHEN 'W' THEN 'Pobjeda' ELSE 'Poraz' END AS ishod,
+       opponent AS protivnik, club AS klub, score AS rezultat, round AS kolo
+    FROM bouts WHERE result_id=? ORDER BY id"""
+
+
+def install(cur):
+    """Tablica + indeksi + prijenos starog zapisa (poziva se iz migracije)."""
+    for sql in TABLES_SQL:
+        cur.execute(sql)
+    return import_details(cur)
+
+def parse_item(text):
+    """'Ime Prezime;Klub[;rezultat[;kolo]]' -> dict polja FIELDS."""
+    parts = [p.strip() for p in str(text).split(";")]
+    return dict(zip(FIELDS, parts[:len(FIELDS)] + [""] * (len(FIELDS) - len(parts))))
+
+def _json_items(raw):
+    try:
+        items = json.loads(raw or "[]")
+    except (TypeError, ValueError):
+        items = [s for s in str(raw).split("|")]  # neispravan JSON: barem tekst odvojen s |
+    return [s for s in (items if isinstance(items, list) else [items]) if str(s).strip()]
+
+def _row(result_id, outcome, bout):
+    b = {f: str(bout.get(f) or "").strip() for f in FIELDS}
+    return (int(result_id), outcome, b["opponent"], _key(b["opponent"]), b["club"], _key(b["club"]), b["score"], b["round"])
+
+def import_details(cur):
+    """Prenosi wins/losses_detail_json u bouts za rezultate koji još nemaju borbe; vraća broj borbi."""
+    rows = []
+    for result_id, wins_json, losses_json in cur.execute(DETAILS_SQL).fetchall():
+        for outcome, raw in ((WIN, wins_json), (LOSS, losses_json)):
+            rows += [_row(result_id, outcome, parse_item(item)) for item in _json_items(raw)]
+    cur.executemany(INSERT_SQL, rows)
+    return len(rows)
+
+def from_editor(df):
+    """Retci iz st.data_editor-a (EDITOR_COLUMNS) -> [(ishod, dict)], bez praznih redaka."""
+    out = []
+    for r in df.fillna("").to_dict("records"):
+        bout = {"opponent": r.get("protivnik"), "club": r.get("klub"), "score": r.get("rezultat"), "round": r.get("kolo")}
+        if any(str(v).strip() for v in bout.values()):
+            out.append((OUTCOMES.get(r.get("ishod"), WIN), bout))
+    return out
+
+def save(conn, result_id, bouts):
+    """Zamjenjuje borbe rezultata; bouts = [(ishod, dict)]. Ne potvrđuje transakciju."""
+    conn.execute("DELETE FROM bouts WHERE result_id=?", (int(result_id),))
+    conn.executemany(INSERT_SQL, [_row(result_id, outcome, bout) for outcome, bout in bouts])
+    return len(bouts)
+
+def result_bouts(conn, result_id):
+    return query_df(conn, RESULT_BOUTS_SQL, (int(result_id),))
+
+
+@cached
+def clubs(conn):
+    """Klubovi protivnika (po broju borbi) za padajući izbornik."""
+    return query_df(conn, CLUBS_SQL)
+
+@cached
+def club_record(conn, club, year_from, year_to):
+    """Omjer pobjeda i poraza protiv kluba po godinama (idx_bouts_club)."""
+    return query_df(conn, CLUB_RECORD_SQL, (fold(club), int(year_from), int(year_to)))
+
+@cached
+def opponents(conn, year_from, year_to, limit=50):
+    return query_df(conn, OPPONENTS_SQL, (int(year_from), int(year_to), int(limit)))
+
+@cached
+def head_to_head(conn, member_id):
+    """Sportaš protiv svakog protivnika kojeg je sreo."""
+    return query_df(conn, HEAD_TO_HEAD_SQL, (int(member_id),))
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – predmemorija upita s invalidacijom preko brojača verzija.
+Putanje koje pišu u bazu pozivaju bump("results", ...); ključ predmemorije
+sadrži verzije tablica o kojima rezultat ovisi pa stari unosi više nikad
+nisu pogođeni i s vremenom ispadaju po LRU redu.
+Brojači su u memoriji procesa, a u bazu pišu i drugi procesi (naredbeni
+redak, radnik poslova). Zato okidači (migracija 13) uz svaku izmjenu
+VERSIONED tablice povećaju njezin redak u table_versions, a sync(conn) na
+početku izvođenja stranice i prije svakog posla jednim upitom preuzme
+promjene i pozove bump() za tablice koje je promijenio netko drugi.
+"""
+import functools, sqlite3, threading
+from collections import OrderedDict
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+def bump(*tables):
+    """Označava da su se podaci u navedenim tablicama promijenili."""
+    with _versions_lock:
+        for t in tables:
+            _versions[t] = _versions.get(t, 0) + 1
+
+def data_version(*tables):
+    with _versions_lock:
+        return tuple(_versions.get(t, 0) for t in tables)
+
+# tablice čije izmjene bilježe okidači (jobs i zbrojne tablice se ne prate: prve se mijenjaju
+# stalno, druge samo kroz okidače na results)
+VERSIONED = ("members", "coaches", "groups", "group_schedules", "competitions", "results", "competition_coaches",
+             "bouts", "training_sessions", "attendance", "club_calendar", "club_info", "club_docs")
+
+_seen = {}  # (baza, tablica) -> verzija iz table_versions kod zadnjeg sync()
+
+def install(cur):
+    """table_versions i okidači za VERSIONED tablice (migracija 13)."""
+    cur.execute("CREATE TABLE IF NOT EXISTS table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID")
+    cur.executemany("INSERT OR IGNORE INTO table_versions(name, version) VALUES (?, 0)", [(t,) for t in VERSIONED])
+    for t in VERSIONED:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cur.execute(f"""CREATE TRIGGER IF NOT EXISTS version_{t}_{event.lower()} AFTER {event} ON {t} BEGIN
+                UPDATE table_versions SET version=version+1 WHERE name='{t}';
+            END""")
+
+def sync(conn):
+    """Poziva bump() za tablice čija se verzija u bazi promijenila od prošlog poziva; vraća njihova imena."""
+    path = getattr(conn, "path", id(conn))
+    try:
+        rows = conn.execute("SELECT name, version FROM table_versions").fetchall()
+    except sqlite3.OperationalError:
+        return []  # baza prije migracije 13
+    changed = []
+    with _versions_lock:
+        for name, version in rows:
+            if _seen.get((path, name), version) != version:
+                changed.append(name)
+            _seen[(path, name)] = version
+    bump(*changed)
+    return changed
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()  # izvan zaključavanja – upit može trajati
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def peek(self, key, default=None):
+        """Vrijednost bez računanja i bez utjecaja na statistiku."""
+        with self._lock:
+            return self._data.get(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._data), "maxsize": self.maxsize,
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0}
+
+
+def cached_query(cache, tables):
+    """Dekorator za fn(conn, *args): rezultat se pamti po argumentima, bazi i verziji tablica.
+    DataFrame se vraća kao kopija da pozivatelj ne bi mijenjao spremljeni."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(conn, *args):
+            key = (fn.__name__, getattr(conn, "path", id(conn)), args, data_version(*tables))
+            value = cache.get_or_compute(key, lambda: fn(conn, *args))
+            return value.copy() if hasattr(value, "copy") else value
+        wrapper.uncached = fn
+        return wrapper
+    return deco
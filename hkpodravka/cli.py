@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – naredbeni redak za skupne poslove (noćna sinkronizacija sa
+savezom, izvještaji na kraju sezone) bez pokretanja Streamlita:
+
+    python -m hkpodravka import-members clanovi.xlsx --report izvjestaj.xlsx
+    python -m hkpodravka assign-groups grupe.xlsx
+    python -m hkpodravka export-members clanovi.xlsx [--group Hrvači]
+    python -m hkpodravka export-results rezultati_2025.xlsx --year 2025
+    python -m hkpodravka report-stats statistika.xlsx --from 2021 --to 2025
+    python -m hkpodravka report-attendance prisustvo.xlsx --from 2025-09-01 --to 2025-12-31
+    python -m hkpodravka sessions --from 2025-09-01 --to 2025-12-31 [--group Hrvači]
+    python -m hkpodravka report-documents dokumenti.xlsx [--group Hrvači] [--days 30] [--competition 12]
+    python -m hkpodravka search "čolak zagreb" [--kind member] [--page 2]
+
+Moduli (pandas, openpyxl) uvoze se tek u naredbi kojoj trebaju, pa
+--help i kratke naredbe kreću odmah.
+"""
+import argparse, sys
+from datetime import date
+
+from . import db
+
+
+def _write(path, sheets):
+    from . import export
+    with open(path, "wb") as f:
+        f.write(export.workbook(sheets))
+    print(f"Zapisano: {path}")
+
+def _report(path, name, report):
+    if path:
+        from . import export
+        _write(path, [export.frame_sheet(name, report)])
+
+def import_members(conn, a):
+    import pandas as pd
+    from . import members
+    report, counts = members.import_members(conn, pd.read_excel(a.file))
+    print(", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "Prazna datoteka.")
+    _report(a.report, "Izvjestaj", report)
+    return 1 if counts.get("odbijen") else 0
+
+def assign_groups(conn, a):
+    import pandas as pd
+    from . import members
+    report = members.assign_groups(conn, pd.read_excel(a.file))
+    missing = report[report["member_id"].isna()]
+    print(f"Upisano grupa: {len(report) - len(missing)}, nije upisano: {len(missing)}")
+    for r in missing.head(20).itertuples():
+        print(f"  redak {r.redak}: {r.ime} {r.prezime} – {r.status}")
+    _report(a.report, "Grupe", report)
+    return 1 if len(missing) else 0
+
+def export_members(conn, a):
+    from . import export, members
+    where, params = members.list_where(a.search, a.group or members.ALL, a.city)
+    _write(a.out, [export.query_sheet(conn, "Clanovi", members.EXPORT_SQL.format(where=where), params)])
+    return 0
+
+def export_results(conn, a):
+    from . import export, stats
+    _write(a.out, [export.query_sheet(conn, "Rezultati", stats.YEAR_RESULTS_SQL, (a.year,))])
+    return 0
+
+def report_stats(conn, a):
+    from . import export, stats
+    frames = stats.report_frames(conn, a.year_from, a.year_to, a.group or stats.ALL_GROUPS, stats.ALL_COACHES)
+    _write(a.out, [export.frame_sheet(sheet, frame) for sheet, frame in frames])
+    return 0
+
+def report_attendance(conn, a):
+    from . import attendance_stats, export
+    group = a.group or attendance_stats.ALL_GROUPS
+    _write(a.out, [export.frame_sheet("Grupe", attendance_stats.group_rates(conn, a.date_from, a.date_to, group)),
+                   export.frame_sheet("Clanovi", attendance_stats.member_rates(conn, a.date_from, a.date_to, group)),
+                   export.frame_sheet("Tjedni", attendance_stats.weekly_matrix(conn, a.date_from, a.date_to, group))])
+    return 0
+
+def sessions(conn, a):
+    from . import schedule
+    added, existing, closed = schedule.generate(conn, a.date_from, a.date_to, groups=a.group or None)
+    print(f"Dodano treninga: {added}, već postoji: {existing}, zatvoreni dani: {closed}")
+    return 0
+
+def report_documents(conn, a):
+    from . import compliance, export
+    today, group = date.today().isoformat(), a.group or compliance.ALL_GROUPS
+    sheets = [export.frame_sheet("Pregled", compliance.digest(conn, today, group, a.days))]
+    issues = None
+    if a.competition:
+        issues = compliance.check_roster(conn, a.competition, today, group=group)
+        sheets.append(export.frame_sheet("Natjecanje", issues))
+        print(f"Natjecanje {a.competition}: sportaša s neispravnim dokumentima {issues['member_id'].nunique()}")
+    _write(a.out, sheets)
+    return 1 if issues is not None and len(issues) else 0
+
+def find(conn, a):
+    from . import search
+    total = search.count(conn, a.text, tuple(a.kind or ()))
+    df = search.page(conn, a.text, tuple(a.kind or ()), (a.page - 1) * search.PAGE_SIZE)
+    for r in df.itertuples():
+        print(f"{r.vrsta:<10} {r.id:>7}  {r.naziv}" + (f"  ({r.detalji})" if r.detalji else ""))
+    print(f"Pronađeno: {total}, stranica {a.page} / {max(1, -(-total // search.PAGE_SIZE))}")
+    return 0 if total else 1
+
+
+def _period(p):
+    p.add_argument("--from", dest="date_from", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    p.add_argument("--to", dest="date_to", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+
+def parser():
+    ap = argparse.ArgumentParser(prog="python -m hkpodravka", description="HK Podravka – skupni poslovi nad bazom.")
+    ap.add_argument("--db", default=db.DB_PATH, help=f"putanja baze (zadano {db.DB_PATH})")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("import-members", help="uvoz članova iz Excela (predložak aplikacije)")
+    p.add_argument("file"); p.add_argument("--report", help="izvještaj po retku (.xlsx)"); p.set_defaults(fn=import_members)
+    p = sub.add_parser("assign-groups", help="grupe iz Excela (ime, prezime, grupa, po želji oib)")
+    p.add_argument("file"); p.add_argument("--report", help="izvještaj po retku (.xlsx)"); p.set_defaults(fn=assign_groups)
+    p = sub.add_parser("export-members", help="članovi u obliku predloška za uvoz")
+    p.add_argument("out"); p.add_argument("--search", default=""); p.add_argument("--group"); p.add_argument("--city", default="")
+    p.set_defaults(fn=export_members)
+    p = sub.add_parser("export-results", help="rezultati jedne godine")
+    p.add_argument("out"); p.add_argument("--year", type=int, default=date.today().year); p.set_defaults(fn=export_results)
+    p = sub.add_parser("report-stats", help="sve tablice napredne statistike")
+    p.add_argument("out"); p.add_argument("--from", dest="year_from", type=int, required=True)
+    p.add_argument("--to", dest="year_to", type=int, required=True); p.add_argument("--group"); p.set_defaults(fn=report_stats)
+    p = sub.add_parser("report-attendance", help="stope prisustva po grupama i članovima, tjedna matrica")
+    p.add_argument("out"); _period(p); p.add_argument("--group"); p.set_defaults(fn=report_attendance)
+    p = sub.add_parser("sessions", help="treninzi iz tjednog rasporeda za razdoblje")
+    _period(p); p.add_argument("--group", action="append", help="može više puta; zadano sve grupe"); p.set_defaults(fn=sessions)
+    p = sub.add_parser("report-documents", help="dokumenti koji istječu; uz --competition provjera aktivnih natjecatelja")
+    p.add_argument("out"); p.add_argument("--group"); p.add_argument("--days", type=int, default=30)
+    p.add_argument("--competition", type=int, help="id natjecanja"); p.set_defaults(fn=report_documents)
+    from .search import KINDS
+    p = sub.add_parser("search", help="pretraga članova, trenera, natjecanja i napomena rezultata")
+    p.add_argument("text"); p.add_argument("--kind", action="append", choices=KINDS, help="može više puta; zadano sve")
+    p.add_argument("--page", type=int, default=1); p.set_defaults(fn=find)
+    return ap
+
+def main(argv=None):
+    a = parser().parse_args(argv)
+    from .migrations import ensure_schema
+    ensure_schema(a.db)
+    with db.connection(a.db) as conn:
+        return a.fn(conn, a)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – treneri: unos, brisanje i popis (bez Streamlita, za
+aplikaciju i skupne poslove iz naredbenog retka).
+"""
+from .db import query_df
+
+COLUMNS = ["first_name", "last_name", "dob", "oib", "email", "iban", "group_name", "contract_path", "other_docs_json", "photo_path"]
+INSERT_SQL = f"INSERT INTO coaches({','.join(COLUMNS)}) VALUES({','.join('?' * len(COLUMNS))})"
+LIST_SQL = "SELECT id, first_name, last_name, dob, oib, email, iban, group_name FROM coaches ORDER BY last_name, first_name"
+
+
+def save(conn, data):
+    """Novi trener; data = {stupac: vrijednost}, ostali stupci NULL. Vraća id."""
+    unknown = set(data) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Nepoznati stupci trenera: {', '.join(sorted(unknown))}")
+    cur = conn.execute(INSERT_SQL, [data.get(c) for c in COLUMNS]); conn.commit()
+    return cur.lastrowid
+
+def delete(conn, coach_id):
+    conn.execute("DELETE FROM coaches WHERE id=?", (int(coach_id),)); conn.commit()
+
+def list_df(conn):
+    return query_df(conn, LIST_SQL)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – natjecanja i rezultati: unos natjecanja s trenerima, unos
+rezultata s borbama (bouts.py) i galerija natjecanja. Isti upisi služe
+aplikaciji i skupnim poslovima iz naredbenog retka (cli.py).
+"""
+import json
+
+from . import bouts, stats
+
+COLUMNS = ["kind", "kind_other", "name", "date_from", "date_to", "place", "style", "age_cat", "country", "country_iso3",
+           "team_rank", "club_competitors", "total_competitors", "clubs_count", "countries_count",
+           "coaches_json", "notes", "bulletin_url", "website_link", "gallery_paths_json"]
+RESULT_COLUMNS = ["category", "style", "fights_total", "wins", "losses", "placement", "note"]
+
+INSERT_SQL = f"INSERT INTO competitions({','.join(COLUMNS)}) VALUES({','.join('?' * len(COLUMNS))})"
+RESULT_SQL = f"""INSERT INTO results(competition_id,member_id,{','.join(RESULT_COLUMNS)})
+    VALUES({','.join('?' * (len(RESULT_COLUMNS) + 2))})"""
+
+
+def _check(data, columns, what):
+    unknown = set(data) - set(columns)
+    if unknown:
+        raise ValueError(f"Nepoznati stupci ({what}): {', '.join(sorted(unknown))}")
+
+def save(conn, data, coach_ids=(), coach_names=None):
+    """Novo natjecanje s trenerima (competition_coaches); coach_names = {id: ime} za stari coaches_json. Vraća id."""
+    _check(data, COLUMNS, "natjecanje")
+    data = dict(data, coaches_json=json.dumps([(coach_names or {}).get(c, str(c)) for c in coach_ids], ensure_ascii=False))
+    try:
+        cur = conn.execute(INSERT_SQL, [data.get(c) for c in COLUMNS])
+        stats.set_competition_coaches(conn, cur.lastrowid, coach_ids)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cur.lastrowid
+
+def add_result(conn, competition_id, member_id, data, bout_rows=()):
+    """Rezultat člana na natjecanju i njegove borbe ([(ishod, dict)] kao bouts.save). Vraća id."""
+    _check(data, RESULT_COLUMNS, "rezultat")
+    try:
+        cur = conn.execute(RESULT_SQL, [int(competition_id), int(member_id)] + [data.get(c) for c in RESULT_COLUMNS])
+        bouts.save(conn, cur.lastrowid, bout_rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return cur.lastrowid
+
+def gallery_paths(conn, competition_id):
+    row = conn.execute("SELECT COALESCE(gallery_paths_json,'[]') FROM competitions WHERE id=?", (int(competition_id),)).fetchone()
+    return json.loads(row[0] or "[]") if row else []
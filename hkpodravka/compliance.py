@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – valjanost dokumenata članova (liječnički pregled, osobna,
+putovnica). Datumi su ISO tekst (YYYY-MM-DD) pa se uspoređuju kao nizovi,
+a svaki stupac ima svoj indeks (migracija 12). Provjera popisa za
+natjecanje je jedan upit: po dokumentu raspon na indeksu "vrijedi_do <
+kraj natjecanja" (ili bez datuma), spojen s UNION ALL. Putovnica se traži
+samo za natjecanja izvan Hrvatske (country_iso3). Dnevni pregled "uskoro
+istječe" po grupi pamti se po danu i verziji tablice members.
+"""
+import json
+from datetime import date, timedelta
+
+from .cache import LRUCache, cached_query
+from .db import query_df
+
+ALL_GROUPS = "(sve)"
+DIGEST_DAYS = 30   # pregled: istječe u idućih 30 dana ...
+EXPIRED_DAYS = 90  # ... ili je istekao u zadnjih 90
+HOME_ISO3 = "HRV"
+
+# ključ -> (stupac, naziv dokumenta)
+DOCUMENTS = {"medical": ("medical_valid_until", "Liječnički pregled"),
+             "id_card": ("id_card_valid_until", "Osobna iskaznica"),
+             "passport": ("passport_valid_until", "Putovnica")}
+
+CACHE = LRUCache(maxsize=32)
+cached = cached_query(CACHE, ("members",))
+
+INDEXES_SQL = tuple(f"CREATE INDEX IF NOT EXISTS idx_members_{key}_valid ON members({col})"
+                    for key, (col, _) in DOCUMENTS.items())
+
+def _select(key, where):
+    col, label = DOCUMENTS[key]
+    return f"""SELECT m.id AS member_id, COALESCE(m.last_name,'') || ' ' || COALESCE(m.first_name,'') AS ime,
+       COALESCE(m.group_name,'') AS grupa, '{label}' AS dokument, COALESCE(m.{col},'') AS vrijedi_do,
+       CAST(julianday(NULLIF(m.{col},'')) - julianday(:today) AS INTEGER) AS dana,
+       CASE WHEN COALESCE(m.{col},'')='' THEN 'nema datuma' WHEN m.{col} < :today THEN 'istekao'
+            ELSE 'istječe' END AS status
+  FROM members m WHERE {where.format(col=f"m.{col}")}"""
+
+# kraj natjecanja (date_to, inače date_from) i treba li putovnica; skalarni podupit se računa jednom po grani
+_DAY = "(SELECT COALESCE(NULLIF(date_to,''), date_from) FROM competitions WHERE id=:competition_id)"
+_ABROAD = f"""(SELECT COALESCE(NULLIF(upper(trim(country_iso3)),''), '{HOME_ISO3}') <> '{HOME_ISO3}'
+                 FROM competitions WHERE id=:competition_id)"""
+
+def roster_sql(explicit):
+    """Upit za provjeru popisa: explicit = popis id-jeva (:ids kao JSON), inače aktivni natjecatelji (:group)."""
+    roster = ("m.id IN (SELECT value FROM json_each(:ids))" if explicit else
+              "m.active_competitor=1 AND (:group IS NULL OR COALESCE(m.group_name,'')=:group)")
+    parts = []
+    for key in DOCUMENTS:
+        where = f"({{col}} < {_DAY} OR {{col}} IS NULL) AND {roster}"
+        if key == "passport":
+            where += f" AND {_ABROAD}"
+        parts.append(_select(key, where))
+    return "\nUNION ALL\n".join(parts) + "\nORDER BY ime, member_id, dokument"
+
+def digest_sql(group):
+    where = "{col} >= :since AND {col} < :until" + (" AND COALESCE(m.group_name,'')=:group" if group else "")
+    return "\nUNION ALL\n".join(_select(key, where) for key in DOCUMENTS) + "\nORDER BY vrijedi_do, ime, member_id"
+
+
+def check_roster(conn, competition_id, today, member_ids=None, group=ALL_GROUPS):
+    """Dokumenti koji ne vrijede do kraja natjecanja (ili nemaju datum), za popis member_ids
+    ili, bez popisa, za aktivne natjecatelje grupe. today: 'YYYY-MM-DD'."""
+    params = {"competition_id": competition_id, "today": str(today),
+              "group": None if group == ALL_GROUPS else group}
+    if member_ids is not None:
+        params["ids"] = json.dumps([int(i) for i in member_ids])
+    return query_df(conn, roster_sql(member_ids is not None), params)
+
+@cached
+def digest(conn, today, group=ALL_GROUPS, days=DIGEST_DAYS):
+    """Dnevni pregled grupe: dokumenti istekli u zadnjih EXPIRED_DAYS dana ili koji istječu
+    u idućih days dana, najraniji prvi. today: 'YYYY-MM-DD' (ključ predmemorije po danu)."""
+    day = date.fromisoformat(str(today))
+    params = {"today": day.isoformat(), "since": (day - timedelta(days=EXPIRED_DAYS)).isoformat(),
+              "until": (day + timedelta(days=days + 1)).isoformat(), "group": group}
+    return query_df(conn, digest_sql(group != ALL_GROUPS), params)
+
+def install(cur):
+    for sql in INDEXES_SQL:
+        cur.execute(sql)
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – osnovni podaci kluba (zadane vrijednosti za club_info).
+"""
+KLUB_NAZIV = "Hrvački klub Podravka"
+KLUB_EMAIL = "hsk-podravka@gmail.com"
+KLUB_ADRESA = "Miklinovec 6a, 48000 Koprivnica"
+KLUB_OIB = "60911784858"
+KLUB_WEB = "https://hk-podravka.com"
+KLUB_IBAN = "HR6923860021100518154"
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – SQLite konekcije.
+Bazen (pool) konekcija s WAL načinom rada: jedna dretva (Streamlit izvođenje
+skripte) drži najviše jednu konekciju, a close() je vraća u bazen.
+"""
+import queue, sqlite3, threading
+from contextlib import contextmanager
+
+from . import perf
+
+DB_PATH = "hk_podravka.db"
+
+POOL_SIZE = 16
+POOL_TIMEOUT = 30.0        # s – koliko se čeka na slobodnu konekciju
+BUSY_TIMEOUT_MS = 10000    # ms – koliko SQLite čeka na zaključanu bazu
+
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),    # uz WAL sigurno, bez fsync-a na svaki commit
+    ("cache_size", -16000),       # ~16 MB stranica po konekciji
+    ("mmap_size", 268435456),     # 256 MB
+    ("temp_store", "MEMORY"),
+    ("foreign_keys", "ON"),
+)
+
+ON_CONNECT = []  # fn(conn) za svaku novu konekciju bazena (npr. brojanje upita u mjerenjima)
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection čiji close() vraća konekciju u bazen; naredbe mjeri perf.TimedCursor."""
+    _pool = None
+    _depth = 0
+
+    def cursor(self, factory=perf.TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+    def close(self):
+        if self._pool is None:
+            return super().close()
+        self._pool.release(self)
+
+    def _close_for_real(self):
+        self._pool = None
+        sqlite3.Connection.close(self)
+
+
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000,
+                               check_same_thread=False, factory=PooledConnection)
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        for name, value in PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn._pool = self
+        conn.path = self.path
+        for fn in ON_CONNECT:
+            fn(conn)
+        return conn
+
+    def acquire(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn._depth += 1
+            return conn
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Nema slobodne konekcije prema bazi (pool).")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+        conn._depth = 1
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn, force=False):
+        if conn is not getattr(self._local, "conn", None) or conn._depth <= 0:
+            return
+        conn._depth = 0 if force else conn._depth - 1
+        if conn._depth:
+            return
+        self._local.conn = None
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except sqlite3.Error:
+            conn._close_for_real()
+        finally:
+            self._slots.release()
+
+    def release_thread(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self.release(conn, force=True)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait()._close_for_real()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(path=None):
+    path = path or DB_PATH
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = _pools[path] = ConnectionPool(path)
+        return pool
+
+def get_conn(path=None):
+    return get_pool(path).acquire()
+
+def connection(path=None):
+    return get_pool(path).connection()
+
+def query_df(conn, sql, params=()):
+    """pd.read_sql_query; pandas se učitava tek pri prvom upitu."""
+    import pandas as pd
+    return pd.read_sql_query(sql, conn, params=params)
+
+def release_thread():
+    """Vraća u bazen sve konekcije koje trenutna dretva još drži."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.release_thread()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – izvoz u Excel.
+Jedini put do .xlsx datoteke u aplikaciji: retci se čitaju iz SQLite-a u
+blokovima (fetchmany) i pišu u načinu stalne memorije (xlsxwriter
+constant_memory, inače openpyxl write_only), pa vrh memorije ne raste s
+brojem redaka. Gotove datoteke pamte se po ključu izvoza i verziji tablica
+(cache.data_version).
+"""
+import importlib.util, io, re, time
+
+from . import perf
+from .cache import LRUCache, data_version
+
+CHUNK = 5000
+CACHE = LRUCache(maxsize=16)
+
+# pisač se uvozi tek u workbook(), da uvoz modula (i prvo iscrtavanje stranice) ne plaća xlsxwriter/openpyxl
+ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+
+def _sheet_name(name):
+    # Excel: najviše 31 znak, bez []:*?/\
+    return re.sub(r"[\[\]:*?/\\]", "_", str(name))[:31] or "Sheet1"
+
+def query_sheet(conn, name, sql, params=(), chunk=CHUNK):
+    """List iz upita; upit se izvodi tek kad se radna knjiga piše."""
+    def open_():
+        cur = conn.execute(sql, params)
+        def rows():
+            while True:
+                batch = cur.fetchmany(chunk)
+                if not batch:
+                    return
+                yield from batch
+        return [d[0] for d in cur.description], rows()
+    return name, open_
+
+def frame_sheet(name, df):
+    """List iz već učitanog DataFrame-a (mali zbrojevi, predlošci, izvještaji)."""
+    def open_():
+        values = df.copy()
+        for c in values.select_dtypes(include=["datetime", "datetimetz"]).columns:
+            values[c] = values[c].dt.strftime("%Y-%m-%d")  # datumi su u bazi tekst; isto i u Excelu
+        values = values.astype(object).where(values.notna(), None)
+        return [str(c) for c in df.columns], values.itertuples(index=False, name=None)
+    return name, open_
+
+def _literal(ws, value, cell_cls):
+    # openpyxl bi tekst koji počinje s "=" upisao kao formulu
+    if not (isinstance(value, str) and value.startswith("=")):
+        return value
+    cell = cell_cls(ws, value=value)
+    cell.data_type = "s"
+    return cell
+
+def workbook(sheets):
+    """sheets: [(naziv, open_)] iz query_sheet/frame_sheet -> bajtovi .xlsx datoteke."""
+    t0 = time.perf_counter()
+    out = io.BytesIO()
+    if ENGINE == "xlsxwriter":
+        import xlsxwriter
+        wb = xlsxwriter.Workbook(out, {"constant_memory": True, "in_memory": False,
+                                       "strings_to_formulas": False, "strings_to_urls": False})
+        for name, open_ in sheets:
+            ws = wb.add_worksheet(_sheet_name(name))
+            columns, rows = open_()
+            ws.write_row(0, 0, columns)
+            for i, row in enumerate(rows, 1):
+                ws.write_row(i, 0, row)
+        wb.close()
+    else:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        wb = Workbook(write_only=True)
+        for name, open_ in sheets:
+            ws = wb.create_sheet(_sheet_name(name))
+            columns, rows = open_()
+            ws.append(columns)
+            for row in rows:
+                if any(isinstance(v, str) and v.startswith("=") for v in row):
+                    row = [_literal(ws, v, WriteOnlyCell) for v in row]
+                ws.append(row)
+        wb.save(out)
+    data = out.getvalue()
+    perf.export([name for name, _ in sheets], (time.perf_counter() - t0) * 1000, len(data))
+    return data
+
+
+def cached(key, tables=()):
+    """Gotova datoteka za ključ ako postoji za trenutnu verziju tablica, inače None."""
+    return CACHE.peek((key, data_version(*tables)))
+
+def build(key, tables, sheets_fn):
+    """Gradi (ili vraća zapamćenu) radnu knjigu; sheets_fn() vraća listu listova."""
+    return CACHE.get_or_compute((key, data_version(*tables)), lambda: workbook(sheets_fn()))
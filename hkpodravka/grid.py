@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – spremanje izmjena iz st.data_editor tablica.
+Piše se samo ono što se promijenilo: izmijenjeni, dodani i obrisani retci
+(iz stanja editora ili usporedbom hasha redaka), sve kroz executemany u
+jednoj transakciji.
+"""
+import math
+
+import pandas as pd
+
+
+def _missing(v):
+    return v is None or v is pd.NA or v is pd.NaT or (isinstance(v, float) and math.isnan(v))
+
+def text(v):
+    return "" if _missing(v) else str(v)
+
+def text_or_null(v):
+    v = text(v).strip()
+    return v or None
+
+def date10(v):
+    return text(v)[:10]
+
+def to_int(v):
+    return 0 if _missing(v) or v == "" else int(float(v))
+
+def to_float(v):
+    return 0.0 if _missing(v) or v == "" else float(v)
+
+# stupci tablica koje se uređuju u gridu: naziv -> pretvorba vrijednosti za bazu
+MEMBERS_COLUMNS = {
+    "first_name": text, "last_name": text, "gender": text, "dob": date10, "oib": text_or_null,
+    "street": text, "city": text, "postal_code": text, "athlete_email": text, "parent_email": text,
+    "group_name": text, "pays_fee": to_int, "fee_amount": to_float, "medical_valid_until": text,
+}
+COACHES_COLUMNS = {
+    "first_name": text, "last_name": text, "dob": date10, "oib": text,
+    "email": text, "iban": text, "group_name": text,
+}
+
+
+class ChangeSet:
+    def __init__(self, updates=None, inserts=None, deletes=None):
+        self.updates = updates or []   # [(id, {stupac: vrijednost, ...} cijeli redak)]
+        self.inserts = inserts or []   # [{stupac: vrijednost}]
+        self.deletes = deletes or []   # [id]
+
+    def __len__(self):
+        return len(self.updates) + len(self.inserts) + len(self.deletes)
+
+
+def from_editor(original, state, columns, key="id"):
+    """Iz st.session_state[<key editora>] (edited_rows / added_rows / deleted_rows).
+    Čitaju se samo dirnuti retci originala, pa je trošak O(izmjena)."""
+    state = state or {}
+    deleted = {int(i) for i in state.get("deleted_rows", [])}
+    updates = []
+    for pos, edits in state.get("edited_rows", {}).items():
+        pos = int(pos)
+        if pos in deleted or not edits:
+            continue
+        row = {**original.iloc[pos].to_dict(), **edits}
+        updates.append((int(row[key]), {c: conv(row.get(c)) for c, conv in columns.items()}))
+    inserts = [{c: conv(r.get(c)) for c, conv in columns.items()}
+               for r in state.get("added_rows", []) if any(not _missing(v) and v != "" for v in r.values())]
+    deletes = [int(original.iloc[i][key]) for i in sorted(deleted)]
+    return ChangeSet(updates, inserts, deletes)
+
+def _normalized(frame, columns):
+    return pd.DataFrame({c: frame[c].map(conv) for c, conv in columns.items()}, index=frame.index)
+
+def from_frames(original, edited, columns, key="id"):
+    """Bez stanja editora: usporedba hasha (pretvorenih) redaka po ključu."""
+    old = original.set_index(original[key].astype("int64"))
+    kept = edited[edited[key].notna()]
+    new = kept.set_index(kept[key].astype("int64"))
+    common = old.index.intersection(new.index)
+    old_n = _normalized(old.loc[common], columns)
+    new_n = _normalized(new.loc[common], columns)
+    changed = common[(pd.util.hash_pandas_object(old_n, index=False).to_numpy()
+                      != pd.util.hash_pandas_object(new_n, index=False).to_numpy())]
+    updates = [(int(i), new_n.loc[i].to_dict()) for i in changed]
+    inserts = [{c: conv(r.get(c)) for c, conv in columns.items()}
+               for r in edited[edited[key].isna()].to_dict("records")]
+    deletes = [int(i) for i in old.index.difference(new.index)]
+    return ChangeSet(updates, inserts, deletes)
+
+
+def apply(conn, table, columns, changes, key="id"):
+    """Upisuje ChangeSet u jednoj transakciji; vraća (izmijenjeno, dodano, obrisano)."""
+    cols = list(columns)
+    try:
+        if changes.updates:
+            conn.executemany(f"UPDATE {table} SET {', '.join(c + '=?' for c in cols)} WHERE {key}=?",
+                             [[row[c] for c in cols] + [rid] for rid, row in changes.updates])
+        if changes.inserts:
+            conn.executemany(f"INSERT INTO {table}({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})",
+                             [[row[c] for c in cols] for row in changes.inserts])
+        if changes.deletes:
+            conn.executemany(f"DELETE FROM {table} WHERE {key}=?", [(rid,) for rid in changes.deletes])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(changes.updates), len(changes.inserts), len(changes.deletes)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – umanjene slike (fotografije članova i trenera, galerije natjecanja).
+Za svaku sliku iz spremišta (uploads.py) izvedenice se spremaju kao
+uploads/derived/<veličina>/<sha[:2]>/<sha>.jpg: orijentacija iz EXIF-a se
+primijeni, a EXIF (i GPS lokacija s mobitela) se ne prenosi. Izvedenice se
+rade pri uploadu (derive_all, u bazenu dretvi) ili pri prvom zahtjevu
+(derive). Bez Pillowa funkcije vraćaju original.
+"""
+import functools, hashlib, os, tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from . import uploads
+
+SIZES = {"thumb": 256, "medium": 1280}
+QUALITY = 82
+WORKERS = 4
+IMAGE_EXT = (".jpg", ".jpeg", ".png", ".webp")
+
+
+@functools.lru_cache(maxsize=None)
+def _pil():
+    """(Image, ImageOps) ili None; Pillow se uvozi tek kod prve slike, ne pri uvozu modula."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # Pillow dolazi sa streamlitom, ali nije obavezan za podatkovni sloj
+        return None
+    return Image, ImageOps
+
+def _key(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem):
+        return stem  # blob: ime je već sha256 sadržaja
+    st = os.stat(path)  # stara putanja: ključ po putanji, veličini i vremenu
+    return hashlib.sha256(f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}".encode()).hexdigest()
+
+def derived_path(path, size, root=uploads.UPLOAD_DIR):
+    key = _key(path)
+    return os.path.join(uploads.derived_dir(root), size, key[:2], key + ".jpg")
+
+def is_image(path):
+    return bool(path) and path.lower().endswith(IMAGE_EXT)
+
+def derive(path, size="thumb", root=uploads.UPLOAD_DIR):
+    """Putanja izvedenice (napravi je ako ne postoji); original ako to nije moguće."""
+    if not path or not is_image(path) or not os.path.isfile(path) or _pil() is None:
+        return path
+    Image, ImageOps = _pil()
+    out = derived_path(path, size, root)
+    if os.path.exists(out):
+        return out
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    try:
+        with Image.open(path) as im:
+            im.draft("RGB", (SIZES[size], SIZES[size]))  # JPEG: dekodira odmah u manjoj rezoluciji
+            im = ImageOps.exif_transpose(im).convert("RGB")
+            im.thumbnail((SIZES[size], SIZES[size]), Image.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(out), prefix=".derive-")
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, "JPEG", quality=QUALITY, optimize=True)  # bez exif= -> EXIF se ne prenosi
+            os.replace(tmp, out)
+    except (OSError, ValueError):
+        return path  # oštećena ili nepodržana slika
+    return out
+
+def derive_all(paths, sizes=tuple(SIZES), root=uploads.UPLOAD_DIR, workers=WORKERS):
+    """Izvedenice za više slika odjednom (galerija); vraća {putanja: {veličina: izvedenica}}."""
+    jobs = [(p, s) for p in dict.fromkeys(paths) if is_image(p) for s in sizes]
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as pool:
+        done = list(pool.map(lambda job: derive(job[0], job[1], root), jobs))
+    out = {}
+    for (p, s), d in zip(jobs, done):
+        out.setdefault(p, {})[s] = d
+    return out
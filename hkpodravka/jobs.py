@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – pozadinski poslovi (uvoz članova, veći izvozi, obrada slika).
+Posao je redak u tablici jobs. Stranica ga samo stavlja u red (submit) i čita
+mu stanje, a izvode ga dretve radnika (start(), u procesu aplikacije) ili
+zaseban proces (python -m hkpodravka.jobs worker). Radnik preuzima posao u
+BEGIN IMMEDIATE transakciji pa ga nikad ne obrađuju dvojica.
+Napredak se drži u memoriji procesa radnika, a zasebna dretva ga svake
+sekunde upisuje u bazu zajedno s heartbeatom i čita zahtjeve za otkazivanje
+(posao za to vrijeme može držati vlastitu transakciju). Posao koji padne na
+prolaznoj grešci (zaključana baza, disk) ponavlja se s odgodom, a posao
+čiji je radnik nestao vraća se u red kad mu istekne heartbeat. Ulazne i
+izlazne datoteke su u jobs/<id>/.
+
+    python -m hkpodravka.jobs worker|list|purge [--db hk_podravka.db]
+"""
+import argparse, json, os, shutil, socket, sqlite3, sys, threading
+from datetime import datetime, timedelta
+
+from . import db, perf
+from .cache import bump, sync
+
+JOB_DIR = "jobs"
+WORKERS = 2
+POLL = 2.0          # s – radnik provjerava red i bez buđenja iz submit()
+BEAT = 1.0          # s – upis napretka/heartbeata
+STALE = 300         # s – posao bez heartbeata se vraća u red
+RETRY_DELAY = 10    # s – odgoda ponavljanja (× broj pokušaja)
+KEEP_DAYS = 7
+TRANSIENT = (sqlite3.OperationalError, OSError)
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+HANDLERS = {}
+EXPORTS = {}
+
+COLUMNS = """id, kind, job_key, params_json, status, progress, message, result_json, result_path, error,
+    attempts, max_attempts, created_at, started_at, finished_at"""
+
+_live = {}              # id -> (udio, poruka) za poslove koji se izvode u ovom procesu
+_cancel = set()
+_wake = threading.Event()
+_started = {}
+_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    pass
+
+
+def handler(kind, tables=(), max_attempts=3):
+    """Registrira fn(job) za vrstu posla; tables = tablice koje posao mijenja (bump)."""
+    def deco(fn):
+        fn.tables, fn.max_attempts = tables, max_attempts
+        HANDLERS[kind] = fn
+        return fn
+    return deco
+
+
+class Job:
+    """Ono što funkcija posla vidi: parametri, konekcija, mapa za datoteke, napredak."""
+    def __init__(self, conn, row, root=JOB_DIR):
+        self.id, self.kind, self.conn = row["id"], row["kind"], conn
+        self.params = row["params"]
+        self.dir = job_dir(self.id, root)
+        self.result_path = None
+        self.message = ""
+
+    def progress(self, fraction, message=None):
+        """Udio 0..1 i poruka; diže Cancelled ako je posao otkazan."""
+        if self.id in _cancel:
+            raise Cancelled()
+        if message is not None:
+            self.message = message
+        _live[self.id] = (max(0.0, min(1.0, float(fraction))), self.message)
+
+    def output(self, name):
+        """Putanja izlazne datoteke u jobs/<id>/ (zadnja je rezultat posla)."""
+        os.makedirs(self.dir, exist_ok=True)
+        self.result_path = os.path.join(self.dir, name)
+        return self.result_path
+
+
+def _now(delta=0):
+    return (datetime.now() + timedelta(seconds=delta)).isoformat(timespec="seconds")
+
+def job_dir(job_id, root=JOB_DIR):
+    return os.path.join(root, str(int(job_id)))
+
+def _rows(cur):
+    names = [d[0] for d in cur.description]
+    out = []
+    for r in cur.fetchall():
+        job = dict(zip(names, r))
+        job["params"] = json.loads(job.pop("params_json") or "{}")
+        job["result"] = json.loads(job.pop("result_json") or "null")
+        if job["status"] == RUNNING and job["id"] in _live:
+            job["progress"], job["message"] = _live[job["id"]]  # svježije od zadnjeg upisa
+        out.append(job)
+    return out
+
+
+# ---- stranica: predaja i stanje ----
+def submit(conn, kind, params=None, key=None, files=None, root=JOB_DIR):
+    """Stavlja posao u red i vraća id. key označava posao za stranicu (latest);
+    files = {ime: datoteka} sprema se u jobs/<id>/ prije nego radnik vidi posao."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Nepoznata vrsta posla: {kind}")
+    now = _now()
+    try:
+        cur = conn.execute("""INSERT INTO jobs(kind, job_key, params_json, max_attempts, created_at, run_after)
+                              VALUES (?,?,?,?,?,?)""",
+                           (kind, key, json.dumps(params or {}, ensure_ascii=False), HANDLERS[kind].max_attempts, now, now))
+        job_id = cur.lastrowid
+        for name, f in (files or {}).items():
+            os.makedirs(job_dir(job_id, root), exist_ok=True)
+            f.seek(0)
+            with open(os.path.join(job_dir(job_id, root), name), "wb") as out:
+                shutil.copyfileobj(f, out)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    _wake.set()
+    return job_id
+
+def get(conn, job_id):
+    rows = _rows(conn.execute(f"SELECT {COLUMNS} FROM jobs WHERE id=?", (int(job_id),)))
+    return rows[0] if rows else None
+
+def latest(conn, key, max_age=None):
+    """Zadnji posao s ključem (i nakon ponovnog učitavanja stranice); None ako ga nema."""
+    sql, params = f"SELECT {COLUMNS} FROM jobs WHERE job_key=?", [key]
+    if max_age is not None:
+        sql += " AND created_at>=?"; params.append(_now(-max_age))
+    rows = _rows(conn.execute(sql + " ORDER BY id DESC LIMIT 1", params))
+    return rows[0] if rows else None
+
+def recent(conn, limit=50):
+    return _rows(conn.execute(f"SELECT {COLUMNS} FROM jobs ORDER BY id DESC LIMIT ?", (int(limit),)))
+
+def cancel(conn, job_id):
+    """Posao u redu otkazuje se odmah, a onaj koji se izvodi kod sljedećeg javljanja napretka."""
+    _cancel.add(int(job_id))
+    conn.execute("""UPDATE jobs SET cancel_requested=1,
+                        status=CASE WHEN status='queued' THEN 'cancelled' ELSE status END,
+                        finished_at=CASE WHEN status='queued' THEN ? ELSE finished_at END
+                    WHERE id=? AND status IN ('queued','running')""", (_now(), int(job_id)))
+    conn.commit()
+
+
+# ---- radnik ----
+def _has_work(conn):
+    return conn.execute("""SELECT 1 FROM jobs WHERE (status='queued' AND run_after<=?)
+                           OR (status='running' AND heartbeat_at<?) LIMIT 1""", (_now(), _now(-STALE))).fetchone()
+
+def _claim(conn, worker):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        now, stale = _now(), _now(-STALE)
+        # radnik je nestao (ponovno pokretanje, srušen proces): u red ili, ako nema više pokušaja, pogreška
+        conn.execute("""UPDATE jobs SET status='failed', error='radnik je prekinut', finished_at=?
+                        WHERE status='running' AND heartbeat_at<? AND attempts>=max_attempts""", (now, stale))
+        conn.execute("""UPDATE jobs SET status='queued', run_after=?, message='radnik je prekinut – ponovno u redu'
+                        WHERE status='running' AND heartbeat_at<?""", (now, stale))
+        row = conn.execute("SELECT id FROM jobs WHERE status='queued' AND run_after<=? ORDER BY id LIMIT 1", (now,)).fetchone()
+        if row:
+            conn.execute("""UPDATE jobs SET status='running', attempts=attempts+1, progress=0, message='',
+                            worker=?, started_at=?, heartbeat_at=? WHERE id=?""", (worker, now, now, row[0]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return get(conn, row[0]) if row else None
+
+def run(conn, row, root=JOB_DIR):
+    """Izvodi preuzeti posao i upisuje ishod; vraća konačni status."""
+    fn = HANDLERS.get(row["kind"])
+    job = Job(conn, row, root)
+    _live[job.id] = (0.0, "")
+    result, error, status, run_after = None, None, DONE, None
+    try:
+        if fn is None:
+            raise ValueError(f"Nepoznata vrsta posla: {row['kind']}")
+        with perf.quiet():
+            sync(conn)  # radnik može biti zaseban proces: izmjene aplikacije poništavaju njegovu predmemoriju
+        result = fn(job)
+    except Cancelled:
+        status = CANCELLED
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        if isinstance(e, TRANSIENT) and row["attempts"] < row["max_attempts"]:
+            status, run_after = QUEUED, _now(RETRY_DELAY * row["attempts"])
+        else:
+            status = FAILED
+    finally:
+        last = _live.pop(job.id, (0.0, ""))
+        _cancel.discard(job.id)
+    if conn.in_transaction:
+        conn.rollback()  # posao je ostavio otvorenu transakciju
+    if status == QUEUED:
+        conn.execute("UPDATE jobs SET status='queued', run_after=?, error=?, message='ponovni pokušaj' WHERE id=?",
+                     (run_after, error, job.id))
+    else:
+        conn.execute("""UPDATE jobs SET status=?, progress=?, message=?, result_json=?, result_path=?, error=?, finished_at=?
+                        WHERE id=?""",
+                     (status, 1.0 if status == DONE else last[0], job.message,
+                      json.dumps(result, ensure_ascii=False, default=str), job.result_path, error, _now(), job.id))
+    conn.commit()
+    if status == DONE and fn.tables:
+        bump(*fn.tables)
+    return status
+
+def _work(path, root, stopped):
+    worker = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+    while not stopped.is_set():
+        row = None
+        try:
+            with db.connection(path) as conn:
+                with perf.quiet():  # prozivanje reda ne puni spremnik mjerenja
+                    row = _claim(conn, worker) if _has_work(conn) else None
+                if row:
+                    run(conn, row, root)
+        except sqlite3.Error:
+            pass  # zaključana baza i sl. – pokušava se ponovno
+        if row is None:
+            _wake.wait(POLL)
+            _wake.clear()
+
+def _beat(path, stopped):
+    while not stopped.wait(BEAT):
+        live = list(_live.items())
+        if not live:
+            continue
+        try:
+            with db.connection(path) as conn, perf.quiet():
+                now = _now()
+                conn.executemany("UPDATE jobs SET progress=?, message=?, heartbeat_at=? WHERE id=? AND status='running'",
+                                 [(p, m, now, job_id) for job_id, (p, m) in live])
+                conn.commit()
+                ids = [job_id for job_id, _ in live]
+                _cancel.update(r[0] for r in conn.execute(
+                    f"SELECT id FROM jobs WHERE cancel_requested=1 AND id IN ({','.join('?' * len(ids))})", ids))
+        except sqlite3.Error:
+            pass
+
+def start(path=None, workers=WORKERS, root=JOB_DIR):
+    """Pokreće dretve radnika i heartbeata (jednom po procesu i bazi)."""
+    path = path or db.DB_PATH
+    with _lock:
+        if path in _started:
+            return _started[path]
+        stopped = threading.Event()
+        threads = [threading.Thread(target=_work, args=(path, root, stopped), name=f"hkp-job-{i}", daemon=True)
+                   for i in range(workers)]
+        threads.append(threading.Thread(target=_beat, args=(path, stopped), name="hkp-job-beat", daemon=True))
+        for t in threads:
+            t.start()
+        _started[path] = stopped
+        return stopped
+
+def stop(path=None):
+    ev = _started.pop(path or db.DB_PATH, None)
+    if ev is not None:
+        ev.set(); _wake.set()
+
+def purge(conn, days=KEEP_DAYS, root=JOB_DIR):
+    """Briše završene poslove starije od days dana i njihove datoteke; vraća broj poslova."""
+    ids = [r[0] for r in conn.execute("SELECT id FROM jobs WHERE status IN ('done','failed','cancelled') AND finished_at<?",
+                                      (_now(-days * 86400),))]
+    for job_id in ids:
+        shutil.rmtree(job_dir(job_id, root), ignore_errors=True)
+    conn.executemany("DELETE FROM jobs WHERE id=?", [(i,) for i in ids])
+    conn.commit()
+    return len(ids)
+
+
+# ---- poslovi aplikacije ----
+@handler("members_import", tables=("members",), max_attempts=2)
+def _members_import(job):
+    """Uvoz članova iz jobs/<id>/input.xlsx; izvještaj je rezultat posla."""
+    import pandas as pd
+    from . import export, members
+    job.progress(0.0, "čitanje Excela…")
+    df = pd.read_excel(os.path.join(job.dir, "input.xlsx"))
+    report, counts = members.import_members(job.conn, df, progress=lambda f: job.progress(0.1 + 0.8 * f, "upis u bazu…"))
+    job.progress(0.9, "izvještaj…")
+    with open(job.output("uvoz_clanova_izvjestaj.xlsx"), "wb") as f:
+        f.write(export.workbook([export.frame_sheet("Izvjestaj", report)]))
+    problems = report[report["status"].isin(["odbijen", "upozorenje"])]
+    return {"counts": counts, "problems": problems.head(1000).to_dict("records"), "problems_total": len(problems)}
+
+def export_kind(name):
+    """Registrira fn(**filteri) -> [(naziv lista, sql, parametri)] za posao "export"."""
+    def deco(fn):
+        EXPORTS[name] = fn
+        return fn
+    return deco
+
+@export_kind("members")
+def _members_sheets(search="", group=None, city="", fee=None):
+    from . import members
+    where, params = members.list_where(search, group or members.ALL, city, fee)
+    return [("Clanovi", members.EXPORT_SQL.format(where=where), params)]
+
+@export_kind("year_results")
+def _year_results_sheets(year):
+    from . import stats
+    return [("Rezultati", stats.YEAR_RESULTS_SQL, [int(year)])]
+
+@export_kind("groups")
+def _groups_sheets():
+    from . import members
+    return [("grupe", members.GROUPS_EXPORT_SQL, [])]
+
+@handler("export")
+def _export(job):
+    """params: {"file_name", "export": vrsta iz EXPORTS, "filters": {...}}. Posao u redu nosi samo vrstu
+    i vrijednosti filtara; SQL gradi registrirana funkcija iz modula, pa se nepoznata vrsta odbija."""
+    from . import export
+    kind = job.params.get("export")
+    if kind not in EXPORTS:
+        raise ValueError(f"Nepoznata vrsta izvoza: {kind!r}")
+    sheets = EXPORTS[kind](**job.params.get("filters", {}))
+    def tracked(i, name, sql, params):
+        def open_():
+            job.progress(i / len(sheets), f"list {name}…")
+            columns, rows = export.query_sheet(job.conn, name, sql, params)[1]()
+            def counted():
+                for n, row in enumerate(rows, 1):
+                    if n % export.CHUNK == 0:
+                        job.progress(i / len(sheets), f"list {name}: {n} redaka…")
+                    yield row
+            return columns, counted()
+        return name, open_
+    data = export.workbook([tracked(i, *s) for i, s in enumerate(sheets)])
+    with open(job.output(job.params.get("file_name", "izvoz.xlsx")), "wb") as f:
+        f.write(data)
+    return {"bytes": len(data)}
+
+@handler("stats_export")
+def _stats_export(job):
+    """Sve tablice napredne statistike (isti filtri kao na stranici)."""
+    from . import export, stats
+    p, conn = job.params, job.conn
+    job.progress(0.0, "statistika…")
+    frames = stats.report_frames(conn, p["year_from"], p["year_to"], p["group"], p["coach"], p.get("athlete_id"), p.get("coach_id"))
+    job.progress(0.5, "Excel…")
+    data = export.workbook([export.frame_sheet(sheet, frame) for sheet, frame in frames])
+    with open(job.output(p.get("file_name", "statistike.xlsx")), "wb") as f:
+        f.write(data)
+    return {"bytes": len(data)}
+
+@handler("images")
+def _images(job):
+    """Izvedenice (thumb/medium) za uploadane slike, u paketima veličine bazena dretvi."""
+    from . import images
+    paths = [p for p in job.params.get("paths", []) if images.is_image(p)]
+    for start_ in range(0, len(paths), images.WORKERS):
+        job.progress(start_ / max(len(paths), 1), f"slike {start_ + 1}–{min(start_ + images.WORKERS, len(paths))} / {len(paths)}")
+        images.derive_all(paths[start_:start_ + images.WORKERS])
+    return {"count": len(paths)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Pozadinski poslovi: radnik, popis, čišćenje.")
+    ap.add_argument("command", choices=["worker", "list", "purge"])
+    ap.add_argument("--db", default=db.DB_PATH)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--days", type=int, default=KEEP_DAYS)
+    a = ap.parse_args(argv)
+    from .migrations import ensure_schema
+    ensure_schema(a.db)
+    if a.command == "worker":
+        ev = start(a.db, a.workers)
+        print(f"Radnik pokrenut ({a.workers} dretve), Ctrl+C za kraj.")
+        try:
+            while not ev.wait(3600):
+                pass
+        except KeyboardInterrupt:
+            stop(a.db)
+        return 0
+    with db.connection(a.db) as conn:
+        if a.command == "purge":
+            print(f"Obrisano poslova: {purge(conn, a.days)}")
+        else:
+            for j in recent(conn):
+                print(f"{j['id']:>6}  {j['kind']:<15} {j['status']:<10} {j['progress']:4.0%}  {j['created_at']}  {j['error'] or j['message'] or ''}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – pronalaženje članova po imenu ili OIB-u.
+Indeks (OIB -> id, "ime prezime" bez dijakritike i velikih slova -> id-jevi)
+gradi se jednim upitom i pamti dok bump("members") ne promijeni verziju, pa
+uvoz grupe od 2000 redaka košta jedan upit, a ne 2000. Čolak, COLAK i
+čolak su isti ključ; pretraga za dodavanje člana na trening podnosi i
+obrnuti redoslijed, početke riječi i tipfelere. Početci riječi traže se
+bisectom po sortiranim riječima, a difflib za tipfelere vidi samo riječi
+koje s upitom dijele najviše trigrama (FUZZY_CANDIDATES), ne cijeli klub.
+"""
+import bisect, difflib, re, unicodedata
+from collections import Counter
+
+from .cache import LRUCache, cached_query
+
+CACHE = LRUCache(maxsize=4)
+FUZZY_CUTOFF = 0.75
+FUZZY_CANDIDATES = 200  # riječi s najviše zajedničkih trigrama koje difflib uspoređuje
+SEARCH_LIMIT = 10
+
+INDEX_SQL = "SELECT id, first_name, last_name, COALESCE(oib,''), COALESCE(group_name,'') FROM members"
+
+_FOLD = str.maketrans({"đ": "d", "Đ": "D", "ß": "ss"})  # đ nema NFKD rastav
+
+
+def fold(text):
+    """'  Đurić  ČOLAK ' -> 'duric colak'"""
+    s = str(text or "")
+    if s.isascii():
+        return " ".join(s.lower().split())
+    s = unicodedata.normalize("NFKD", s.translate(_FOLD))
+    return " ".join("".join(c for c in s if not unicodedata.combining(c)).lower().split())
+
+def _grams(word):
+    w = f" {word} "
+    return {w[k:k + 3] for k in range(len(w) - 2)}
+
+def oib_digits(text):
+    d = re.sub(r"\D", "", str(text or ""))
+    return d if len(d) == 11 else ""
+
+
+class MemberIndex:
+    def __init__(self, rows):
+        self.by_name = {}      # 'ime prezime' -> [id]
+        self.by_reversed = {}  # 'prezime ime' -> [id] (samo za pretragu)
+        self.by_word = {}      # riječ imena ili prezimena -> {id}
+        self.by_gram = {}      # trigram -> {riječ} (kandidati za tipfelere)
+        self.by_oib = {}
+        self.oib = {}
+        self.folded = {}
+        self.labels = {}
+        for i, first, last, oib, group in rows:
+            f, l = fold(first), fold(last)
+            key = self.folded[i] = f"{f} {l}".strip()
+            self.by_name.setdefault(key, []).append(i)
+            self.by_reversed.setdefault(f"{l} {f}".strip(), []).append(i)
+            for w in key.split():
+                if w not in self.by_word:
+                    for g in _grams(w):
+                        self.by_gram.setdefault(g, set()).add(w)
+                self.by_word.setdefault(w, set()).add(i)
+            if oib:
+                self.by_oib[oib] = i
+            self.oib[i] = oib
+            self.labels[i] = f"{i} – {first or ''} {last or ''}".strip() + (f" ({group})" if group else "")
+        self.words = sorted(self.by_word)
+
+    def _prefixed(self, w):
+        """Članovi s riječju imena koja počinje s w."""
+        lo = bisect.bisect_left(self.words, w)
+        hi = bisect.bisect_left(self.words, w + "\uffff")
+        return set().union(*(self.by_word[x] for x in self.words[lo:hi]))
+
+    def _close(self, w):
+        """Riječi slične w: difflib samo nad FUZZY_CANDIDATES riječi s najviše zajedničkih trigrama."""
+        counts = Counter()
+        for g in _grams(w):
+            counts.update(self.by_gram.get(g, ()))
+        pool = [x for x, _ in counts.most_common(FUZZY_CANDIDATES)]
+        return difflib.get_close_matches(w, pool, n=5, cutoff=FUZZY_CUTOFF)
+
+    def resolve(self, first="", last="", oib=""):
+        """-> (id ili None, status): 'oib', 'ime', 'više članova istog imena', 'nije pronađen'.
+        Uz OIB kojeg nema u bazi, ime vrijedi samo za člana bez upisanog OIB-a."""
+        oib = oib_digits(oib)
+        if oib and oib in self.by_oib:
+            return self.by_oib[oib], "oib"
+        ids = self.by_name.get(fold(f"{first} {last}"), [])
+        if oib:
+            ids = [i for i in ids if not self.oib[i]]
+        if len(ids) == 1:
+            return ids[0], "ime"
+        return None, "više članova istog imena" if ids else "nije pronađen"
+
+    def search(self, text, limit=SEARCH_LIMIT):
+        """Interaktivna pretraga: OIB, točno ime (bilo kojim redom), počeci riječi, pa tipfeleri.
+        Vraća {oznaka: id} najboljih pogodaka."""
+        q = fold(text)
+        if not q:
+            return {}
+        hits = [self.by_oib[oib_digits(text)]] if oib_digits(text) in self.by_oib else []
+        hits += self.by_name.get(q, []) + self.by_reversed.get(q, [])
+        words = q.split()
+        if len(hits) < limit:
+            found = set.intersection(*(self._prefixed(w) for w in words))
+            hits += sorted(found, key=lambda i: (self.folded[i], i))[:limit]
+        if len(hits) < limit:
+            # svaka riječ upita smije imati tipfeler; član mora imati sličnu riječ za svaku
+            found = None
+            for w in words:
+                ids = set().union(*(self.by_word[c] for c in self._close(w)))
+                found = ids if found is None else found & ids
+            hits += sorted(found, key=lambda i: -difflib.SequenceMatcher(None, q, self.folded[i]).ratio())
+        return {self.labels[i]: i for i in list(dict.fromkeys(hits))[:limit]}
+
+
+@cached_query(CACHE, ("members",))
+def index(conn):
+    return MemberIndex(conn.execute(INDEX_SQL))
+
+def search(conn, text, limit=SEARCH_LIMIT):
+    return index(conn).search(text, limit)
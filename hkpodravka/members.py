@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – članovi: skupni uvoz iz Excela, unos i popis po stranicama.
+Stupci se normaliziraju i provjeravaju vektorski (pandas), ispravni retci
+upisuju se jednim executemany upsertom u jednoj transakciji, a za svaki
+redak datoteke vraća se izvještaj (novi / ažuriran / upozorenje / odbijen).
+Popis se filtrira u bazi i lista se ključem (prezime, ime, id) preko
+indeksa idx_members_name / idx_members_group_name, pa stranica košta isto
+bez obzira na veličinu registra. Uvoz grupa traži članove u indeksu
+lookup.py i sve dodjele upisuje jednim executemany.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from . import lookup
+from .cache import LRUCache, cached_query
+from .db import query_df
+
+# stupac predloška -> (stupac u bazi, vrsta)
+IMPORT_COLUMNS = {
+    "ime": ("first_name", "text"),
+    "prezime": ("last_name", "text"),
+    "datum_rodenja(YYYY-MM-DD)": ("dob", "date"),
+    "spol(M/Ž)": ("gender", "text"),
+    "oib": ("oib", "oib"),
+    "ulica_i_broj": ("street", "text"),
+    "grad": ("city", "text"),
+    "postanski_broj": ("postal_code", "text"),
+    "email_sportasa": ("athlete_email", "text"),
+    "email_roditelja": ("parent_email", "text"),
+    "br_osobne": ("id_card_number", "text"),
+    "osobna_vrijedi_do(YYYY-MM-DD)": ("id_card_valid_until", "date"),
+    "osobna_izdavatelj": ("id_card_issuer", "text"),
+    "br_putovnice": ("passport_number", "text"),
+    "putovnica_vrijedi_do(YYYY-MM-DD)": ("passport_valid_until", "date"),
+    "putovnica_izdavatelj": ("passport_issuer", "text"),
+    "aktivni_natjecatelj(0/1)": ("active_competitor", "flag"),
+    "veteran(0/1)": ("veteran", "flag"),
+    "ostalo(0/1)": ("other_flag", "flag"),
+    "placa_clanarinu(0/1)": ("pays_fee", "flag"),
+    "iznos_clanarine(EUR)": ("fee_amount", "fee"),
+    "grupa": ("group_name", "text"),
+}
+DB_COLUMNS = [c for c, _ in IMPORT_COLUMNS.values()]
+
+UPSERT_SQL = f"""INSERT INTO members({",".join(DB_COLUMNS)})
+    VALUES({",".join("?" * len(DB_COLUMNS))})
+    ON CONFLICT(oib) DO UPDATE SET
+    {",".join(f"{c}=excluded.{c}" for c in DB_COLUMNS if c != "oib")}"""
+
+REPORT_COLUMNS = ["redak", "ime", "prezime", "oib", "status", "napomena"]
+GROUP_REPORT_COLUMNS = ["redak", "ime", "prezime", "oib", "grupa", "member_id", "status"]
+CHUNK = 1000
+
+
+def template_df():
+    return pd.DataFrame(columns=list(IMPORT_COLUMNS))
+
+def _header_key(h):
+    # 'datum_rodenja(YYYY-MM-DD)' i 'datum_rodenja' (izvoz) su isti stupac
+    return re.sub(r"\(.*\)$", "", str(h)).strip().lower()
+
+def _text(s):
+    if pd.api.types.is_float_dtype(s):
+        # Excel brojeve (OIB, poštanski broj) čita kao float: 12345678901.0 -> '12345678901'
+        whole = s.notna() & (s % 1 == 0)
+        out = s.astype(object).where(s.notna(), "")
+        out[whole] = s[whole].astype("int64").astype(str)
+        s = out
+    elif pd.api.types.is_integer_dtype(s):
+        s = s.astype(str)
+    return s.fillna("").astype(str).str.strip().replace({"nan": "", "NaT": "", "None": ""})
+
+def _dates(s):
+    """-> (tekst YYYY-MM-DD ili '', maska neispravnih nepraznih vrijednosti)"""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        parsed = s
+        raw_empty = s.isna()
+    else:
+        raw = _text(s).str.rstrip(".")
+        raw_empty = raw.eq("")
+        # najprije ISO (YYYY-MM-DD iz predloška); dayfirst samo za ono što nije ISO (31.12.2010.),
+        # jer format="mixed" s dayfirst=True na pandas 3 zamijeni dan i mjesec i u ISO datumima
+        parsed = pd.to_datetime(raw.where(~raw_empty), errors="coerce", format="ISO8601")
+        retry = parsed.isna() & ~raw_empty
+        if retry.any():
+            parsed = parsed.mask(retry, pd.to_datetime(raw.where(retry), errors="coerce", format="mixed", dayfirst=True))
+    bad = parsed.isna() & ~raw_empty
+    return parsed.dt.strftime("%Y-%m-%d").fillna(""), bad
+
+def oib_valid(oib):
+    """Vektorska provjera OIB-a (11 znamenki, kontrolna znamenka ISO 7064 MOD 11,10)."""
+    fmt = oib.str.fullmatch(r"\d{11}").fillna(False).to_numpy()
+    n = pd.to_numeric(oib.where(fmt, "0")).to_numpy(dtype=np.int64)
+    a = np.full(len(n), 10, dtype=np.int64)
+    for i in range(10):
+        digit = (n // 10 ** (10 - i)) % 10
+        a = (a + digit) % 10
+        a = np.where(a == 0, 10, a)
+        a = (a * 2) % 11
+    control = 11 - a
+    control = np.where(control == 10, 0, control)
+    return pd.Series(fmt & (control == n % 10), index=oib.index)
+
+
+def normalize(df, existing_oibs=()):
+    """Vraća (clean, report): clean ima stupce DB_COLUMNS samo za retke koji se upisuju."""
+    by_key = {_header_key(h): h for h in df.columns}
+    clean = pd.DataFrame(index=df.index)
+    warnings = pd.Series("", index=df.index)
+    for col, (db_col, kind) in IMPORT_COLUMNS.items():
+        src = by_key.get(_header_key(col))
+        s = df[src] if src is not None else pd.Series([None] * len(df), index=df.index, dtype=object)
+        if kind == "date":
+            clean[db_col], bad = _dates(s)
+            warnings = warnings.mask(bad, warnings + f"neispravan datum ({col}); ")
+        elif kind == "flag":
+            clean[db_col] = pd.to_numeric(s, errors="coerce").fillna(0).clip(0, 1).astype(int)
+        elif kind == "fee":
+            clean[db_col] = pd.to_numeric(s, errors="coerce").fillna(30.0).astype(float)
+        elif kind == "oib":
+            clean[db_col] = _text(s)
+            if pd.api.types.is_numeric_dtype(s):
+                # brojčana ćelija gubi vodeće nule
+                clean[db_col] = clean[db_col].mask(clean[db_col].ne(""), clean[db_col].str.zfill(11))
+        else:
+            clean[db_col] = _text(s)
+
+    row_no = pd.Series(np.arange(len(df)) + 2, index=df.index)  # redak u Excelu (1 = zaglavlje)
+    oib = clean["oib"]
+    errors = pd.Series("", index=df.index)
+    errors = errors.mask(clean["first_name"].eq("") | clean["last_name"].eq(""), errors + "nedostaje ime ili prezime; ")
+    errors = errors.mask(oib.eq(""), errors + "nedostaje OIB; ")
+    errors = errors.mask(oib.ne("") & ~oib_valid(oib), errors + "neispravan OIB; ")
+    dup = oib.ne("") & oib.duplicated(keep="last")
+    kept_row = row_no.groupby(oib).transform("max")
+    errors = errors.mask(dup, errors + "duplikat OIB-a (vrijedi redak " + kept_row.astype(str) + "); ")
+
+    rejected = errors.ne("")
+    status = np.select([rejected, warnings.ne(""), oib.isin(set(existing_oibs))],
+                       ["odbijen", "upozorenje", "ažuriran"], "novi")
+    report = pd.DataFrame({
+        "redak": row_no, "ime": clean["first_name"], "prezime": clean["last_name"], "oib": oib,
+        "status": status, "napomena": (errors + warnings).str.rstrip("; "),
+    }, columns=REPORT_COLUMNS)
+    return clean.loc[~rejected, DB_COLUMNS], report
+
+
+def import_members(conn, df, progress=None):
+    """Uvozi DataFrame po predlošku; sve u jednoj transakciji. Vraća (report, counts).
+    progress(udio) se poziva nakon svakog bloka od CHUNK redaka."""
+    existing = {r[0] for r in conn.execute("SELECT oib FROM members WHERE oib IS NOT NULL AND oib<>''")}
+    clean, report = normalize(df, existing)
+    rows = list(clean.astype(object).itertuples(index=False, name=None))
+    try:
+        for start in range(0, len(rows), CHUNK):
+            conn.executemany(UPSERT_SQL, rows[start:start + CHUNK])
+            if progress:
+                progress(min(1.0, (start + CHUNK) / max(len(rows), 1)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    counts = report["status"].value_counts().to_dict()
+    return report, counts
+
+
+def assign_groups(conn, df):
+    """Uvoz grupa iz Excela (ime, prezime, grupa; po želji oib). Vraća izvještaj po retku;
+    status je 'oib' / 'ime' (pronađen po) ili razlog zašto redak nije upisan."""
+    by_key = {_header_key(h): h for h in df.columns}
+    empty = pd.Series([""] * len(df), index=df.index)
+    first, last, oib, group = (_text(df[by_key[c]]) if c in by_key else empty for c in ("ime", "prezime", "oib", "grupa"))
+    idx = lookup.index(conn)
+    resolved = [idx.resolve(f, l, o) if (f and l) or o else (None, "nedostaje ime ili prezime")
+                for f, l, o in zip(first, last, oib)]
+    report = pd.DataFrame({
+        "redak": np.arange(len(df)) + 2, "ime": first, "prezime": last, "oib": oib, "grupa": group,
+        "member_id": [r[0] for r in resolved], "status": [r[1] for r in resolved],
+    }, columns=GROUP_REPORT_COLUMNS)
+    found = report[report["member_id"].notna()]
+    try:
+        conn.executemany("UPDATE members SET group_name=? WHERE id=?",
+                         [(g or None, int(i)) for g, i in zip(found["grupa"], found["member_id"])])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return report
+
+
+# ---- pojedinačni unos (obrazac) ----
+DOC_COLUMNS = ["photo_path", "application_path", "consent_path", "medical_path"]
+FORM_COLUMNS = DB_COLUMNS + DOC_COLUMNS + ["medical_valid_until", "consent_checked_date"]
+
+# dokument se ne briše kad obrazac ne pošalje novi
+SAVE_SQL = f"""INSERT INTO members({",".join(FORM_COLUMNS)})
+    VALUES({",".join("?" * len(FORM_COLUMNS))})
+    ON CONFLICT(oib) DO UPDATE SET
+    {",".join(f"{c}=COALESCE(excluded.{c},{c})" if c in DOC_COLUMNS else f"{c}=excluded.{c}" for c in FORM_COLUMNS if c != "oib")}"""
+
+def save(conn, data):
+    """Novi član ili izmjena postojećeg (po OIB-u); data = {stupac: vrijednost}, ostali stupci NULL. Vraća id."""
+    unknown = set(data) - set(FORM_COLUMNS)
+    if unknown:
+        raise ValueError(f"Nepoznati stupci člana: {', '.join(sorted(unknown))}")
+    try:
+        cur = conn.execute(SAVE_SQL, [data.get(c) for c in FORM_COLUMNS])
+        row = conn.execute("SELECT id FROM members WHERE oib=?", (data["oib"],)).fetchone() if data.get("oib") else None
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return row[0] if row else cur.lastrowid
+
+def delete(conn, member_id):
+    conn.execute("DELETE FROM members WHERE id=?", (int(member_id),)); conn.commit()
+
+
+# ---- popis članova ----
+PAGE_SIZE = 50
+ALL = "(svi)"
+FEE_FILTERS = {ALL: None, "plaća": 1, "ne plaća": 0}
+CACHE = LRUCache(maxsize=64)
+
+# isti izrazi kao u indeksima migracije 6 – inače SQLite ne koristi indeks za ORDER BY
+SORT_KEY = "COALESCE(last_name,''), COALESCE(first_name,''), id"
+KEYSET_SQL = """COALESCE(last_name,'') >= ? AND (COALESCE(last_name,'') > ?
+    OR COALESCE(first_name,'') > ? OR (COALESCE(first_name,'') = ? AND id > ?))"""
+
+LIST_SQL = f"""SELECT id, first_name, last_name, gender, dob, oib, street, city, postal_code, athlete_email, parent_email,
+    group_name, pays_fee, fee_amount, medical_valid_until,
+    COALESCE(last_name,'') AS _k1, COALESCE(first_name,'') AS _k2
+    FROM members {{where}}
+    ORDER BY {SORT_KEY} LIMIT ?"""
+
+EXPORT_SQL = f"""SELECT first_name AS ime, last_name AS prezime, dob AS datum_rodenja, gender AS spol, oib,
+    street AS ulica_i_broj, city AS grad, postal_code AS postanski_broj,
+    athlete_email AS email_sportasa, parent_email AS email_roditelja,
+    id_card_number AS br_osobne, id_card_valid_until AS osobna_vrijedi_do, id_card_issuer AS osobna_izdavatelj,
+    passport_number AS br_putovnice, passport_valid_until AS putovnica_vrijedi_do, passport_issuer AS putovnica_izdavatelj,
+    active_competitor AS aktivni_natjecatelj, veteran, other_flag AS ostalo,
+    pays_fee AS placa_clanarinu, fee_amount AS iznos_clanarine, group_name AS grupa
+    FROM members {{where}} ORDER BY {SORT_KEY}"""
+
+GROUPS_EXPORT_SQL = """SELECT first_name AS ime, last_name AS prezime, COALESCE(group_name,'') AS grupa
+    FROM members ORDER BY last_name, first_name"""
+
+
+def list_where(search="", group=ALL, city="", fee=None):
+    """WHERE za popis: search je ime/prezime (dio) ili točan OIB."""
+    conds, params = [], []
+    search = (search or "").strip()
+    if re.fullmatch(r"\d{11}", search):
+        conds.append("oib=?"); params.append(search)
+    elif search:
+        for word in search.split():
+            conds.append("(first_name LIKE ? OR last_name LIKE ?)"); params += [f"%{word}%"] * 2
+    if group and group != ALL:
+        conds.append("COALESCE(group_name,'')=?"); params.append(group)
+    if (city or "").strip():
+        conds.append("city LIKE ?"); params.append(f"{city.strip()}%")
+    if fee is not None:
+        conds.append("COALESCE(pays_fee,0)=?"); params.append(int(fee))
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+def list_page(conn, filters=(), after=None, limit=PAGE_SIZE):
+    """Jedna stranica popisa. after = ključ zadnjeg retka prethodne stranice (iz next_cursor).
+    Vraća (DataFrame, ima_li_još)."""
+    where, params = list_where(*filters)
+    if after is not None:
+        # "(k1,k2,id) > (?,?,?)" bi bio ispravan, ali SQLite tada ne traži po indeksu izraza;
+        # k1 >= ? daje raspon u indeksu, ostatak samo dotjeruje granicu
+        k1, k2, last_id = after
+        where += (" AND " if where else " WHERE ") + KEYSET_SQL
+        params += [k1, k1, k2, k2, int(last_id)]
+    df = query_df(conn, LIST_SQL.format(where=where), params + [limit + 1])
+    more = len(df) > limit
+    return df.iloc[:limit], more
+
+def next_cursor(page):
+    last = page.iloc[-1]
+    return last["_k1"], last["_k2"], int(last["id"])
+
+@cached_query(CACHE, ("members",))
+def list_count(conn, filters=()):
+    where, params = list_where(*filters)
+    return conn.execute(f"SELECT COUNT(*) FROM members {where}", params).fetchone()[0]
+
+def export_df(conn, filters=()):
+    """Cijeli (filtrirani) popis u obliku predloška za uvoz."""
+    where, params = list_where(*filters)
+    return query_df(conn, EXPORT_SQL.format(where=where), params)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – verzionirane migracije sheme.
+Svaka migracija ima redni broj; primijenjene se bilježe u tablici schema_version.
+ensure_schema() se izvršava jednom po procesu, a sve migracije koje nedostaju
+primjenjuju se u jednoj transakciji.
+"""
+import json, logging, threading
+from datetime import datetime
+
+from . import aggregates, bouts, cache, compliance, db, search
+from .config import KLUB_NAZIV, KLUB_EMAIL, KLUB_ADRESA, KLUB_OIB, KLUB_WEB, KLUB_IBAN
+
+log = logging.getLogger(__name__)
+
+MIGRATIONS = []
+
+def migration(version, name):
+    def deco(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return deco
+
+def _columns(cur, table):
+    return {r[1] for r in cur.execute(f"PRAGMA table_info({table})")}
+
+def _add_column(cur, table, column, decl):
+    if column not in _columns(cur, table):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+@migration(1, "osnovne tablice")
+def _m001_base(cur):
+    # IF NOT EXISTS: postojeće baze (prije schema_version) prolaze bez promjena
+    cur.execute("""CREATE TABLE IF NOT EXISTS club_info (
+        id INTEGER PRIMARY KEY CHECK (id=1),
+        name TEXT, email TEXT, address TEXT, oib TEXT, web TEXT, iban TEXT,
+        president TEXT, secretary TEXT, board_json TEXT, supervisory_json TEXT,
+        instagram TEXT, facebook TEXT, tiktok TEXT
+    )""")
+    cur.execute("""INSERT OR IGNORE INTO club_info (id,name,email,address,oib,web,iban,president,secretary,board_json,supervisory_json,instagram,facebook,tiktok)
+                   VALUES (1,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
+                (KLUB_NAZIV, KLUB_EMAIL, KLUB_ADRESA, KLUB_OIB, KLUB_WEB, KLUB_IBAN, "", "", "[]", "[]", "", "", ""))
+    cur.execute("""CREATE TABLE IF NOT EXISTS club_docs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, filename TEXT, path TEXT, uploaded_at TEXT
+    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS members (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT, last_name TEXT, dob TEXT, gender TEXT, oib TEXT UNIQUE,
+        street TEXT, city TEXT, postal_code TEXT,
+        athlete_email TEXT, parent_email TEXT,
+        id_card_number TEXT, id_card_issuer TEXT, id_card_valid_until TEXT,
+        passport_number TEXT, passport_issuer TEXT, passport_valid_until TEXT,
+        active_competitor INTEGER DEFAULT 0, veteran INTEGER DEFAULT 0, other_flag INTEGER DEFAULT 0,
+        pays_fee INTEGER DEFAULT 0, fee_amount REAL DEFAULT 30.0,
+        group_name TEXT, photo_path TEXT,
+        application_path TEXT, consent_path TEXT,
+        medical_path TEXT, medical_valid_until TEXT, consent_checked_date TEXT
+    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS coaches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT, last_name TEXT, dob TEXT, oib TEXT, email TEXT, iban TEXT,
+        group_name TEXT, contract_path TEXT, other_docs_json TEXT, photo_path TEXT
+    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS competitions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT, kind_other TEXT, name TEXT,
+        date_from TEXT, date_to TEXT, place TEXT,
+        style TEXT, age_cat TEXT,
+        country TEXT, country_iso3 TEXT,
+        team_rank INTEGER, club_competitors INTEGER, total_competitors INTEGER,
+        clubs_count INTEGER, countries_count INTEGER,
+        coaches_json TEXT, notes TEXT, bulletin_url TEXT, website_link TEXT, gallery_paths_json TEXT
+    )""")
+    cur.execute("""CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        competition_id INTEGER REFERENCES competitions(id) ON DELETE CASCADE,
+        member_id INTEGER REFERENCES members(id) ON DELETE SET NULL,
+        category TEXT, style TEXT,
+        fights_total INTEGER, wins INTEGER, losses INTEGER, placement INTEGER,
+        wins_detail_json TEXT, losses_detail_json TEXT, note TEXT
+    )""")
+    # Grupe
+    cur.execute("""CREATE TABLE IF NOT EXISTS groups (
+        name TEXT PRIMARY KEY,
+        description TEXT DEFAULT ''
+    )""")
+    # Trening sesije (prisustvo)
+    cur.execute("""CREATE TABLE IF NOT EXISTS training_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trainer_id INTEGER,
+        trainer_name TEXT,
+        group_name TEXT,
+        start_dt TEXT,
+        end_dt TEXT,
+        location TEXT,
+        rep_prep INTEGER DEFAULT 0
+    )""")
+    # Raspored grupa s trenerima
+    cur.execute("""CREATE TABLE IF NOT EXISTS group_schedules (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        group_name TEXT,
+        coach_id INTEGER,
+        coach_name TEXT,
+        day_of_week INTEGER,  -- 0=Mon .. 6=Sun
+        start_time TEXT,  -- 'HH:MM'
+        end_time TEXT,
+        location TEXT
+    )""")
+    # Evidencija prisustva po članu
+    cur.execute("""CREATE TABLE IF NOT EXISTS attendance (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER,
+        member_id INTEGER,
+        present INTEGER DEFAULT 1,
+        UNIQUE(session_id, member_id)
+    )""")
+
+@migration(2, "members.phone (veterani)")
+def _m002_member_phone(cur):
+    _add_column(cur, "members", "phone", "TEXT")
+
+@migration(3, "competitions.year + indeksi za statistiku")
+def _m003_stats_indexes(cur):
+    # virtualni generirani stupac: godina se ne čuva dvaput, a može se indeksirati
+    _add_column(cur, "competitions", "year",
+                "INTEGER GENERATED ALWAYS AS (CAST(substr(date_from,1,4) AS INTEGER)) VIRTUAL")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_competitions_year_kind_age ON competitions(year, kind, age_cat)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_results_competition ON results(competition_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_results_member ON results(member_id)")
+
+@migration(4, "competition_coaches (zamjena za coaches_json)")
+def _m004_competition_coaches(cur):
+    cur.execute("""CREATE TABLE IF NOT EXISTS competition_coaches (
+        competition_id INTEGER NOT NULL REFERENCES competitions(id) ON DELETE CASCADE,
+        coach_id INTEGER NOT NULL REFERENCES coaches(id) ON DELETE CASCADE,
+        PRIMARY KEY (competition_id, coach_id)
+    ) WITHOUT ROWID""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_competition_coaches_coach ON competition_coaches(coach_id, competition_id)")
+    # pokrivajući indeks za brojanje medalja po natjecanju (zamjenjuje idx_results_competition)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_results_competition_placement ON results(competition_id, placement)")
+    cur.execute("DROP INDEX IF EXISTS idx_results_competition")
+    # backfill: povezuju se samo imena koja odgovaraju postojećem treneru; nepoznata ostaju
+    # samo u coaches_json (ne izmišljamo trenere iz teksta) i bilježe se u log
+    by_name = {" ".join(full.lower().split()): cid for cid, full in
+               cur.execute("SELECT id, COALESCE(first_name,'') || ' ' || COALESCE(last_name,'') FROM coaches")}
+    links, unmatched = [], {}
+    for comp_id, js in cur.execute("SELECT id, coaches_json FROM competitions WHERE COALESCE(coaches_json,'') NOT IN ('','[]')").fetchall():
+        try:
+            names = json.loads(js)
+        except ValueError:
+            continue
+        for name in names if isinstance(names, list) else []:
+            name = str(name).strip()
+            if not name:
+                continue
+            coach_id = by_name.get(" ".join(name.lower().split()))
+            if coach_id is None:
+                unmatched.setdefault(name, []).append(comp_id)
+            else:
+                links.append((comp_id, coach_id))
+    cur.executemany("INSERT OR IGNORE INTO competition_coaches(competition_id,coach_id) VALUES (?,?)", links)
+    for name, comp_ids in sorted(unmatched.items()):
+        log.warning("coaches_json: trener %r nije pronađen, ostaje samo u coaches_json (natjecanja %s)",
+                    name, ", ".join(map(str, comp_ids)))
+
+@migration(5, "zbrojne tablice agg_medals / agg_member_year + okidači")
+def _m005_aggregates(cur):
+    aggregates.install(cur)
+
+@migration(6, "indeksi za popis članova po stranicama")
+def _m006_member_list_indexes(cur):
+    # izrazi moraju biti isti kao members.SORT_KEY
+    cur.execute("""CREATE INDEX IF NOT EXISTS idx_members_name
+                   ON members(COALESCE(last_name,''), COALESCE(first_name,''), id)""")
+    cur.execute("""CREATE INDEX IF NOT EXISTS idx_members_group_name
+                   ON members(COALESCE(group_name,''), COALESCE(last_name,''), COALESCE(first_name,''), id)""")
+
+@migration(7, "indeksi za analitiku prisustva")
+def _m007_attendance_indexes(cur):
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_training_sessions_start_group ON training_sessions(start_dt, group_name)")
+    # UNIQUE(session_id, member_id) pokriva upite po treningu; ovaj pokriva povijest člana
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_attendance_member ON attendance(member_id, session_id, present)")
+
+@migration(8, "kalendar kluba + veza treninga s rasporedom")
+def _m008_calendar(cur):
+    cur.execute("""CREATE TABLE IF NOT EXISTS club_calendar (
+        day TEXT PRIMARY KEY,  -- 'YYYY-MM-DD'
+        kind TEXT NOT NULL DEFAULT 'zatvoreno',  -- praznik / zatvoreno
+        note TEXT DEFAULT ''
+    ) WITHOUT ROWID""")
+    _add_column(cur, "training_sessions", "schedule_id", "INTEGER")
+    # stari ručno uneseni treninzi nemaju schedule_id pa ih indeks ne dira
+    cur.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_training_sessions_schedule
+                   ON training_sessions(schedule_id, start_dt) WHERE schedule_id IS NOT NULL""")
+
+@migration(9, "pozadinski poslovi (jobs)")
+def _m009_jobs(cur):
+    cur.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL, job_key TEXT, params_json TEXT NOT NULL DEFAULT '{}',
+        status TEXT NOT NULL DEFAULT 'queued',  -- queued / running / done / failed / cancelled
+        progress REAL NOT NULL DEFAULT 0, message TEXT DEFAULT '',
+        result_json TEXT, result_path TEXT, error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0, max_attempts INTEGER NOT NULL DEFAULT 3,
+        cancel_requested INTEGER NOT NULL DEFAULT 0, worker TEXT,
+        created_at TEXT NOT NULL, run_after TEXT NOT NULL,
+        started_at TEXT, heartbeat_at TEXT, finished_at TEXT
+    )""")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, run_after, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_key ON jobs(job_key, id)")
+
+@migration(10, "borbe (bouts) iz wins/losses_detail_json")
+def _m010_bouts(cur):
+    bouts.install(cur)
+
+@migration(11, "pretraga (FTS5 search_fts) s okidačima")
+def _m011_search(cur):
+    search.install(cur)
+
+@migration(12, "indeksi za istek dokumenata članova")
+def _m012_document_expiry(cur):
+    compliance.install(cur)
+
+
+@migration(13, "table_versions: verzije tablica za predmemoriju više procesa")
+def _m013_table_versions(cur):
+    cache.install(cur)
+
+def current_version(conn):
+    conn.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT
+    )""")
+    return conn.execute("SELECT COALESCE(MAX(version),0) FROM schema_version").fetchone()[0]
+
+def migrate(conn):
+    """Primjenjuje migracije koje nedostaju u jednoj transakciji. Vraća novu verziju."""
+    if current_version(conn) >= MIGRATIONS[-1][0]:
+        return MIGRATIONS[-1][0]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        cur = conn.cursor()
+        version = current_version(conn)  # ponovno, unutar zaključane transakcije
+        for num, name, fn in MIGRATIONS:
+            if num <= version:
+                continue
+            fn(cur)
+            cur.execute("INSERT INTO schema_version(version,name,applied_at) VALUES (?,?,?)",
+                        (num, name, datetime.now().isoformat(timespec="seconds")))
+            version = num
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return version
+
+
+_ready = set()
+_ready_lock = threading.Lock()
+
+def ensure_schema(path=None):
+    """Jednom po procesu (i putanji baze) dovodi shemu na zadnju verziju."""
+    path = path or db.DB_PATH
+    if path in _ready:
+        return
+    with _ready_lock:
+        if path in _ready:
+            return
+        with db.connection(path) as conn:
+            migrate(conn)
+        _ready.add(path)
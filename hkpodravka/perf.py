@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – mjerenje u radu: SQL naredbe, izvođenja sekcija i izvozi.
+Događaji idu u kružni spremnik u memoriji (EVENTS, zadnjih MAX_EVENTS), a
+skrivena stranica "Performanse" iz njih slaže najsporije upite, p50/p95
+po sekciji i broj upita po izvođenju. Naredbu mjeri kursor bazena
+(db.PooledConnection): vrijeme execute() i dohvata (fetchall/fetchmany)
+te broj redaka; za upit sporiji od SLOW_MS bilježi se i EXPLAIN QUERY
+PLAN. HKP_PERF=0 isključuje mjerenje.
+"""
+import json, os, re, sqlite3, threading, time
+from collections import deque
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("HKP_PERF", "1") != "0"
+MAX_EVENTS = 5000
+SLOW_MS = 100.0
+SQL_CHARS = 400
+
+EVENTS = deque(maxlen=MAX_EVENTS)
+_local = threading.local()
+_reruns = iter(range(1, 1 << 62))  # next() je atomaran pod GIL-om
+
+
+def _now():
+    return time.perf_counter() * 1000
+
+def normalize(sql):
+    return re.sub(r"\s+", " ", str(sql)).strip()[:SQL_CHARS]
+
+def _emit(event):
+    event["t"] = round(time.time(), 3)
+    EVENTS.append(event)
+    return event
+
+
+class Statement:
+    """Jedna naredba kursora; fetch() dodaje vrijeme i retke dohvata."""
+    __slots__ = ("event", "conn", "sql", "params")
+
+    def __init__(self, conn, sql, params, ms, rowcount):
+        scope = getattr(_local, "scope", None)
+        self.conn, self.sql, self.params = conn, sql, params
+        self.event = _emit({"kind": "query", "sql": normalize(sql), "ms": round(ms, 3),
+                            "rows": rowcount if rowcount >= 0 else 0,
+                            "section": scope["section"] if scope else None,
+                            "rerun": scope["rerun"] if scope else None,
+                            "thread": threading.current_thread().name})
+        if scope:
+            scope["queries"] += 1; scope["db_ms"] += ms
+        self._check_slow()
+
+    def fetch(self, ms, rows):
+        e = self.event
+        e["ms"] = round(e["ms"] + ms, 3); e["rows"] += rows
+        scope = getattr(_local, "scope", None)
+        if scope:
+            scope["db_ms"] += ms; scope["rows"] += rows
+        self._check_slow()
+
+    def _check_slow(self):
+        e = self.event
+        if e["ms"] < SLOW_MS or "plan" in e or not re.match(r"(?i)\s*(SELECT|WITH)\b", e["sql"]):
+            return
+        try:
+            # osnovni execute konekcije – EXPLAIN se ne mjeri niti bilježi
+            plan = sqlite3.Connection.execute(self.conn, "EXPLAIN QUERY PLAN " + self.sql, self.params or ()).fetchall()
+            e["plan"] = " | ".join(str(r[-1]) for r in plan)
+        except sqlite3.Error as ex:
+            e["plan"] = f"(nije dostupno: {ex})"
+
+
+def _off():
+    return not ENABLED or getattr(_local, "quiet", False)
+
+@contextmanager
+def quiet():
+    """Naredbe unutar bloka se ne bilježe (npr. prozivanje reda poslova)."""
+    prev, _local.quiet = getattr(_local, "quiet", False), True
+    try:
+        yield
+    finally:
+        _local.quiet = prev
+
+
+class TimedCursor(sqlite3.Cursor):
+    _stmt = None
+
+    def execute(self, sql, params=()):
+        if _off():
+            return super().execute(sql, params)
+        t0 = _now()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._stmt = Statement(self.connection, sql, params, _now() - t0, self.rowcount)
+
+    def executemany(self, sql, seq):
+        if _off():
+            return super().executemany(sql, seq)
+        t0 = _now()
+        try:
+            return super().executemany(sql, seq)
+        finally:
+            self._stmt = Statement(self.connection, sql, None, _now() - t0, self.rowcount)
+
+    def fetchall(self):
+        t0 = _now()
+        rows = super().fetchall()
+        if self._stmt is not None:
+            self._stmt.fetch(_now() - t0, len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        t0 = _now()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        if self._stmt is not None:
+            self._stmt.fetch(_now() - t0, len(rows))
+        return rows
+
+
+@contextmanager
+def section(name):
+    """Jedno izvođenje sekcije: trajanje, broj naredbi, vrijeme u bazi i retci."""
+    if not ENABLED:
+        yield
+        return
+    scope = _local.scope = {"section": name, "rerun": next(_reruns), "queries": 0, "db_ms": 0.0, "rows": 0}
+    t0 = _now()
+    try:
+        yield
+    finally:
+        _local.scope = None
+        _emit({"kind": "section", "name": name, "rerun": scope["rerun"], "ms": round(_now() - t0, 3),
+               "queries": scope["queries"], "db_ms": round(scope["db_ms"], 3), "rows": scope["rows"]})
+
+def export(sheets, ms, size):
+    if ENABLED:
+        _emit({"kind": "export", "name": ", ".join(sheets), "ms": round(ms, 3), "bytes": size,
+               "section": (getattr(_local, "scope", None) or {}).get("section"),
+               "thread": threading.current_thread().name})
+
+
+def events(kind=None):
+    return [e for e in list(EVENTS) if kind is None or e["kind"] == kind]
+
+def clear():
+    EVENTS.clear()
+
+def jsonl(kind=None):
+    """Događaji kao JSON lines (za analizu izvan aplikacije)."""
+    return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events(kind)).encode("utf-8")
+
+def _pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] if values else 0.0
+
+def slow_queries(limit=20):
+    """Po obliku naredbe: broj, ukupno/p95/najdulje ms, retci i plan najsporijeg izvođenja."""
+    by_sql = {}
+    for e in events("query"):
+        by_sql.setdefault(e["sql"], []).append(e)
+    rows = []
+    for sql, es in by_sql.items():
+        worst = max(es, key=lambda e: e["ms"])
+        ms = [e["ms"] for e in es]
+        rows.append({"naredba": sql, "broj": len(es), "ukupno_ms": round(sum(ms), 1), "p95_ms": round(_pct(ms, 95), 1),
+                     "max_ms": round(worst["ms"], 1), "redaka": max(e["rows"] for e in es),
+                     "sekcija": worst["section"] or worst["thread"], "plan": worst.get("plan", "")})
+    return sorted(rows, key=lambda r: -r["max_ms"])[:limit]
+
+def section_stats():
+    """Po sekciji: broj izvođenja, p50/p95 trajanja, prosjek i najviše upita po izvođenju, udio baze."""
+    by_name = {}
+    for e in events("section"):
+        by_name.setdefault(e["name"], []).append(e)
+    rows = []
+    for name, es in sorted(by_name.items()):
+        ms, q = [e["ms"] for e in es], [e["queries"] for e in es]
+        rows.append({"sekcija": name, "izvođenja": len(es), "p50_ms": round(_pct(ms, 50), 1), "p95_ms": round(_pct(ms, 95), 1),
+                     "upita_prosjek": round(sum(q) / len(q), 1), "upita_max": max(q),
+                     "baza_ms_p50": round(_pct([e["db_ms"] for e in es], 50), 1)})
+    return rows
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – popisi za padajuće izbornike (članovi, treneri, grupe, natjecanja).
+Svaki popis je jedan upit bez pandasa, vraća se kao gotov rječnik
+oznaka -> id (ili lista naziva) i pamti u CACHE dok bump() na njegovoj
+tablici ne promijeni verziju, pa ponovno izvođenje stranice ne ide u bazu.
+"""
+from .cache import LRUCache, cached_query
+
+CACHE = LRUCache(maxsize=64)
+REFERENCE_TABLES = ("members", "coaches", "groups", "group_schedules", "competitions")
+
+MEMBERS_SQL = """SELECT id, first_name, last_name, COALESCE(group_name,'') FROM members
+    ORDER BY COALESCE(last_name,''), COALESCE(first_name,''), id"""
+COACHES_SQL = "SELECT id, first_name, last_name FROM coaches ORDER BY last_name, first_name, id"
+COMPETITIONS_SQL = "SELECT id, COALESCE(name, kind), date_from FROM competitions ORDER BY date_from DESC, id DESC"
+
+
+def full_name(first, last):
+    return f"{first or ''} {last or ''}".strip()
+
+@cached_query(CACHE, ("members",))
+def member_options(conn):
+    """'id – Ime Prezime' -> id; id u oznaci razlikuje članove istog imena."""
+    return {f"{i} – {full_name(f, l)}": i for i, f, l, _ in conn.execute(MEMBERS_SQL)}
+
+@cached_query(CACHE, ("members",))
+def member_groups(conn):
+    """id člana -> grupa ('' bez grupe)."""
+    return {i: g for i, _, _, g in conn.execute(MEMBERS_SQL)}
+
+@cached_query(CACHE, ("members",))
+def member_group_names(conn):
+    """Grupe upisane kod članova (i '' ako netko nema grupu)."""
+    return [r[0] for r in conn.execute("SELECT DISTINCT COALESCE(group_name,'') AS g FROM members ORDER BY g")]
+
+@cached_query(CACHE, ("coaches",))
+def coach_options(conn):
+    """'Ime Prezime' -> id; kod istog imena vrijedi prvi."""
+    opts = {}
+    for i, f, l in conn.execute(COACHES_SQL):
+        opts.setdefault(full_name(f, l), i)
+    return opts
+
+@cached_query(CACHE, ("coaches",))
+def coach_names(conn):
+    """id trenera -> 'Ime Prezime' (za format_func)."""
+    return {i: full_name(f, l) for i, f, l in conn.execute(COACHES_SQL)}
+
+@cached_query(CACHE, ("groups",))
+def group_names(conn):
+    return [r[0] for r in conn.execute("SELECT name FROM groups ORDER BY name")]
+
+@cached_query(CACHE, ("group_schedules",))
+def schedule_groups(conn):
+    """Grupe koje imaju barem jednu stavku tjednog rasporeda."""
+    return [r[0] for r in conn.execute("SELECT DISTINCT group_name FROM group_schedules ORDER BY group_name")]
+
+@cached_query(CACHE, ("competitions",))
+def competition_options(conn):
+    """'id – naziv (datum)' -> id, najnovija prva."""
+    return {f"{i} – {title} ({day})": i for i, title, day in conn.execute(COMPETITIONS_SQL)}
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – generiranje treninga iz tjednog rasporeda (group_schedules).
+Raspored se razvija za zadano razdoblje (npr. cijelu sezonu), dani iz
+kalendara kluba (club_calendar: praznici i zatvoreni dani) se preskaču, a svi
+treninzi upisuju se jednim executemany u jednoj transakciji. Ponovno
+pokretanje nad razdobljem koje se preklapa ne stvara duplikate: za treninge iz
+rasporeda to jamči jedinstveni indeks (schedule_id, start_dt), pa dva retka
+rasporeda iste grupe u isto vrijeme (dva trenera ili dvorane) daju dva
+treninga. Trening se ne dodaje samo ako grupa u to vrijeme već ima ručno
+unesen trening (bez schedule_id).
+"""
+from datetime import date, datetime, time, timedelta
+
+INSERT_SQL = """INSERT INTO training_sessions (trainer_id, trainer_name, group_name, start_dt, end_dt, location, rep_prep, schedule_id)
+    SELECT ?, ?, ?, ?, ?, ?, 0, ?
+    WHERE NOT EXISTS (SELECT 1 FROM training_sessions WHERE start_dt=? AND group_name IS ? AND schedule_id IS NULL)
+    ON CONFLICT DO NOTHING"""
+
+SCHEDULES_SQL = """SELECT id, group_name, coach_id, coach_name, day_of_week, start_time, end_time, location
+    FROM group_schedules {where} ORDER BY day_of_week, start_time"""
+
+
+def easter(year):
+    """Uskrs (gregorijanski kalendar, anonimni algoritam)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+def holidays(year):
+    """Državni praznici i blagdani u RH: [(datum, naziv)]."""
+    e = easter(year)
+    fixed = [(1, 1, "Nova godina"), (1, 6, "Sveta tri kralja"), (5, 1, "Praznik rada"),
+             (5, 30, "Dan državnosti"), (6, 22, "Dan antifašističke borbe"),
+             (8, 5, "Dan pobjede i domovinske zahvalnosti"), (8, 15, "Velika Gospa"), (11, 1, "Svi sveti"),
+             (11, 18, "Dan sjećanja na žrtve Domovinskog rata"), (12, 25, "Božić"), (12, 26, "Sveti Stjepan")]
+    days = [(date(year, m, d), name) for m, d, name in fixed]
+    days += [(e, "Uskrs"), (e + timedelta(days=1), "Uskrsni ponedjeljak"), (e + timedelta(days=60), "Tijelovo")]
+    return sorted(days)
+
+def add_holidays(conn, year):
+    """Upisuje praznike godine u club_calendar (postojeći dani ostaju); vraća broj novih."""
+    # rowcount, ne total_changes: total_changes broji i upise okidača (table_versions)
+    added = conn.executemany("INSERT OR IGNORE INTO club_calendar(day, kind, note) VALUES (?, 'praznik', ?)",
+                             [(d.isoformat(), name) for d, name in holidays(year)]).rowcount
+    conn.commit()
+    return added
+
+def closed_days(conn, date_from, date_to):
+    return {r[0] for r in conn.execute("SELECT day FROM club_calendar WHERE day BETWEEN ? AND ?",
+                                       (str(date_from), str(date_to)))}
+
+
+def expand(schedules, date_from, date_to, closed=(), location=None):
+    """Retci rasporeda (dict ili sqlite3.Row) -> retci za INSERT_SQL, bez zatvorenih dana.
+    Vraća (retci, broj preskočenih termina)."""
+    rows, skipped = [], 0
+    for s in schedules:
+        first = date_from + timedelta(days=(int(s["day_of_week"]) - date_from.weekday()) % 7)
+        start_t, end_t = time.fromisoformat(s["start_time"]), time.fromisoformat(s["end_time"])
+        for n in range(0, (date_to - first).days + 1, 7):
+            day = first + timedelta(days=n)
+            if day.isoformat() in closed:
+                skipped += 1
+                continue
+            start = datetime.combine(day, start_t).isoformat()
+            end_day = day if end_t > start_t else day + timedelta(days=1)
+            rows.append((s["coach_id"], s["coach_name"], s["group_name"], start,
+                         datetime.combine(end_day, end_t).isoformat(), location or s["location"], s["id"],
+                         start, s["group_name"]))
+    return rows, skipped
+
+def generate(conn, date_from, date_to, groups=None, location=None):
+    """Treninzi iz rasporeda za [date_from, date_to] u jednoj transakciji.
+    Vraća (dodano, već postojalo, preskočeno zbog kalendara)."""
+    where, params = "", []
+    if groups:
+        where = f"WHERE group_name IN ({','.join('?' * len(groups))})"
+        params = list(groups)
+    cur = conn.execute(SCHEDULES_SQL.format(where=where), params)
+    cols = [d[0] for d in cur.description]
+    schedules = [dict(zip(cols, r)) for r in cur]
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows, skipped = expand(schedules, date_from, date_to, closed_days(conn, date_from, date_to), location)
+        added = conn.executemany(INSERT_SQL, rows).rowcount if rows else 0
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return added, len(rows) - added, skipped
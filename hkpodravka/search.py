@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – pretraga cijele baze (SQLite FTS5, tablica search_fts).
+Jedan indeks za članove (ime, prezime, OIB, grad), trenere (ime, prezime),
+natjecanja (naziv, vrsta, mjesto, datum, napomene) i napomene rezultata.
+rowid retka je id * 4 + vrsta (KINDS), pa okidači na izvornim tablicama
+brišu i upisuju točno jedan redak bez dodatnog indeksa. Tokenizer
+unicode61 uklanja dijakritiku; đ nema rastav pa se i u indeksu i u upitu
+zamjenjuje s d (lookup.fold). Pogoci se rangiraju s bm25 (naslov vrijedi
+više od ostatka) i vraćaju po stranicama.
+
+    python -m hkpodravka search "čolak zagreb"
+"""
+import re
+
+from .cache import LRUCache, cached_query
+from .lookup import fold
+
+KINDS = ("member", "coach", "competition", "result")
+KIND_LABELS = {"member": "Član", "coach": "Trener", "competition": "Natjecanje", "result": "Rezultat"}
+SEARCH_TABLES = ("members", "coaches", "competitions", "results")
+PAGE_SIZE = 25
+WEIGHTS = (10.0, 1.0)  # bm25: title, body
+
+CACHE = LRUCache(maxsize=64)
+cached = cached_query(CACHE, SEARCH_TABLES)
+
+def _fold(expr):
+    return f"replace(replace({expr},'đ','d'),'Đ','D')"
+
+def _text(*cols):
+    return _fold(" || ' ' || ".join(f"COALESCE({c},'')" for c in cols))
+
+# vrsta -> (tablica, stupci naslova, stupci ostatka, uvjet za indeksiranje); {r} = NEW / OLD / alias
+SOURCES = {
+    "member": ("members", ("first_name", "last_name"), ("oib", "city"), None),
+    "coach": ("coaches", ("first_name", "last_name"), (), None),
+    "competition": ("competitions", ("name", "kind_other", "kind"), ("place", "date_from", "notes"), None),
+    "result": ("results", (), ("note",), "COALESCE({r}.note,'')<>''"),
+}
+
+TABLE_SQL = """CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"""
+
+def _insert_sql(kind, r):
+    table, title, body, cond = SOURCES[kind]
+    cols = lambda cs: _text(*(f"{r}.{c}" for c in cs)) if cs else "''"
+    where = " WHERE " + cond.format(r=r) if cond else ""
+    src = "" if r in ("NEW", "OLD") else f" FROM {table} {r}"
+    return (f"INSERT INTO search_fts(rowid, title, body) SELECT {r}.id*4+{KINDS.index(kind)}, "
+            f"{cols(title)}, {cols(body)}{src}{where};")
+
+def _triggers(kind):
+    table, title, body, _ = SOURCES[kind]
+    delete = f"DELETE FROM search_fts WHERE rowid=OLD.id*4+{KINDS.index(kind)};"
+    return (f"""CREATE TRIGGER IF NOT EXISTS search_{table}_ai AFTER INSERT ON {table} BEGIN
+        {_insert_sql(kind, "NEW")}
+    END""",
+            f"""CREATE TRIGGER IF NOT EXISTS search_{table}_ad AFTER DELETE ON {table} BEGIN
+        {delete}
+    END""",
+            f"""CREATE TRIGGER IF NOT EXISTS search_{table}_au AFTER UPDATE OF {", ".join(title + body)} ON {table} BEGIN
+        {delete}
+        {_insert_sql(kind, "NEW")}
+    END""")
+
+def install(cur):
+    """Tablica, okidači i punjenje iz postojećih podataka (migracija 11)."""
+    cur.execute(TABLE_SQL)
+    for kind in KINDS:
+        for sql in _triggers(kind):
+            cur.execute(sql)
+    rebuild(cur)
+
+def rebuild(cur):
+    cur.execute("DELETE FROM search_fts")
+    for kind in KINDS:
+        cur.execute(_insert_sql(kind, "t"))
+    cur.execute("INSERT INTO search_fts(search_fts) VALUES ('optimize')")
+
+
+def match_query(text):
+    """'Čolak  Zag' -> '"colak"* "zag"*' (sve riječi, kao početak riječi); '' ako nema riječi."""
+    return " ".join(f'"{w}"*' for w in re.findall(r"\w+", fold(text)))
+
+def _kind_filter(kinds):
+    codes = [str(KINDS.index(k)) for k in kinds or ()]
+    return f" AND (rowid & 3) IN ({','.join(codes)})" if codes else ""
+
+LABEL_SQL = {
+    "member": """SELECT id, COALESCE(first_name,'') || ' ' || COALESCE(last_name,''),
+                        trim(COALESCE(group_name,'') || ' · ' || COALESCE(city,'') || ' · ' || COALESCE(oib,''), ' ·')
+                   FROM members WHERE id IN ({ids})""",
+    "coach": """SELECT id, COALESCE(first_name,'') || ' ' || COALESCE(last_name,''), COALESCE(group_name,'')
+                  FROM coaches WHERE id IN ({ids})""",
+    "competition": """SELECT id, COALESCE(NULLIF(name,''), NULLIF(kind_other,''), kind, ''),
+                             trim(COALESCE(date_from,'') || ' · ' || COALESCE(place,'') || ' · ' || COALESCE(notes,''), ' ·')
+                        FROM competitions WHERE id IN ({ids})""",
+    "result": """SELECT r.id, COALESCE(m.first_name || ' ' || m.last_name, '?') || ' – '
+                        || COALESCE(NULLIF(c.name,''), NULLIF(c.kind_other,''), c.kind, '') || ' ' || COALESCE(c.year,''),
+                        COALESCE(r.note,'')
+                   FROM results r LEFT JOIN members m ON m.id=r.member_id LEFT JOIN competitions c ON c.id=r.competition_id
+                  WHERE r.id IN ({ids})""",
+}
+
+@cached
+def count(conn, text, kinds=()):
+    q = match_query(text)
+    if not q:
+        return 0
+    where = _kind_filter(kinds)
+    return conn.execute(f"SELECT COUNT(*) FROM search_fts WHERE search_fts MATCH ?{where}", (q,)).fetchone()[0]
+
+@cached
+def page(conn, text, kinds=(), offset=0, limit=PAGE_SIZE):
+    """Jedna stranica pogodaka, najbolji prvi: vrsta, id, naziv, detalji, vrsta_id (KINDS)."""
+    import pandas as pd
+    cols = ["vrsta", "id", "naziv", "detalji", "vrsta_id"]
+    q = match_query(text)
+    if not q:
+        return pd.DataFrame(columns=cols)
+    where = _kind_filter(kinds)
+    hits = conn.execute(f"""SELECT rowid FROM search_fts WHERE search_fts MATCH ?{where}
+                            ORDER BY bm25(search_fts, {WEIGHTS[0]}, {WEIGHTS[1]}), rowid LIMIT ? OFFSET ?""",
+                        (q, limit, offset)).fetchall()
+    by_kind = {}
+    for (rowid,) in hits:
+        by_kind.setdefault(KINDS[rowid & 3], []).append(rowid >> 2)
+    labels = {}
+    for kind, ids in by_kind.items():
+        for i, name, details in conn.execute(LABEL_SQL[kind].format(ids=",".join("?" * len(ids))), ids):
+            labels[(kind, i)] = (name.strip(), details)
+    rows = []
+    for (rowid,) in hits:
+        kind, i = KINDS[rowid & 3], rowid >> 2
+        name, details = labels.get((kind, i), ("", ""))
+        rows.append((KIND_LABELS[kind], i, name, details[:200], kind))
+    return pd.DataFrame(rows, columns=cols)
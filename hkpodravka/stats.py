@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – upiti za statistiku natjecanja i rezultata.
+Filtri po godini idu preko indeksiranog stupca competitions.year
+(idx_competitions_year_kind_age), a spoj s rezultatima preko
+idx_results_competition_placement / idx_results_member. Treneri natjecanja su u
+tablici competition_coaches (filtri primaju coach_id). Zbrojevi medalja i borbi
+bez filtra grupe/trenera čitaju se iz agg_medals / agg_member_year (aggregates.py).
+Rezultati se pamte u CACHE dok bump() na nekoj od STATS_TABLES ne promijeni verziju.
+"""
+from .cache import LRUCache, cached_query
+from .db import query_df
+
+STATS_TABLES = ("competitions", "results", "members", "coaches", "competition_coaches")
+CACHE = LRUCache(maxsize=256)
+cached = cached_query(CACHE, STATS_TABLES)
+
+ALL_GROUPS = "(sve)"
+ALL_COACHES = "(svi)"
+
+SUMMARY_SQL = """SELECT c.kind, c.age_cat, r.style,
+    SUM(r.fights_total) AS borbi, SUM(r.wins) AS pobjede, SUM(r.losses) AS porazi,
+    SUM(CASE WHEN r.placement=1 THEN 1 ELSE 0 END) AS zlato,
+    SUM(CASE WHEN r.placement=2 THEN 1 ELSE 0 END) AS srebro,
+    SUM(CASE WHEN r.placement=3 THEN 1 ELSE 0 END) AS bronca
+    FROM competitions c JOIN results r ON r.competition_id=c.id
+    {where}
+    GROUP BY c.kind, c.age_cat, r.style
+    ORDER BY c.kind, c.age_cat"""
+
+# sažetak bez filtra grupe/trenera čita se iz zbrojne tablice agg_medals
+SUMMARY_AGG_SQL = """SELECT NULLIF(kind,'') AS kind, NULLIF(age_cat,'') AS age_cat, NULLIF(style,'') AS style,
+    SUM(fights) AS borbi, SUM(wins) AS pobjede, SUM(losses) AS porazi,
+    SUM(gold) AS zlato, SUM(silver) AS srebro, SUM(bronze) AS bronca
+    FROM agg_medals
+    WHERE year BETWEEN ? AND ?
+    GROUP BY kind, age_cat, style
+    ORDER BY kind, age_cat"""
+
+PER_YEAR_SQL = """SELECT CAST(NULLIF(year,0) AS TEXT) AS godina,
+    SUM(fights) AS borbi,
+    SUM(gold) AS zlato,
+    SUM(silver) AS srebro,
+    SUM(bronze) AS bronca
+    FROM agg_medals
+    GROUP BY year
+    ORDER BY year"""
+
+PER_AGE_SQL = """SELECT NULLIF(age_cat,'') AS uzrast,
+    SUM(wins) AS pobjede, SUM(losses) AS porazi
+    FROM agg_medals
+    WHERE year=?
+    GROUP BY age_cat
+    ORDER BY age_cat"""
+
+PER_KIND_SQL = """SELECT NULLIF(a.kind,'') AS natjecanje,
+    (SELECT COUNT(*) FROM competitions c
+      WHERE c.year=? AND COALESCE(c.kind,'')=a.kind
+        AND EXISTS (SELECT 1 FROM results r WHERE r.competition_id=c.id)) AS broj_natjecanja,
+    SUM(a.gold + a.silver + a.bronze) AS medalje
+    FROM agg_medals a
+    WHERE a.year=?
+    GROUP BY a.kind ORDER BY broj_natjecanja DESC"""
+
+PER_ATHLETE_SQL = """SELECT CAST(NULLIF(year,0) AS TEXT) AS godina,
+       fights AS borbi,
+       wins AS pobjede,
+       losses AS porazi,
+       gold + silver + bronze AS medalje
+    FROM agg_member_year
+    WHERE member_id=?
+    ORDER BY year"""
+
+PER_COACH_SQL = """SELECT CAST(c.year AS TEXT) AS godina,
+       COUNT(DISTINCT c.id) AS broj_natjecanja,
+       SUM(CASE WHEN r.placement IN (1,2,3) THEN 1 ELSE 0 END) AS medalje
+    FROM competition_coaches cc
+    CROSS JOIN competitions c ON c.id=cc.competition_id  -- CROSS: kreće od indeksa trenera
+    JOIN results r ON r.competition_id=c.id
+    WHERE cc.coach_id=?
+    GROUP BY c.year
+    ORDER BY c.year"""
+
+COMPETITION_COACHES_SQL = """SELECT co.id, co.first_name || ' ' || co.last_name AS ime
+    FROM coaches co
+    WHERE EXISTS (SELECT 1 FROM competition_coaches cc WHERE cc.coach_id=co.id)
+    ORDER BY co.last_name, co.first_name"""
+
+YEAR_RESULTS_SQL = """SELECT c.date_from, c.kind, c.name, c.place, c.style, c.age_cat, r.member_id,
+       (SELECT first_name || ' ' || last_name FROM members m WHERE m.id=r.member_id) AS sportas,
+       r.category, r.fights_total, r.wins, r.losses, r.placement
+    FROM competitions c JOIN results r ON r.competition_id=c.id WHERE c.year=?
+    ORDER BY c.date_from DESC"""
+
+
+def where_clause(group_filter, coach_filter, year_from, year_to):
+    where = " WHERE c.year BETWEEN ? AND ? "
+    params = [int(year_from), int(year_to)]
+    if coach_filter is not None and coach_filter != ALL_COACHES:
+        where += " AND EXISTS (SELECT 1 FROM competition_coaches cc WHERE cc.competition_id=c.id AND cc.coach_id=?) "
+        params.append(int(coach_filter))
+    if group_filter and group_filter != ALL_GROUPS:
+        where += " AND EXISTS (SELECT 1 FROM members mm WHERE mm.id=r.member_id AND COALESCE(mm.group_name,'') = ?) "
+        params.append(group_filter)
+    return where, params
+
+@cached
+def summary(conn, year_from, year_to, group_filter=None, coach_filter=None):
+    if (not group_filter or group_filter == ALL_GROUPS) and (coach_filter is None or coach_filter == ALL_COACHES):
+        return query_df(conn, SUMMARY_AGG_SQL, (int(year_from), int(year_to)))
+    where, params = where_clause(group_filter, coach_filter, year_from, year_to)
+    return query_df(conn, SUMMARY_SQL.format(where=where), params)
+
+@cached
+def per_year(conn):
+    return query_df(conn, PER_YEAR_SQL)
+
+@cached
+def per_age(conn, year):
+    return query_df(conn, PER_AGE_SQL, (int(year),))
+
+@cached
+def per_kind(conn, year):
+    return query_df(conn, PER_KIND_SQL, (int(year), int(year)))
+
+@cached
+def per_athlete(conn, member_id):
+    return query_df(conn, PER_ATHLETE_SQL, (int(member_id),))
+
+@cached
+def per_coach(conn, coach_id):
+    return query_df(conn, PER_COACH_SQL, (int(coach_id),))
+
+@cached
+def competition_coaches(conn):
+    """Treneri koji su vodili barem jedno natjecanje (za padajuće izbornike)."""
+    return query_df(conn, COMPETITION_COACHES_SQL)
+
+def set_competition_coaches(conn, competition_id, coach_ids):
+    conn.execute("DELETE FROM competition_coaches WHERE competition_id=?", (int(competition_id),))
+    conn.executemany("INSERT OR IGNORE INTO competition_coaches(competition_id,coach_id) VALUES (?,?)",
+                     [(int(competition_id), int(c)) for c in coach_ids])
+
+@cached
+def year_results(conn, year):
+    return query_df(conn, YEAR_RESULTS_SQL, (int(year),))
+
+def report_frames(conn, year_from, year_to, group=None, coach=None, athlete_id=None, coach_id=None):
+    """Sve tablice napredne statistike kao [(list, DataFrame)] – za izvoz iz aplikacije i naredbenog retka."""
+    frames = [("Sažetak", summary(conn, year_from, year_to, group, coach)), ("Po_godinama", per_year(conn)),
+              ("Po_uzrastima", per_age(conn, year_to)), ("Po_vrsti", per_kind(conn, year_to))]
+    if athlete_id is not None:
+        frames.append(("Sportas_godine", per_athlete(conn, athlete_id)))
+    if coach_id is not None:
+        frames.append(("Trener_godine", per_coach(conn, coach_id)))
+    return frames
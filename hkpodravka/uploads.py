@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+HK Podravka – spremište priloženih datoteka adresirano sadržajem.
+Datoteka se sprema kao uploads/blobs/<sha[:2]>/<sha256><.ext>: čita se i
+hashira u blokovima, piše u privremenu datoteku u istom direktoriju i
+atomarno preimenuje (os.replace). Isti sadržaj (ista liječnička potvrda,
+ista fotografija u galeriji) zauzima disk samo jednom – svi retci u bazi
+pokazuju na istu putanju.
+
+Brisanje radi skupljač smeća (označi i počisti): blob koji se ne spominje
+ni u jednom stupcu iz REFERENCES i stariji je od GC_MIN_AGE briše se, a s
+njim i njegove umanjene slike (images.py).
+
+    python -m hkpodravka.uploads stats|gc|adopt [--db hk_podravka.db] [--dry-run]
+"""
+import argparse, glob, hashlib, json, os, sys, tempfile, time
+
+from . import db
+
+UPLOAD_DIR = "uploads"
+CHUNK = 1 << 20
+GC_MIN_AGE = 3600  # s; blob spremljen prije upisa retka u bazu ne smije nestati
+
+# (tablica, stupac, je li JSON lista putanja)
+REFERENCES = (
+    ("members", "photo_path", False), ("members", "application_path", False),
+    ("members", "consent_path", False), ("members", "medical_path", False),
+    ("coaches", "photo_path", False), ("coaches", "contract_path", False), ("coaches", "other_docs_json", True),
+    ("competitions", "gallery_paths_json", True),
+    ("club_docs", "path", False),
+)
+
+
+def blob_dir(root=UPLOAD_DIR):
+    return os.path.join(root, "blobs")
+
+def derived_dir(root=UPLOAD_DIR):
+    """Umanjene slike (images.py), uploads/derived/<veličina>/<sha[:2]>/<sha>.jpg."""
+    return os.path.join(root, "derived")
+
+def _ext(name):
+    ext = os.path.splitext(name or "")[1].lower()
+    return ext if ext[1:].isalnum() and len(ext) <= 6 else ""
+
+def _find(shard, sha):
+    found = glob.glob(os.path.join(shard, sha + "*"))
+    return found[0] if found else None
+
+def store(file, root=UPLOAD_DIR):
+    """Sprema datoteku (UploadedFile ili bilo koji binarni file-like s .name) i vraća putanju bloba."""
+    if not file:
+        return ""
+    tmp_dir = blob_dir(root)
+    os.makedirs(tmp_dir, exist_ok=True)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    h = hashlib.sha256()
+    fd, tmp = tempfile.mkstemp(dir=tmp_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: file.read(CHUNK), b""):
+                h.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+        sha = h.hexdigest()
+        shard = os.path.join(tmp_dir, sha[:2])
+        os.makedirs(shard, exist_ok=True)
+        existing = _find(shard, sha)
+        if existing:
+            os.utime(existing)  # svježe vrijeme štiti blob od GC-a dok se redak ne upiše
+            os.remove(tmp)
+            return existing
+        path = os.path.join(shard, sha + _ext(getattr(file, "name", "")))
+        os.replace(tmp, path)
+        return path
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def referenced_paths(conn):
+    """Sve putanje na koje pokazuje neki redak u bazi (normalizirane)."""
+    refs = set()
+    for table, column, is_json in REFERENCES:
+        if is_json:
+            sql = f"""SELECT j.value FROM {table}, json_each({table}.{column}) AS j
+                      WHERE json_valid({table}.{column}) AND json_type({table}.{column})='array'"""
+        else:
+            sql = f"SELECT {column} FROM {table} WHERE COALESCE({column},'')<>''"
+        refs.update(os.path.normpath(r[0]) for r in conn.execute(sql) if isinstance(r[0], str) and r[0])
+    return refs
+
+def _blobs(root):
+    for path in glob.glob(os.path.join(blob_dir(root), "??", "*")):
+        if os.path.isfile(path):
+            yield os.path.normpath(path)
+
+def stats(conn, root=UPLOAD_DIR):
+    refs = referenced_paths(conn)
+    blobs = list(_blobs(root))
+    size = sum(os.path.getsize(p) for p in blobs)
+    return {"blobs": len(blobs), "bytes": size, "references": len(refs),
+            "unreferenced": sum(1 for p in blobs if p not in refs)}
+
+def gc(conn, root=UPLOAD_DIR, min_age=GC_MIN_AGE, dry_run=False):
+    """Briše blobove bez reference starije od min_age sekundi; vraća (obrisano, oslobođeno bajtova)."""
+    refs = referenced_paths(conn)
+    now = time.time()
+    deleted = freed = 0
+    for path in _blobs(root):
+        if path in refs or now - os.path.getmtime(path) < min_age:
+            continue
+        freed += os.path.getsize(path)
+        deleted += 1
+        if not dry_run:
+            os.remove(path)
+    # izvedenice su predmemorija: briše se sve što ne pripada živom blobu (po potrebi se radi ponovno)
+    alive = {os.path.splitext(os.path.basename(p))[0] for p in _blobs(root)}
+    for path in glob.glob(os.path.join(derived_dir(root), "*", "??", "*.jpg")):
+        if os.path.splitext(os.path.basename(path))[0] not in alive:
+            freed += os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+    # privremene datoteke prekinutih spremanja
+    for tmp in glob.glob(os.path.join(blob_dir(root), ".upload-*")):
+        if now - os.path.getmtime(tmp) >= min_age and not dry_run:
+            os.remove(tmp)
+    return deleted, freed
+
+
+def adopt(conn, root=UPLOAD_DIR, dry_run=False):
+    """Stare datoteke (uploads/<podmapa>/<vrijeme>_<ime>) premješta u spremište i
+    prepravlja putanje u bazi u jednoj transakciji. Vraća (datoteka, ušteđeno bajtova)."""
+    blobs_prefix = os.path.normpath(blob_dir(root)) + os.sep
+    before = set(_blobs(root))
+    moved = {}
+    for old in sorted(referenced_paths(conn)):
+        if old.startswith(blobs_prefix) or not os.path.isfile(old):
+            continue
+        if dry_run:
+            moved[old] = None
+            continue
+        with open(old, "rb") as f:
+            moved[old] = os.path.normpath(store(f, root))
+    if dry_run or not moved:
+        return len(moved), 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table, column, is_json in REFERENCES:
+            if is_json:
+                rows = conn.execute(f"SELECT rowid, {column} FROM {table} WHERE json_valid({column})").fetchall()
+                for rowid, js in rows:
+                    paths = json.loads(js)
+                    if isinstance(paths, list) and any(isinstance(p, str) and os.path.normpath(p) in moved for p in paths):
+                        new = [moved.get(os.path.normpath(p), p) if isinstance(p, str) else p for p in paths]
+                        conn.execute(f"UPDATE {table} SET {column}=? WHERE rowid=?", (json.dumps(new, ensure_ascii=False), rowid))
+            else:
+                rows = conn.execute(f"SELECT rowid, {column} FROM {table} WHERE COALESCE({column},'')<>''").fetchall()
+                conn.executemany(f"UPDATE {table} SET {column}=? WHERE rowid=?",
+                                 [(moved[os.path.normpath(p)], rowid) for rowid, p in rows if os.path.normpath(p) in moved])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    saved = 0
+    for old in moved:
+        saved += os.path.getsize(old)
+        os.remove(old)
+    saved -= sum(os.path.getsize(p) for p in set(moved.values()) - before)
+    return len(moved), saved
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Spremište priloženih datoteka: statistika, čišćenje, preuzimanje starih datoteka.")
+    ap.add_argument("command", choices=["stats", "gc", "adopt"])
+    ap.add_argument("--db", default=db.DB_PATH)
+    ap.add_argument("--root", default=UPLOAD_DIR)
+    ap.add_argument("--min-age", type=float, default=GC_MIN_AGE)
+    ap.add_argument("--dry-run", action="store_true")
+    a = ap.parse_args(argv)
+    from .migrations import ensure_schema
+    ensure_schema(a.db)
+    with db.connection(a.db) as conn:
+        if a.command == "adopt":
+            n, saved = adopt(conn, a.root, a.dry_run)
+            print(f"Preuzeto datoteka: {n}, ušteđeno {saved / 2**20:.1f} MB.")
+        elif a.command == "gc":
+            n, freed = gc(conn, a.root, a.min_age, a.dry_run)
+            print(f"{'Za brisanje' if a.dry_run else 'Obrisano'} blobova: {n}, {freed / 2**20:.1f} MB.")
+        s = stats(conn, a.root)
+    print(f"Blobova: {s['blobs']} ({s['bytes'] / 2**20:.1f} MB), referenci: {s['references']}, bez reference: {s['unreferenced']}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""Zajednički fixturei: prazna baza na zadnjoj verziji sheme u privremenom direktoriju."""
+import pytest
+
+from hkpodravka import db, migrations
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """Konekcija iz bazena na novoj migriranoj bazi; db.DB_PATH pokazuje na nju."""
+    path = str(tmp_path / "hk_podravka.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    pool = db.get_pool(path)
+    with pool.connection() as c:
+        migrations.migrate(c)
+        yield c
+    pool.close_all()
+    db._pools.pop(path, None)
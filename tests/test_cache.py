@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+from hkpodravka import cache, members, reference
+
+
+def test_sync_picks_up_writes_from_other_processes(conn, tmp_path):
+    members.save(conn, {"first_name": "Ivan", "last_name": "Horvat", "oib": None, "group_name": "Hrvači"})
+    cache.bump("members")
+    cache.sync(conn)
+    assert reference.member_group_names(conn) == ["Hrvači"]
+    # drugi proces: zasebna konekcija koja ne zna za bump() ovog procesa
+    other = sqlite3.connect(conn.path)
+    other.execute("UPDATE members SET group_name='Veterani'"); other.commit(); other.close()
+    assert reference.member_group_names(conn) == ["Hrvači"]  # predmemorija još ne zna
+    assert cache.sync(conn) == ["members"]
+    assert reference.member_group_names(conn) == ["Veterani"]
+    assert cache.sync(conn) == []
+
+def test_triggers_cover_versioned_tables(conn):
+    triggers = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'version_%'")}
+    assert len(triggers) == 3 * len(cache.VERSIONED)
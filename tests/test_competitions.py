@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+
+import pytest
+
+from hkpodravka import bouts, competitions, members, stats
+
+
+@pytest.fixture
+def comp(conn):
+    conn.execute("INSERT INTO coaches(id,first_name,last_name) VALUES (1,'Ivan','Horvat')")
+    conn.commit()
+    member_id = members.save(conn, {"first_name": "Ana", "last_name": "Čolak", "oib": None})
+    comp_id = competitions.save(conn, {"kind": "PRVENSTVO HRVATSKE", "date_from": "2025-05-10", "date_to": "2025-05-11",
+                                       "age_cat": "U15", "style": "GR"}, coach_ids=[1], coach_names={1: "Ivan Horvat"})
+    return conn, comp_id, member_id
+
+def test_save_links_coaches(comp):
+    conn, comp_id, _ = comp
+    assert conn.execute("SELECT coach_id FROM competition_coaches WHERE competition_id=?", (comp_id,)).fetchall() == [(1,)]
+    assert conn.execute("SELECT coaches_json FROM competitions").fetchone()[0] == '["Ivan Horvat"]'
+
+def test_add_result_with_bouts(comp):
+    conn, comp_id, member_id = comp
+    rows = [(bouts.WIN, {"opponent": "Petar Novak", "club": "HK Zagreb", "score": "8:0", "round": "1/4"}),
+            (bouts.LOSS, {"opponent": "Đuro Babić", "club": "HK Rijeka", "score": "2:5", "round": "finale"})]
+    result_id = competitions.add_result(conn, comp_id, member_id, {"style": "GR", "fights_total": 2, "wins": 1, "losses": 1,
+                                                                   "placement": 2}, rows)
+    saved = bouts.result_bouts(conn, result_id)
+    assert saved["ishod"].tolist() == ["Pobjeda", "Poraz"]
+    assert conn.execute("SELECT opponent_key, club_key FROM bouts WHERE outcome='L'").fetchone() == ("duro babic", "hk rijeka")
+    # zbrojne tablice prate rezultat (okidači)
+    assert conn.execute("SELECT fights, wins, losses, silver FROM agg_member_year WHERE member_id=?",
+                        (member_id,)).fetchone() == (2, 1, 1, 1)
+
+def test_add_result_rolls_back_on_error(comp):
+    conn, comp_id, member_id = comp
+    with pytest.raises(ValueError):
+        competitions.add_result(conn, comp_id, member_id, {"bodovi": 3})
+    with pytest.raises(sqlite3.IntegrityError):  # ishod mora biti W ili L
+        competitions.add_result(conn, comp_id, member_id, {"placement": 1}, [("X", {"opponent": "?"})])
+    assert conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+    assert not conn.in_transaction
+
+def test_report_frames(comp):
+    conn, comp_id, member_id = comp
+    competitions.add_result(conn, comp_id, member_id, {"style": "GR", "fights_total": 3, "wins": 3, "losses": 0, "placement": 1})
+    frames = dict(stats.report_frames(conn, 2024, 2025, athlete_id=member_id, coach_id=1))
+    assert list(frames) == ["Sažetak", "Po_godinama", "Po_uzrastima", "Po_vrsti", "Sportas_godine", "Trener_godine"]
+    assert frames["Sažetak"][["borbi", "pobjede", "zlato"]].values.tolist() == [[3, 3, 1]]
+    assert frames["Po_godinama"]["godina"].tolist() == ["2025"]
+    assert frames["Sportas_godine"]["medalje"].tolist() == [1]
+    assert frames["Trener_godine"][["broj_natjecanja", "medalje"]].values.tolist() == [[1, 1]]
+    filtered = dict(stats.report_frames(conn, 2024, 2025, group="Nepostojeća", coach=stats.ALL_COACHES))
+    assert filtered["Sažetak"].empty
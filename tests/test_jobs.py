@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from hkpodravka import jobs, members
+
+
+def _run(conn, tmp_path, params):
+    job_id = jobs.submit(conn, "export", params, root=str(tmp_path))
+    status = jobs.run(conn, jobs._claim(conn, "test"), root=str(tmp_path))
+    return status, jobs.get(conn, job_id)
+
+@pytest.mark.parametrize("params", [
+    {"export": "members", "filters": {"search": "Horvat", "group": members.ALL, "city": "", "fee": None}},
+    {"export": "year_results", "filters": {"year": 2025}},
+    {"export": "groups"},
+])
+def test_export_kinds(conn, tmp_path, params):
+    members.save(conn, {"first_name": "Ivan", "last_name": "Horvat", "oib": "12345678903"})
+    status, job = _run(conn, tmp_path, dict(params, file_name="izvoz.xlsx"))
+    assert status == jobs.DONE, job["error"]
+    assert job["result"]["bytes"] > 0
+
+@pytest.mark.parametrize("params", [
+    {"export": "nepoznato"},
+    {"sheets": [["Clanovi", "SELECT * FROM members", []]]},  # stari oblik: SQL u redu poslova
+])
+def test_export_rejects_unknown_kind(conn, tmp_path, params):
+    status, job = _run(conn, tmp_path, params)
+    assert status == jobs.FAILED
+    assert "Nepoznata vrsta izvoza" in job["error"]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from hkpodravka.lookup import MemberIndex, fold
+
+ROWS = [(1, "Ivan", "Horvat", "12345678903", "Hrvači"), (2, "Ana", "Čolak", "", "Hrvačice"),
+        (3, "Đuro", "Kovačević", "", ""), (4, "Ivana", "Horvat", "", "")]
+
+def test_fold():
+    assert fold("  Đurić  ČOLAK ") == "duric colak"
+
+def test_search_exact_reversed_prefix_and_oib():
+    ix = MemberIndex(ROWS)
+    assert list(ix.search("colak ana").values()) == [2]
+    assert list(ix.search("hor iva").values()) == [1, 4]
+    assert list(ix.search("123 456 789 03").values())[0] == 1
+
+def test_search_typo():
+    ix = MemberIndex(ROWS)
+    assert list(ix.search("Kovacevuc Duro").values()) == [3]
+    assert ix.search("xyz") == {}
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+from hkpodravka import members
+
+
+def oib(prefix):
+    """Ispravan OIB (kontrolna znamenka ISO 7064 MOD 11,10) za 10 znamenki."""
+    a = 10
+    for d in prefix:
+        a = (a + int(d)) % 10 or 10
+        a = a * 2 % 11
+    return prefix + str((11 - a) % 10)
+
+def _row(first, last, oib_, **extra):
+    return {"ime": first, "prezime": last, "oib": oib_, **extra}
+
+def test_oib_helper_is_valid():
+    assert members.oib_valid(pd.Series([oib("1234567890"), oib("0000000001"), "12345678901"])).tolist() == [True, True, False]
+
+def test_save_upserts_by_oib(conn):
+    a = oib("1000000000")
+    first = members.save(conn, {"first_name": "Ivan", "last_name": "Horvat", "oib": a, "city": "Koprivnica"})
+    again = members.save(conn, {"first_name": "Ivan", "last_name": "Horvat", "oib": a, "city": "Đurđevac"})
+    other = members.save(conn, {"first_name": "Ana", "last_name": "Čolak", "oib": oib("1000000001")})
+    assert first == again != other
+    assert conn.execute("SELECT COUNT(*), MAX(city) FROM members WHERE oib=?", (a,)).fetchone() == (1, "Đurđevac")
+
+def test_save_rejects_unknown_column(conn):
+    try:
+        members.save(conn, {"first_name": "Ivan", "nadimak": "Ivo"})
+    except ValueError as e:
+        assert "nadimak" in str(e)
+    else:
+        raise AssertionError("nepoznati stupac nije odbijen")
+
+def test_import_members(conn):
+    existing = oib("2000000000")
+    members.save(conn, {"first_name": "Stari", "last_name": "Član", "oib": existing})
+    df = pd.DataFrame([
+        _row("Ivan", "Horvat", oib("2000000001"), **{"datum_rodenja(YYYY-MM-DD)": "2010-03-04", "grupa": "Hrvači"}),
+        _row("Stari", "Član", existing, grad="Koprivnica"),
+        _row("Krivi", "Oib", "12345678901"),
+        _row("", "Bezimeni", oib("2000000002")),
+        _row("Datum", "Loš", oib("2000000003"), **{"datum_rodenja(YYYY-MM-DD)": "31.02.2010"}),
+    ])
+    report, counts = members.import_members(conn, df)
+    assert report["status"].tolist() == ["novi", "ažuriran", "odbijen", "odbijen", "upozorenje"]
+    assert "neispravan OIB" in report.loc[2, "napomena"]
+    assert counts == {"novi": 1, "ažuriran": 1, "odbijen": 2, "upozorenje": 1}
+    rows = dict(conn.execute("SELECT oib, COALESCE(city,'') || '|' || COALESCE(dob,'') || '|' || COALESCE(group_name,'') FROM members"))
+    assert rows[oib("2000000001")] == "|2010-03-04|Hrvači"
+    assert rows[existing] == "Koprivnica||"
+    assert "12345678901" not in rows and len(rows) == 3
+
+def test_assign_groups(conn):
+    ivan = members.save(conn, {"first_name": "Ivan", "last_name": "Horvat", "oib": oib("3000000000")})
+    ana = members.save(conn, {"first_name": "Ana", "last_name": "Čolak", "oib": oib("3000000001")})
+    for _ in range(2):
+        members.save(conn, {"first_name": "Marko", "last_name": "Babić", "oib": None})
+    df = pd.DataFrame({"ime": ["IVAN", "ana", "Marko", "Petar"], "prezime": ["horvat", "Colak", "Babić", "Novak"],
+                       "grupa": ["Hrvači", "Hrvačice", "Veterani", "Ostalo"], "oib": ["", oib("3000000001"), "", ""]})
+    report = members.assign_groups(conn, df)
+    assert report["status"].tolist() == ["ime", "oib", "više članova istog imena", "nije pronađen"]
+    groups = dict(conn.execute("SELECT id, group_name FROM members"))
+    assert groups[ivan] == "Hrvači" and groups[ana] == "Hrvačice"
+    assert "Veterani" not in groups.values()
+
+def test_dates_iso_and_dayfirst():
+    s = pd.Series(["2010-03-04", "04.03.2010.", "4.3.2010", "", "31.02.2010"])
+    text, bad = members._dates(s)
+    assert text.tolist() == ["2010-03-04", "2010-03-04", "2010-03-04", "", ""]
+    assert bad.tolist() == [False, False, False, False, True]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+import json, logging, sqlite3
+
+from hkpodravka import migrations
+
+
+def _migrate_to(conn, version):
+    cur = conn.cursor()
+    for num, name, fn in migrations.MIGRATIONS:
+        if num <= version:
+            fn(cur)
+            cur.execute("INSERT INTO schema_version(version,name,applied_at) VALUES (?,?,'')", (num, name))
+    conn.commit()
+
+def test_m004_links_only_known_coaches(tmp_path, caplog):
+    conn = sqlite3.connect(tmp_path / "old.db")
+    migrations.current_version(conn)
+    _migrate_to(conn, 3)
+    conn.execute("INSERT INTO coaches(id,first_name,last_name) VALUES (1,'Ivan','Horvat')")
+    conn.execute("INSERT INTO competitions(id,kind,date_from,coaches_json) VALUES (1,'OSTALO','2020-05-01',?)",
+                 (json.dumps(["ivan  horvat", "Ana Marija Kovač"]),))
+    conn.commit()
+    with caplog.at_level(logging.WARNING, logger="hkpodravka.migrations"):
+        migrations.migrate(conn)
+    assert conn.execute("SELECT COUNT(*) FROM coaches").fetchone()[0] == 1
+    assert conn.execute("SELECT competition_id, coach_id FROM competition_coaches").fetchall() == [(1, 1)]
+    assert "Ana Marija Kovač" in json.loads(conn.execute("SELECT coaches_json FROM competitions").fetchone()[0])
+    assert "Ana Marija Kovač" in caplog.text
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from datetime import date
+
+import pytest
+
+from hkpodravka import schedule
+
+GROUPS = ("Hrvači", "Hrvačice")
+DAYS = (0, 2, 4)  # pon, sri, pet
+
+@pytest.fixture
+def sched(conn):
+    conn.executemany("""INSERT INTO group_schedules(group_name,coach_id,coach_name,day_of_week,start_time,end_time,location)
+                        VALUES (?,NULL,'Trener',?,'18:00','19:30','Dvorana')""", [(g, d) for g in GROUPS for d in DAYS])
+    conn.commit()
+    return conn
+
+def _schedules(conn):
+    cur = conn.execute(schedule.SCHEDULES_SQL.format(where=""))
+    return [dict(zip([d[0] for d in cur.description], r)) for r in cur]
+
+def _sessions(conn):
+    return conn.execute("SELECT group_name, start_dt FROM training_sessions ORDER BY 1, 2").fetchall()
+
+def test_rerun_adds_nothing(sched):
+    added, existing, _ = schedule.generate(sched, date(2024, 9, 1), date(2024, 12, 31))
+    assert added > 0 and existing == 0
+    again = schedule.generate(sched, date(2024, 9, 1), date(2024, 12, 31))
+    assert again[0] == 0 and again[1] == added
+    assert len(_sessions(sched)) == added
+
+def test_overlapping_period_adds_only_new_days(sched):
+    schedule.generate(sched, date(2025, 6, 1), date(2025, 6, 30))
+    june = len(_sessions(sched))
+    added, existing, _ = schedule.generate(sched, date(2025, 6, 15), date(2025, 7, 31))
+    rows, _ = schedule.expand(_schedules(sched), date(2025, 7, 1), date(2025, 7, 31))
+    assert added == len(rows) and existing > 0
+    assert len(_sessions(sched)) == june + added
+    assert len(set(_sessions(sched))) == len(_sessions(sched))
+
+def test_closed_days_are_skipped(sched):
+    sched.execute("INSERT INTO club_calendar(day, kind, note) VALUES ('2024-10-07', 'zatvoreno', 'dvorana')")  # ponedjeljak
+    sched.commit()
+    added, _, skipped = schedule.generate(sched, date(2024, 10, 1), date(2024, 10, 31))
+    assert skipped == len(GROUPS)
+    assert not [s for s in _sessions(sched) if s[1].startswith("2024-10-07")]
+    assert added == len(_sessions(sched))
+
+def test_movable_holidays():
+    days = dict((name, d) for d, name in schedule.holidays(2025))
+    assert days["Uskrs"] == date(2025, 4, 20)
+    assert days["Uskrsni ponedjeljak"] == date(2025, 4, 21)
+    assert days["Tijelovo"] == date(2025, 6, 19)
+    assert schedule.easter(2024) == date(2024, 3, 31) and schedule.easter(2026) == date(2026, 4, 5)
+
+def test_holidays_close_the_club(sched):
+    assert schedule.add_holidays(sched, 2025) == len(schedule.holidays(2025))
+    assert schedule.add_holidays(sched, 2025) == 0
+    _, _, skipped = schedule.generate(sched, date(2025, 4, 1), date(2025, 6, 30))
+    days = {s[1][:10] for s in _sessions(sched)}
+    # u rasporedu (pon/sri/pet) padaju Uskrsni ponedjeljak i Dan državnosti (petak)
+    assert "2025-04-21" not in days and "2025-05-30" not in days
+    assert skipped == 2 * len(GROUPS)
+
+def test_split_session_keeps_both_rows(sched):
+    sched.execute("""INSERT INTO group_schedules(group_name,coach_id,coach_name,day_of_week,start_time,end_time,location)
+                     VALUES ('Hrvači',NULL,'Drugi trener',0,'18:00','19:30','Mala dvorana')""")
+    sched.commit()
+    added, _, _ = schedule.generate(sched, date(2024, 9, 2), date(2024, 9, 8))
+    assert added == len(GROUPS) * len(DAYS) + 1
+    monday = sched.execute("""SELECT trainer_name, location FROM training_sessions
+                              WHERE group_name='Hrvači' AND start_dt='2024-09-02T18:00:00' ORDER BY 1""").fetchall()
+    assert [tuple(r) for r in monday] == [("Drugi trener", "Mala dvorana"), ("Trener", "Dvorana")]
+    assert schedule.generate(sched, date(2024, 9, 2), date(2024, 9, 8))[0] == 0
+
+def test_manual_session_is_not_duplicated(sched):
+    sched.execute("""INSERT INTO training_sessions(trainer_name, group_name, start_dt, end_dt, location, rep_prep)
+                     VALUES ('Trener', 'Hrvači', '2024-09-02T18:00:00', '2024-09-02T19:30:00', 'Dvorana', 0)""")
+    sched.commit()
+    added, existing, _ = schedule.generate(sched, date(2024, 9, 2), date(2024, 9, 8))
+    assert existing == 1 and added == len(GROUPS) * len(DAYS) - 1
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Regresija planova: filtrirani statistički upiti moraju koristiti indekse (migracije 3–5)."""
+import pytest
+
+from hkpodravka import stats
+from bench.generator import fill
+
+YEAR = 2025
+
+def _cases():
+    where, params = stats.where_clause(None, None, YEAR - 3, YEAR)
+    cwhere, cparams = stats.where_clause(None, 1, YEAR - 3, YEAR)
+    return [
+        ("summary", stats.SUMMARY_AGG_SQL, (YEAR - 3, YEAR), "agg_medals"),
+        ("summary_raw", stats.SUMMARY_SQL.format(where=where), params, "idx_competitions_year_kind_age"),
+        ("summary_coach", stats.SUMMARY_SQL.format(where=cwhere), cparams, "SEARCH cc"),
+        ("per_coach", stats.PER_COACH_SQL, (1,), "idx_competition_coaches_coach"),
+        ("coach_options", stats.COMPETITION_COACHES_SQL, (), "idx_competition_coaches_coach"),
+        ("per_age", stats.PER_AGE_SQL, (YEAR,), "SEARCH agg_medals"),
+        ("per_kind", stats.PER_KIND_SQL, (YEAR, YEAR), "SEARCH a USING PRIMARY KEY"),
+        ("per_athlete", stats.PER_ATHLETE_SQL, (42,), "SEARCH agg_member_year"),
+        ("year_results", stats.YEAR_RESULTS_SQL, (YEAR,), "idx_competitions_year_kind_age"),
+    ]
+
+@pytest.fixture
+def club(conn):
+    fill(conn, seasons=3, members=20, coaches=3, comps_per_season=5, results_per_comp=10, last_year=YEAR)
+    conn.commit()
+    return conn
+
+@pytest.mark.parametrize("name,sql,params,index", _cases(), ids=[c[0] for c in _cases()])
+def test_query_uses_index(club, name, sql, params, index):
+    plan = " | ".join(r[3] for r in club.execute("EXPLAIN QUERY PLAN " + sql, params))
+    assert index in plan, plan